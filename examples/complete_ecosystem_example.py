@@ -61,6 +61,10 @@ def main():
     
     # 7. GST ECOSYSTEM - Tokens
     print("\n🪙 GST Ecosystem:")
+    for _ in range(6):
+        sdk.gst.reward_esg_activity("user-123", "recycling", 90)
+    gst_balance = sdk.gst.get_user_gst_balance("user-123")
+    print(f"✅ Saldo: {gst_balance['gst_balance']:.2f} GST")
     gst_transfer = sdk.gst.transfer_gst("user-123", "user-456", 50)
     print(f"✅ Transferência: {gst_transfer['transaction_id']}")
     print(f"💰 Valor: {gst_transfer['amount']} GST")
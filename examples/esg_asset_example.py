@@ -47,9 +47,15 @@ def main():
     print(f"🌱 Score ESG: {asset_result['esg_score']:.1f}")
     print(f"💰 Valor fiscal: R$ {asset_result['fiscal_value']:,.2f}")
     print(f"🏛️ Créditos fiscais: {len(asset_result['tax_credits_available'])}")
-    print(f"⛓️ Blockchain: {asset_result['transaction_hash']}")
+    print(f"⛓️ Hash encadeado: {asset_result['chain_hash'][:16]}...")
     print(f"🔒 Imutável: {asset_result['immutable']}")
     
+    # Confirmar lote e obter prova de inclusão Merkle
+    batch = sdk.esg_asset.commit_assets()
+    proof = sdk.esg_asset.get_asset_proof(asset_result['asset_id'])
+    print(f"🌳 Raiz Merkle do lote #{batch['batch_number']}: {batch['merkle_root'][:16]}...")
+    print(f"✔️ Prova verificada offline: {sdk.esg_asset.verify_asset_proof(proof)}")
+    
     # Staking para rendimento
     print("\n💰 Fazendo staking do ESG Asset...")
     staking_result = sdk.esg_asset.stake_for_rewards(
@@ -67,9 +73,13 @@ def main():
     
     # Governança ESG
     print("\n🗳️ Participando da governança ESG...")
+    proposal = sdk.esg_asset.create_governance_proposal({
+        "title": "Ampliar bônus para produtos orgânicos",
+        "duration_days": 7
+    })
     vote_result = sdk.esg_asset.vote_on_proposal(
         asset_id=asset_result['asset_id'],
-        proposal_id="PROP_001",
+        proposal_id=proposal['proposal_id'],
         vote="YES"
     )
     
@@ -80,6 +90,9 @@ def main():
     print(f"🌱 Score ESG: {vote_result['esg_score']:.1f}")
     print(f"💎 Recompensa: R$ {vote_result['reward_earned']:.2f}")
     
+    results = sdk.esg_asset.get_proposal_results(proposal['proposal_id'])
+    print(f"📊 Apuração parcial: {results['tallies']}")
+    
     # Opções de monetização
     print("\n💸 Analisando opções de monetização...")
     monetization = sdk.esg_asset.get_monetization_options(asset_result['asset_id'])
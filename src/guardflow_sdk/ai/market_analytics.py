@@ -0,0 +1,125 @@
+from typing import Dict, Any, List, Optional, Tuple
+import time
+from datetime import datetime, timezone
+from ..common.sliding_window import SlidingWindowCounter
+
+def to_epoch(value: Any) -> float:
+    """Timestamp em segundos epoch (número, ISO-8601 ou datetime; sem fuso = UTC)"""
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"Invalid timestamp: {value!r}") from None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    raise ValueError(f"Invalid timestamp: {value!r}")
+
+class SpaceSavingSketch:
+    """
+    Sketch Space-Saving para heavy hitters
+    Mantém no máximo `capacity` itens monitorados
+    """
+    
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self._counts: Dict[str, float] = {}
+        self._errors: Dict[str, float] = {}
+    
+    def add(self, item: str, count: float = 1.0):
+        """Registrar ocorrências de um item"""
+        if item in self._counts:
+            self._counts[item] += count
+            return
+        if len(self._counts) < self.capacity:
+            self._counts[item] = count
+            self._errors[item] = 0.0
+            return
+        # Substituir o item com menor contagem (erro herdado)
+        victim = min(self._counts, key=self._counts.__getitem__)
+        min_count = self._counts.pop(victim)
+        del self._errors[victim]
+        self._counts[item] = min_count + count
+        self._errors[item] = min_count
+    
+    def top(self, k: int) -> List[Tuple[str, float]]:
+        """Top-k itens por contagem estimada"""
+        return sorted(self._counts.items(), key=lambda kv: kv[1], reverse=True)[:k]
+
+class MarketStreamAggregator:
+    """
+    Agregador streaming de vendas de um mercado
+    Mantém contadores, sketches e razões com memória limitada
+    """
+    
+    def __init__(self, market_id: str, area_sqft: float = 1000.0,
+                 window_seconds: int = 3600, bucket_seconds: int = 60,
+                 top_k: int = 5, sketch_capacity: int = 64):
+        self.market_id = market_id
+        self.area_sqft = area_sqft
+        self.window_seconds = window_seconds
+        self.top_k = top_k
+        self.customer_flow = SlidingWindowCounter(window_seconds, bucket_seconds)
+        self.products = SpaceSavingSketch(sketch_capacity)
+        self.total_items = 0.0
+        self.sustainable_items = 0.0
+        self.total_revenue = 0.0
+        self.total_sales = 0
+        self._snapshot: Optional[Dict[str, Any]] = None
+    
+    def record_sale(self, sale: Dict[str, Any]):
+        """Consumir um evento de venda; timestamp inválido levanta ValueError"""
+        timestamp = sale.get("timestamp")
+        timestamp = time.time() if timestamp is None else to_epoch(timestamp)
+        self.customer_flow.add(timestamp)
+        self.total_revenue += sale.get("amount", 0)
+        self.total_sales += 1
+        
+        for product in sale.get("products", []):
+            if isinstance(product, str):
+                product = {"name": product}
+            quantity = product.get("quantity", 1)
+            self.products.add(product.get("name", "unknown"), quantity)
+            self.total_items += quantity
+            if product.get("sustainable", False):
+                self.sustainable_items += quantity
+        
+        self._snapshot = None
+    
+    def set_area(self, area_sqft: float):
+        """Atualizar área do mercado (invalida o snapshot)"""
+        self.area_sqft = area_sqft
+        self._snapshot = None
+    
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Snapshot das métricas (recalculado só após novos eventos)"""
+        customers = self.customer_flow.total(now)
+        if self._snapshot is None:
+            top = self.products.top(self.top_k)
+            self._snapshot = {
+                "market_id": self.market_id,
+                "popular_products": [name for name, _ in top],
+                "popular_products_counts": {name: count for name, count in top},
+                "esg_engagement": self.sustainable_items / self.total_items if self.total_items else 0.0,
+                "revenue_per_sqft": self.total_revenue / self.area_sqft if self.area_sqft else 0.0,
+                "total_sales": self.total_sales,
+                "snapshot_at": datetime.utcnow().isoformat()
+            }
+        snapshot = dict(self._snapshot)
+        customers_per_hour = customers * 3600 / self.window_seconds
+        snapshot["customers_per_hour"] = customers_per_hour
+        snapshot["customer_flow"] = self._flow_level(customers_per_hour)
+        return snapshot
+    
+    def _flow_level(self, customers_per_hour: float) -> str:
+        """Classificar fluxo de clientes"""
+        if customers_per_hour >= 200:
+            return "high"
+        elif customers_per_hour >= 50:
+            return "medium"
+        return "low"
@@ -0,0 +1,88 @@
+from typing import Dict, Any, List, Optional, Iterable, MutableMapping
+from collections import OrderedDict
+
+# Atributos de asset usados por staking, governança e monetização
+ASSET_ATTRIBUTES = ("esg_score", "fiscal_value", "carbon_offset_kg")
+
+class AssetAttributeStore:
+    """
+    Atributos de assets ESG por asset_id
+    Cache LRU read-through sobre um backend persistente (dict, shelve, ...)
+    """
+    
+    def __init__(self, backend: Optional[MutableMapping[str, Dict[str, Any]]] = None, cache_size: int = 100000):
+        self.backend = backend if backend is not None else {}
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def __contains__(self, asset_id: str) -> bool:
+        return asset_id in self._cache or asset_id in self.backend
+    
+    def put(self, asset_id: str, attributes: Dict[str, Any]):
+        """Gravar atributos no backend e invalidar o cache"""
+        self.backend[asset_id] = {field: attributes.get(field, 0) for field in ASSET_ATTRIBUTES}
+        self.invalidate(asset_id)
+    
+    def update(self, asset_id: str, changes: Dict[str, Any]) -> bool:
+        """Atualizar atributos existentes; False se o asset não existe"""
+        current = self.get(asset_id)
+        if current is None:
+            return False
+        updated = dict(current)
+        updated.update((field, value) for field, value in changes.items() if field in ASSET_ATTRIBUTES)
+        self.put(asset_id, updated)
+        return True
+    
+    def invalidate(self, asset_id: str):
+        self._cache.pop(asset_id, None)
+    
+    def get(self, asset_id: str) -> Optional[Dict[str, Any]]:
+        attributes = self._cache.get(asset_id)
+        if attributes is not None:
+            self.hits += 1
+            self._cache.move_to_end(asset_id)
+            return attributes
+        self.misses += 1
+        attributes = self.backend.get(asset_id)
+        if attributes is not None:
+            self._remember(asset_id, attributes)
+        return attributes
+    
+    def get_many(self, asset_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Leitura em lote: acertos do cache + uma passada no backend para o resto"""
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        cache = self._cache
+        for asset_id in asset_ids:
+            attributes = cache.get(asset_id)
+            if attributes is None:
+                missing.append(asset_id)
+            else:
+                found[asset_id] = attributes
+                cache.move_to_end(asset_id)
+        self.hits += len(found)
+        self.misses += len(missing)
+        
+        backend = self.backend
+        for asset_id in missing:
+            attributes = backend.get(asset_id)
+            if attributes is not None:
+                found[asset_id] = attributes
+                self._remember(asset_id, attributes)
+        return found
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+    
+    def _remember(self, asset_id: str, attributes: Dict[str, Any]):
+        self._cache[asset_id] = attributes
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
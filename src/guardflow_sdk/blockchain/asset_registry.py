@@ -0,0 +1,184 @@
+from typing import Dict, Any, List, Optional, Callable, Tuple
+import hashlib
+import json
+import time
+
+# Prefixos de domínio: folhas e nós internos nunca colidem
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+GENESIS_HASH = b"\x00" * 32
+
+def canonical_record(record: Dict[str, Any]) -> bytes:
+    """Serialização determinística do registro de um asset"""
+    return json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+def leaf_hash(record: Dict[str, Any]) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + canonical_record(record)).digest()
+
+def verify_inclusion(record: Dict[str, Any], proof: List[Tuple[str, str]], merkle_root: str) -> bool:
+    """
+    Verificar offline que o registro pertence ao lote com a raiz informada
+    Custo O(log n) hashes, sem consultar o registro
+    """
+    node = leaf_hash(record)
+    for side, sibling_hex in proof:
+        sibling = bytes.fromhex(sibling_hex)
+        if side == "L":
+            node = hashlib.sha256(NODE_PREFIX + sibling + node).digest()
+        else:
+            node = hashlib.sha256(NODE_PREFIX + node + sibling).digest()
+    return node.hex() == merkle_root
+
+class MerkleBatch:
+    """Lote de assets confirmado sob uma única raiz Merkle"""
+    
+    def __init__(self, batch_number: int, first_sequence: int, leaves: List[bytes], chain_hash: bytes):
+        self.batch_number = batch_number
+        self.first_sequence = first_sequence
+        self.chain_hash = chain_hash
+        self.committed_at = time.time()
+        self.levels = self._build(leaves)
+    
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0]
+    
+    @property
+    def size(self) -> int:
+        return len(self.levels[0])
+    
+    def proof(self, position: int) -> List[Tuple[str, str]]:
+        """Caminho de irmãos da folha até a raiz"""
+        path = []
+        for level in self.levels[:-1]:
+            sibling = position ^ 1
+            if sibling < len(level):
+                path.append(("L" if sibling < position else "R", level[sibling].hex()))
+            position >>= 1
+        return path
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "batch_number": self.batch_number,
+            "merkle_root": self.root.hex(),
+            "first_sequence": self.first_sequence,
+            "size": self.size,
+            "chain_hash": self.chain_hash.hex(),
+            "committed_at": self.committed_at
+        }
+    
+    def _build(self, leaves: List[bytes]) -> List[List[bytes]]:
+        levels = [leaves]
+        level = leaves
+        while len(level) > 1:
+            parents = [hashlib.sha256(NODE_PREFIX + level[i] + level[i + 1]).digest()
+                       for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parents.append(level[-1])  # Nó ímpar sobe sem duplicação
+            levels.append(parents)
+            level = parents
+        return levels
+
+class AssetRegistry:
+    """
+    Registro imutável de assets ESG
+    Log encadeado por hash + commits em lote sob uma raiz Merkle
+    """
+    
+    def __init__(self, batch_size: int = 4096):
+        self.batch_size = batch_size
+        self.records: List[Dict[str, Any]] = []
+        self.chain: List[bytes] = []
+        self.batches: List[MerkleBatch] = []
+        self.chain_head = GENESIS_HASH
+        self._pending: List[bytes] = []
+        self._sequences: Dict[str, int] = {}
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+    
+    def subscribe(self, listener: Callable[[Dict[str, Any]], None]):
+        """Registrar callback para cada lote confirmado (ancoragem da raiz)"""
+        self._listeners.append(listener)
+    
+    def __contains__(self, asset_id: str) -> bool:
+        return asset_id in self._sequences
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+    
+    def append(self, asset_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Adicionar asset ao log; confirma o lote quando atinge batch_size"""
+        if asset_id in self._sequences:
+            raise ValueError(f"Asset already registered: {asset_id}")
+        leaf = leaf_hash(record)
+        self.chain_head = hashlib.sha256(self.chain_head + leaf).digest()
+        sequence = len(self.records)
+        self._sequences[asset_id] = sequence
+        self.records.append(record)
+        self.chain.append(self.chain_head)
+        self._pending.append(leaf)
+        
+        entry = {"sequence": sequence, "leaf_hash": leaf.hex(), "chain_hash": self.chain_head.hex()}
+        if len(self._pending) >= self.batch_size:
+            entry["batch"] = self.commit()
+        return entry
+    
+    def commit(self) -> Optional[Dict[str, Any]]:
+        """Confirmar os assets pendentes sob uma única raiz Merkle"""
+        if not self._pending:
+            return None
+        first_sequence = len(self.records) - len(self._pending)
+        batch = MerkleBatch(len(self.batches), first_sequence, self._pending, self.chain_head)
+        self.batches.append(batch)
+        self._pending = []
+        summary = batch.to_dict()
+        for listener in self._listeners:
+            listener(summary)
+        return summary
+    
+    def get(self, asset_id: str) -> Optional[Dict[str, Any]]:
+        sequence = self._sequences.get(asset_id)
+        return self.records[sequence] if sequence is not None else None
+    
+    def proof(self, asset_id: str) -> Optional[Dict[str, Any]]:
+        """Prova de inclusão do asset; None se ainda não confirmado"""
+        sequence = self._sequences.get(asset_id)
+        if sequence is None:
+            return None
+        batch = self._batch_for(sequence)
+        if batch is None:
+            return None
+        return {
+            "asset_id": asset_id,
+            "sequence": sequence,
+            "batch_number": batch.batch_number,
+            "merkle_root": batch.root.hex(),
+            "record": self.records[sequence],
+            "proof": batch.proof(sequence - batch.first_sequence)
+        }
+    
+    def verify_chain(self) -> bool:
+        """Reprocessar o log completo e conferir o encadeamento"""
+        head = GENESIS_HASH
+        for record, chain_hash in zip(self.records, self.chain):
+            head = hashlib.sha256(head + leaf_hash(record)).digest()
+            if head != chain_hash:
+                return False
+        return head == self.chain_head
+    
+    def _batch_for(self, sequence: int) -> Optional[MerkleBatch]:
+        # Busca binária pelo lote que contém a sequência
+        low, high = 0, len(self.batches) - 1
+        while low <= high:
+            middle = (low + high) // 2
+            batch = self.batches[middle]
+            if sequence < batch.first_sequence:
+                high = middle - 1
+            elif sequence >= batch.first_sequence + batch.size:
+                low = middle + 1
+            else:
+                return batch
+        return None
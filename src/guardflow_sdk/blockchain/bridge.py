@@ -1,53 +1,229 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import httpx
 import random
 from datetime import datetime
+from .local_chain import LocalChain
+from .event_indexer import ChainEventIndexer
+from .chain_router import ChainClientPool, ChainRouter
+from .nonces import NonceManager
+from .fee_oracle import FeeOracle
+from .tx_submitter import TransactionSubmitter
+
+# Taxa média inicial por chain, até haver observações
+CHAIN_FEE_PRIORS = {"Solana": 0.001, "Polygon": 0.002, "Ethereum": 0.02}
 
 class BlockchainBridge:
-    def __init__(self, client: httpx.Client, api_key: str = None):
+    def __init__(self, client: httpx.Client, api_key: str = None, index_path: str = ":memory:",
+                 pool_size: int = 8, max_in_flight: int = 256, confirm_timeout: float = 60.0):
         self.client = client
         self.api_key = api_key
         self.supported_chains = ["Solana", "Ethereum", "Polygon"]
+        self.confirm_timeout = confirm_timeout
+        # Cadeias locais no lugar dos nós RPC; leituras vêm dos índices SQLite
+        self.chains = {name: LocalChain(name) for name in self.supported_chains}
+        self.indexers = {
+            name: ChainEventIndexer(chain, index_path if index_path == ":memory:" else f"{index_path}.{name.lower()}")
+            for name, chain in self.chains.items()
+        }
+        self.router = ChainRouter(
+            {name: ChainClientPool(name, lambda chain=chain: chain, pool_size) for name, chain in self.chains.items()},
+            CHAIN_FEE_PRIORS
+        )
+        # Envio em lote pelo relayer: nonces locais e confirmação assíncrona por chain
+        self.relayer_address = "0xGuardFlowBridge"
+        self.submitters = {
+            name: TransactionSubmitter(
+                self.relayer_address, NonceManager(chain.transaction_count),
+                lambda transaction, chain=chain: self._send_signed(chain, transaction),
+                lambda tx_hashes, chain=chain: self._get_receipts(chain, tx_hashes),
+                FeeOracle(lambda name=name: self._sample_fee(name)), max_in_flight=max_in_flight
+            )
+            for name, chain in self.chains.items()
+        }
     
-    def create_esg_token(self, amount: float, user_id: str) -> Dict[str, Any]:
+    def create_esg_token(self, amount: float, user_id: str, chain: Optional[str] = None,
+                         policy: str = "cost") -> Dict[str, Any]:
         """Criar token ESG na blockchain"""
         token_id = f"ESG_{random.randint(100000, 999999)}"
+        submitted = self._submit("mint", {"type": "mint", "token_id": token_id, "user_id": user_id, "amount": amount},
+                                 chain, policy)
+        if "error" in submitted:
+            return submitted
         
         return {
             "token_id": token_id,
             "amount": amount,
             "user_id": user_id,
-            "blockchain": "Solana",
-            "transaction_hash": f"0x{random.randint(100000, 999999)}",
+            "blockchain": submitted["blockchain"],
+            "transaction_hash": submitted["tx_hash"],
             "status": "confirmed",
             "created_at": datetime.utcnow().isoformat()
         }
     
-    def transfer_gst(self, to: str, amount: float, from_user: str) -> Dict[str, Any]:
+    def transfer_gst(self, to: str, amount: float, from_user: str, chain: Optional[str] = None,
+                     policy: str = "cost") -> Dict[str, Any]:
         """Transferir tokens GST"""
+        submitted = self._submit("transfer", {"type": "transfer", "from_user": from_user, "to_user": to, "amount": amount},
+                                 chain, policy)
+        if "error" in submitted:
+            return submitted
+        
         return {
             "transaction_id": f"TXN_{random.randint(100000, 999999)}",
             "from": from_user,
             "to": to,
             "amount": amount,
-            "blockchain": "Solana",
-            "transaction_hash": f"0x{random.randint(100000, 999999)}",
+            "blockchain": submitted["blockchain"],
+            "transaction_hash": submitted["tx_hash"],
             "status": "confirmed",
-            "gas_fee": 0.001
+            "gas_fee": submitted["fee"]
         }
     
-    def stake_esg_tokens(self, amount: float, user_id: str) -> Dict[str, Any]:
+    def transfer_gst_batch(self, transfers: List[Dict[str, Any]], chain: Optional[str] = None,
+                           policy: str = "cost", timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Transferências em lote pelo relayer
+        Todas são enviadas antes de aguardar; um único loop confirma o lote
+        """
+        if chain is not None and chain not in self.chains:
+            return {"error": "Chain not supported"}
+        try:
+            name = self.router.rank("transfer", chain or policy)[0]
+        except ValueError as exc:
+            return {"error": str(exc)}
+        
+        futures = self.submitters[name].submit_many([
+            {"type": "transfer", "from_user": transfer["from_user"], "to_user": transfer["to"],
+             "amount": transfer["amount"]}
+            for transfer in transfers
+        ])
+        results = []
+        for transfer, future in zip(transfers, futures):
+            try:
+                receipt = future.result(timeout)
+            except Exception as exc:
+                results.append({"from": transfer["from_user"], "to": transfer["to"], "error": str(exc)})
+                continue
+            results.append({
+                "from": transfer["from_user"],
+                "to": transfer["to"],
+                "amount": transfer["amount"],
+                "transaction_hash": receipt["tx_hash"],
+                "block_number": receipt["block_number"],
+                "status": "confirmed",
+                "gas_fee": receipt["gas_price"]
+            })
+        
+        return {
+            "blockchain": name,
+            "submitted": len(transfers),
+            "confirmed": sum(1 for result in results if "error" not in result),
+            "transfers": results
+        }
+    
+    def stake_esg_tokens(self, amount: float, user_id: str, chain: Optional[str] = None,
+                         policy: str = "cost") -> Dict[str, Any]:
         """Staking de tokens ESG"""
+        stake_id = f"STAKE_{random.randint(100000, 999999)}"
+        submitted = self._submit("stake", {"type": "stake", "stake_id": stake_id, "user_id": user_id,
+                                           "amount": amount, "apy": 12.5, "duration_days": 30}, chain, policy)
+        if "error" in submitted:
+            return submitted
+        
         return {
-            "stake_id": f"STAKE_{random.randint(100000, 999999)}",
+            "stake_id": stake_id,
+            "blockchain": submitted["blockchain"],
             "user_id": user_id,
             "amount": amount,
             "apy": 12.5,
             "duration_days": 30,
             "rewards_expected": amount * 0.125,
+            "transaction_hash": submitted["tx_hash"],
             "status": "active",
             "created_at": datetime.utcnow().isoformat()
         }
     
+    def sync_index(self) -> Dict[str, Any]:
+        """Indexar blocos novos de cada chain no índice local"""
+        return {name: indexer.sync() for name, indexer in self.indexers.items()}
+    
+    def get_balance(self, user_id: str) -> Dict[str, Any]:
+        """Saldo e total em staking por chain, lidos dos índices locais"""
+        chains = {name: indexer.balance(user_id) for name, indexer in self.indexers.items()}
+        return {
+            "user_id": user_id,
+            "balance": sum(balance["balance"] for balance in chains.values()),
+            "staked": sum(balance["staked"] for balance in chains.values()),
+            "chains": chains
+        }
+    
+    def get_transfers(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Transferências recentes do usuário (índices locais), mais novas primeiro entre chains"""
+        transfers = []
+        for name, indexer in self.indexers.items():
+            transfers.extend(dict(transfer, blockchain=name) for transfer in indexer.transfers(user_id, limit))
+        # Números de bloco não são comparáveis entre chains: ordena pelo timestamp do bloco
+        transfers.sort(key=lambda transfer: (transfer["timestamp"] or 0.0, transfer["block_number"]), reverse=True)
+        return transfers[:limit]
+    
+    def get_stakes(self, user_id: str) -> List[Dict[str, Any]]:
+        """Posições de staking do usuário (índices locais)"""
+        return [dict(stake, blockchain=name)
+                for name, indexer in self.indexers.items() for stake in indexer.stakes(user_id)]
+    
+    def get_token(self, token_id: str) -> Dict[str, Any]:
+        """Token ESG pelo ID (índices locais)"""
+        for name, indexer in self.indexers.items():
+            token = indexer.token(token_id)
+            if token is not None:
+                return dict(token, blockchain=name)
+        return {"error": "Token not found"}
+    
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """Pools e EWMAs de latência/taxa por chain"""
+        return self.router.snapshot()
+    
+    def _submit(self, operation: str, event: Dict[str, Any], chain: Optional[str], policy: str) -> Dict[str, Any]:
+        """Roteada para a chain escolhida pela política (ou a explícita)"""
+        if chain is not None and chain not in self.chains:
+            return {"error": "Chain not supported"}
+        try:
+            name, result = self.router.execute(operation, lambda name, client: self._send(name, client, event),
+                                               chain or policy)
+        except (ValueError, TimeoutError) as exc:
+            return {"error": str(exc)}
+        result["blockchain"] = name
+        return result
+    
+    def _send(self, name: str, client: LocalChain, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Enviar pelo submitter da chain e aguardar a confirmação"""
+        receipt = self.submitters[name].submit(event).result(self.confirm_timeout)
+        return {"tx_hash": receipt["tx_hash"], "fee": receipt["gas_price"]}
+    
+    def _send_signed(self, chain: LocalChain, transaction: Dict[str, Any]) -> str:
+        """Enviar transação assinada pelo relayer"""
+        return chain.submit(dict(transaction["payload"], signer=transaction["from"], nonce=transaction["nonce"],
+                                 gas_price=transaction["gas_price"]))
+    
+    def _get_receipts(self, chain: LocalChain, tx_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Recibos de várias transações em uma chamada"""
+        # Mock - cadeia local fecha um bloco por rodada; em produção o nó produz os blocos
+        if chain.pending_count:
+            chain.mine()
+        return chain.get_receipts(tx_hashes)
+    
+    def _sample_fee(self, name: str) -> float:
+        """Taxa atual da chain"""
+        # Mock - em produção viria do RPC de cada chain
+        return CHAIN_FEE_PRIORS[name] * random.lognormvariate(0, 0.25)
+    
+    def close(self):
+        """Parar submitters e oráculos de taxa e fechar os índices locais"""
+        for submitter in self.submitters.values():
+            submitter.stop()
+            submitter.fee_oracle.stop()
+        for indexer in self.indexers.values():
+            indexer.close()
+    
     def get_status(self) -> Dict[str, Any]:
         return {"status": "active", "module": "blockchain_bridge"}
@@ -0,0 +1,157 @@
+from typing import Dict, Any, List, Optional, Callable, Tuple
+import threading
+import time
+
+class ChainClientPool:
+    """
+    Pool de clientes de uma chain com limite de requisições em andamento
+    """
+    
+    def __init__(self, name: str, client_factory: Callable[[], Any], size: int = 8):
+        self.name = name
+        self.size = size
+        self._clients = [client_factory() for _ in range(size)]
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+    
+    @property
+    def in_flight(self) -> int:
+        return self.size - len(self._clients)
+    
+    def try_acquire(self) -> Optional[Any]:
+        with self._lock:
+            return self._clients.pop() if self._clients else None
+    
+    def acquire(self, timeout: Optional[float] = None) -> Optional[Any]:
+        with self._available:
+            if not self._available.wait_for(lambda: self._clients, timeout):
+                return None
+            return self._clients.pop()
+    
+    def release(self, client: Any):
+        with self._available:
+            self._clients.append(client)
+            self._available.notify()
+
+class ChainStats:
+    """EWMAs de latência, taxa e erro de uma chain por classe de operação"""
+    
+    def __init__(self, alpha: float, fee_prior: float):
+        self.alpha = alpha
+        self.fee_prior = fee_prior
+        self.latency: Dict[str, float] = {}
+        self.fee: Dict[str, float] = {}
+        self.error_rate = 0.0
+        self.calls = 0
+        self.tripped_at: Optional[float] = None  # Circuito aberto desde (monotonic)
+    
+    def observe(self, operation: str, latency: float, fee: Optional[float], failed: bool):
+        alpha = self.alpha
+        previous = self.latency.get(operation)
+        self.latency[operation] = latency if previous is None else previous + alpha * (latency - previous)
+        if fee is not None:
+            previous = self.fee.get(operation)
+            self.fee[operation] = fee if previous is None else previous + alpha * (fee - previous)
+        self.error_rate += alpha * ((1.0 if failed else 0.0) - self.error_rate)
+        self.calls += 1
+    
+    def expected_fee(self, operation: str) -> float:
+        return self.fee.get(operation, self.fee_prior)
+    
+    def expected_latency(self, operation: str) -> float:
+        return self.latency.get(operation, 0.0)
+
+class ChainRouter:
+    """
+    Roteamento multi-chain por política (custo, latência ou chain explícita)
+    Chains congestionadas ou com erro alto transbordam para a próxima opção
+    Chain com erro alto sai do ranking e, a cada probe_interval, recebe uma
+    requisição de prova (half-open); sucesso na prova fecha o circuito
+    """
+    
+    POLICIES = ("cost", "latency")
+    
+    def __init__(self, pools: Dict[str, ChainClientPool], fee_priors: Optional[Dict[str, float]] = None,
+                 alpha: float = 0.2, max_error_rate: float = 0.5, acquire_timeout: float = 30.0,
+                 probe_interval: float = 30.0):
+        self.pools = pools
+        self.max_error_rate = max_error_rate
+        self.probe_interval = probe_interval
+        self.acquire_timeout = acquire_timeout
+        fee_priors = fee_priors or {}
+        self.stats = {name: ChainStats(alpha, fee_priors.get(name, 0.0)) for name in pools}
+    
+    def rank(self, operation: str, policy: str = "cost") -> List[str]:
+        """Chains em ordem de preferência para a operação"""
+        if policy in self.pools:
+            # Chain explícita: sem transbordo
+            return [policy]
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown routing policy: {policy}")
+        healthy = [name for name in self.pools if self.stats[name].error_rate < self.max_error_rate]
+        probes = self._claim_probes()
+        candidates = [name for name in (healthy or list(self.pools)) if name not in probes]
+        if policy == "cost":
+            key = lambda name: (self.stats[name].expected_fee(operation), self.stats[name].expected_latency(operation))
+        else:
+            key = lambda name: (self.stats[name].expected_latency(operation), self.stats[name].expected_fee(operation))
+        return probes + sorted(candidates, key=key)
+    
+    def _claim_probes(self) -> List[str]:
+        """Chains com circuito aberto cuja janela de prova venceu (uma requisição cada)"""
+        now = time.monotonic()
+        probes = []
+        for name, stats in self.stats.items():
+            if stats.tripped_at is not None and now - stats.tripped_at >= self.probe_interval:
+                stats.tripped_at = now  # Próxima prova só após outro intervalo
+                probes.append(name)
+        return probes
+    
+    def execute(self, operation: str, call: Callable[[str, Any], Dict[str, Any]],
+                policy: str = "cost") -> Tuple[str, Dict[str, Any]]:
+        """Executar na melhor chain com cliente livre; retorna (chain, resultado)"""
+        ranked = self.rank(operation, policy)
+        chain, client = None, None
+        for name in ranked:
+            client = self.pools[name].try_acquire()
+            if client is not None:
+                chain = name
+                break
+        if client is None:
+            # Todas congestionadas: espera pela preferida
+            chain = ranked[0]
+            client = self.pools[chain].acquire(self.acquire_timeout)
+            if client is None:
+                raise TimeoutError(f"No {chain} client available")
+        
+        started = time.monotonic()
+        try:
+            result = call(chain, client)
+        except Exception:
+            stats = self.stats[chain]
+            stats.observe(operation, time.monotonic() - started, None, True)
+            if stats.error_rate >= self.max_error_rate:
+                stats.tripped_at = time.monotonic()
+            raise
+        finally:
+            self.pools[chain].release(client)
+        stats = self.stats[chain]
+        stats.observe(operation, time.monotonic() - started, result.get("fee"), False)
+        if stats.tripped_at is not None:
+            # Prova bem-sucedida: fechar o circuito
+            stats.tripped_at = None
+            stats.error_rate = 0.0
+        return chain, result
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "in_flight": self.pools[name].in_flight,
+                "pool_size": self.pools[name].size,
+                "error_rate": stats.error_rate,
+                "latency_ewma": dict(stats.latency),
+                "fee_ewma": dict(stats.fee),
+                "calls": stats.calls
+            }
+            for name, stats in self.stats.items()
+        }
@@ -0,0 +1,140 @@
+from typing import Dict, Any, List, Optional, Iterable
+from collections import OrderedDict
+import time
+from datetime import datetime
+from ..common.sliding_window import SlidingWindowCounter
+
+DAY = 86400
+
+class ContractMetrics:
+    """
+    Projeção das métricas de um contrato, atualizada evento a evento
+    Contagem por usuário limitada aos max_tracked_users mais recentes;
+    acima disso usuários únicos/recorrentes são aproximados
+    """
+    
+    def __init__(self, max_tracked_users: int = 10000):
+        self.max_tracked_users = max_tracked_users
+        self.total_transactions = 0
+        self.successful_transactions = 0
+        self.total_volume = 0.0
+        self.total_gas = 0
+        self.total_gas_limit = 0
+        self.total_fees = 0.0
+        self.total_confirmation_seconds = 0.0
+        self.user_transactions: "OrderedDict[str, int]" = OrderedDict()
+        self.unique_users = 0
+        self.returning_users = 0
+        self.last_activity: Optional[float] = None
+        self.daily_volume = SlidingWindowCounter(DAY, 3600)
+        self.weekly_volume = SlidingWindowCounter(7 * DAY, DAY)
+        self.monthly_volume = SlidingWindowCounter(30 * DAY, DAY)
+        self.daily_transactions = SlidingWindowCounter(DAY, 3600)
+        self.daily_successes = SlidingWindowCounter(DAY, 3600)
+        self.daily_gas = SlidingWindowCounter(DAY, 3600)
+    
+    def apply(self, event: Dict[str, Any]):
+        timestamp = event["timestamp"]
+        value = event.get("value", 0.0)
+        gas_used = event.get("gas_used", 0)
+        success = event.get("success", True)
+        
+        self.total_transactions += 1
+        self.total_gas += gas_used
+        self.total_gas_limit += event.get("gas_limit", gas_used)
+        self.total_fees += event.get("fee", 0.0)
+        self.total_confirmation_seconds += event.get("confirmation_seconds", 0.0)
+        self.daily_transactions.add(timestamp)
+        self.daily_gas.add(timestamp, gas_used)
+        if success:
+            # Volume só conta transações confirmadas com sucesso
+            self.successful_transactions += 1
+            self.total_volume += value
+            self.daily_successes.add(timestamp)
+            self.daily_volume.add(timestamp, value)
+            self.weekly_volume.add(timestamp, value)
+            self.monthly_volume.add(timestamp, value)
+        
+        user = event.get("user")
+        if user is not None:
+            count = self.user_transactions.pop(user, 0) + 1
+            self.user_transactions[user] = count
+            if count == 1:
+                self.unique_users += 1
+            elif count == 2:
+                self.returning_users += 1
+            if len(self.user_transactions) > self.max_tracked_users:
+                self.user_transactions.popitem(last=False)
+        if self.last_activity is None or timestamp > self.last_activity:
+            self.last_activity = timestamp
+    
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        transactions = self.total_transactions
+        users = self.unique_users
+        daily_transactions = self.daily_transactions.total(now)
+        return {
+            "total_transactions": transactions,
+            "total_volume": self.total_volume,
+            "active_users": users,
+            "average_gas_used": self.total_gas / transactions if transactions else 0.0,
+            "success_rate": self.successful_transactions / transactions if transactions else 0.0,
+            "daily_volume": self.daily_volume.total(now),
+            "weekly_volume": self.weekly_volume.total(now),
+            "monthly_volume": self.monthly_volume.total(now),
+            "daily_transactions": daily_transactions,
+            "daily_success_rate": self.daily_successes.total(now) / daily_transactions if daily_transactions else 0.0,
+            "daily_average_gas": self.daily_gas.total(now) / daily_transactions if daily_transactions else 0.0,
+            "avg_transaction_time": self.total_confirmation_seconds / transactions if transactions else 0.0,
+            "gas_efficiency": self.total_gas / self.total_gas_limit if self.total_gas_limit else 0.0,
+            "user_retention": self.returning_users / users if users else 0.0,
+            "revenue_generated": self.total_fees,
+            "last_activity": datetime.utcfromtimestamp(self.last_activity).isoformat() if self.last_activity else None
+        }
+
+class ContractAnalyticsProjector:
+    """
+    Projetor event-sourced de analytics de contratos
+    Consome o feed de eventos uma vez; leituras são snapshots O(1)
+    O cursor é o último bloco aplicado; eventos desse bloco são deduplicados
+    por log_index (ou tx_hash), então o bloco do cursor pode ser relido
+    """
+    
+    def __init__(self):
+        self.metrics: Dict[str, ContractMetrics] = {}
+        self.cursor = 0
+        self.events_applied = 0
+        self._cursor_keys = set()  # Eventos já aplicados do bloco do cursor
+    
+    def apply(self, event: Dict[str, Any]) -> bool:
+        """Aplicar evento; eventos já consumidos são ignorados"""
+        block_number = event.get("block_number")
+        if block_number is not None:
+            if block_number < self.cursor:
+                return False
+            key = event.get("log_index", event.get("tx_hash"))
+            if block_number > self.cursor:
+                self.cursor = block_number
+                self._cursor_keys = set()
+            elif key is not None and key in self._cursor_keys:
+                return False
+            if key is not None:
+                self._cursor_keys.add(key)
+        metrics = self.metrics.get(event["contract_id"])
+        if metrics is None:
+            metrics = self.metrics[event["contract_id"]] = ContractMetrics()
+        metrics.apply(event)
+        self.events_applied += 1
+        return True
+    
+    def apply_many(self, events: Iterable[Dict[str, Any]]) -> int:
+        applied = self.events_applied
+        for event in events:
+            self.apply(event)
+        return self.events_applied - applied
+    
+    def snapshot(self, contract_id: str, now: Optional[float] = None) -> Dict[str, Any]:
+        metrics = self.metrics.get(contract_id)
+        if metrics is None:
+            metrics = ContractMetrics()  # Contrato sem eventos ainda
+        return metrics.snapshot(now)
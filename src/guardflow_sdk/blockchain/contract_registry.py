@@ -0,0 +1,100 @@
+from typing import Dict, Any, List, Optional
+from bisect import bisect_right, bisect_left
+
+class ContractRegistry:
+    """
+    Registro indexado de contratos deployados
+    Índices por tipo, status e endereço; totais mantidos a cada alteração
+    """
+    
+    def __init__(self):
+        self.contracts: Dict[str, Dict[str, Any]] = {}
+        self._by_address: Dict[str, str] = {}
+        self._sequence_ids: Dict[int, str] = {}
+        self._sequences: Dict[str, int] = {}
+        # Listas ordenadas de sequências: paginação por cursor via bisect
+        self._all: List[int] = []
+        self._by_type: Dict[str, List[int]] = {}
+        self._by_status: Dict[str, List[int]] = {}
+        self._by_type_status: Dict[tuple, List[int]] = {}
+        self._next_sequence = 0
+        self.total_deployment_cost = 0.0
+        self.total_gas_used = 0
+        self.type_totals: Dict[str, Dict[str, float]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.contracts)
+    
+    def __contains__(self, contract_id: str) -> bool:
+        return contract_id in self.contracts
+    
+    def add(self, contract: Dict[str, Any]):
+        contract_id = contract["contract_id"]
+        if contract_id in self.contracts:
+            raise ValueError(f"Contract already registered: {contract_id}")
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        self.contracts[contract_id] = contract
+        self._sequences[contract_id] = sequence
+        self._sequence_ids[sequence] = contract_id
+        self._by_address[contract["contract_address"]] = contract_id
+        self._all.append(sequence)
+        self._by_type.setdefault(contract["contract_type"], []).append(sequence)
+        self._by_status.setdefault(contract["status"], []).append(sequence)
+        self._by_type_status.setdefault((contract["contract_type"], contract["status"]), []).append(sequence)
+        
+        self.total_deployment_cost += contract["deployment_cost"]
+        self.total_gas_used += contract["gas_used"]
+        totals = self.type_totals.setdefault(contract["contract_type"],
+                                             {"contracts": 0, "deployment_cost": 0.0, "gas_used": 0})
+        totals["contracts"] += 1
+        totals["deployment_cost"] += contract["deployment_cost"]
+        totals["gas_used"] += contract["gas_used"]
+    
+    def get(self, contract_id: str) -> Optional[Dict[str, Any]]:
+        return self.contracts.get(contract_id)
+    
+    def get_by_address(self, address: str) -> Optional[Dict[str, Any]]:
+        contract_id = self._by_address.get(address)
+        return self.contracts[contract_id] if contract_id else None
+    
+    def set_status(self, contract_id: str, status: str) -> bool:
+        contract = self.contracts.get(contract_id)
+        if contract is None:
+            return False
+        if contract["status"] == status:
+            return True
+        sequence = self._sequences[contract_id]
+        contract_type = contract["contract_type"]
+        self._move(self._by_status[contract["status"]], self._by_status.setdefault(status, []), sequence)
+        self._move(self._by_type_status[(contract_type, contract["status"])],
+                   self._by_type_status.setdefault((contract_type, status), []), sequence)
+        contract["status"] = status
+        return True
+    
+    def count(self, contract_type: Optional[str] = None, status: Optional[str] = None) -> int:
+        return len(self._index(contract_type, status))
+    
+    def page(self, contract_type: Optional[str] = None, status: Optional[str] = None,
+             cursor: Optional[int] = None, limit: int = 100) -> Dict[str, Any]:
+        """Página de contratos após o cursor (sequência do último item visto)"""
+        index = self._index(contract_type, status)
+        start = bisect_right(index, -1 if cursor is None else cursor)
+        sequences = index[start:start + limit]
+        contracts = [self.contracts[self._sequence_ids[sequence]] for sequence in sequences]
+        # Cursor só quando ainda há itens após a página
+        last_sequence = sequences[-1] if sequences and start + limit < len(index) else None
+        return {"contracts": contracts, "next_cursor": last_sequence}
+    
+    def _index(self, contract_type: Optional[str], status: Optional[str]) -> List[int]:
+        if contract_type is not None and status is not None:
+            return self._by_type_status.get((contract_type, status), [])
+        if contract_type is not None:
+            return self._by_type.get(contract_type, [])
+        if status is not None:
+            return self._by_status.get(status, [])
+        return self._all
+    
+    def _move(self, source: List[int], target: List[int], sequence: int):
+        del source[bisect_left(source, sequence)]
+        target.insert(bisect_left(target, sequence), sequence)
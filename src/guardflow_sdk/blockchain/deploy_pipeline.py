@@ -0,0 +1,64 @@
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor, Future
+import time
+from .tx_submitter import TransactionSubmitter
+
+class DeployPipeline:
+    """
+    Pipeline de deploy em lote
+    Bytecode compilado uma vez por tipo; envio concorrente pelo submitter
+    (nonces locais, bump de taxa e um único loop de confirmação)
+    """
+    
+    def __init__(self, submitter: TransactionSubmitter, compile_contract: Callable[[Any], str],
+                 max_workers: int = 16, timeout: float = 300.0):
+        self.submitter = submitter
+        self.compile_contract = compile_contract
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.bytecode_cache: Dict[Any, str] = {}
+    
+    @property
+    def address(self) -> str:
+        return self.submitter.signer
+    
+    def bytecode(self, contract_type) -> str:
+        bytecode = self.bytecode_cache.get(contract_type)
+        if bytecode is None:
+            bytecode = self.bytecode_cache[contract_type] = self.compile_contract(contract_type)
+        return bytecode
+    
+    def deploy(self, deployments: List[Tuple[Any, Dict[str, Any]]],
+               fee_level: str = "standard") -> List[Dict[str, Any]]:
+        """Deploy de uma lista de (tipo, config); resultados na ordem de entrada"""
+        if not deployments:
+            return []
+        
+        payloads = [
+            {"contract_type": contract_type, "bytecode": self.bytecode(contract_type), "config": config}
+            for contract_type, config in deployments
+        ]
+        # Assinatura e envio concorrentes; cada submit reserva o próprio nonce
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(payloads))) as executor:
+            futures = list(executor.map(lambda payload: self.submitter.submit(payload, fee_level), payloads))
+        
+        deadline = time.monotonic() + self.timeout
+        return [self._result(payload, future, deadline) for payload, future in zip(payloads, futures)]
+    
+    def _result(self, payload: Dict[str, Any], future: Future, deadline: float) -> Dict[str, Any]:
+        transaction = {"contract_type": payload["contract_type"], "config": payload["config"],
+                       "nonce": None, "gas_price": None}
+        result = {"transaction": transaction, "tx_hash": None, "receipt": None, "error": None}
+        try:
+            receipt = future.result(max(0.0, deadline - time.monotonic()))
+        except TimeoutError:
+            result["error"] = "Confirmation timeout"
+            return result
+        except Exception as exc:
+            result["error"] = str(exc)
+            return result
+        transaction["nonce"] = receipt["nonce"]
+        transaction["gas_price"] = receipt["gas_price"]
+        result["tx_hash"] = receipt["tx_hash"]
+        result["receipt"] = receipt
+        return result
@@ -1,9 +1,14 @@
 from typing import Dict, Any, List, Optional
 import httpx
-import random
 import hashlib
+import json
+import numpy as np
 from datetime import datetime
 from enum import Enum
+from .asset_registry import AssetRegistry, verify_inclusion
+from .asset_attributes import AssetAttributeStore
+from .staking import StakingEngine
+from .governance import GovernanceEngine, GovernanceError
 
 class ESGValueType(Enum):
     """Tipos de valor ESG"""
@@ -19,12 +24,18 @@ class ESGInvoiceAsset:
     Combina registro imutável + tokenização + staking + governança
     """
     
-    def __init__(self, client: httpx.Client, api_key: str = None):
+    def __init__(self, client: httpx.Client, api_key: str = None, registry_batch_size: int = 4096,
+                 attribute_backend: Optional[Dict[str, Dict[str, Any]]] = None):
         self.client = client
         self.api_key = api_key
         self.contract_address = "0xGuardFlowESG"
-        self.staking_pools = {}
-        self.governance_proposals = {}
+        self.registry = AssetRegistry(registry_batch_size)
+        self.attributes = AssetAttributeStore(attribute_backend)
+        self._invoice_hashes: Dict[str, str] = {}
+        self.staking = StakingEngine()
+        self.staking_pools = self.staking.pools
+        self.governance = GovernanceEngine()
+        self.governance_proposals = self.governance.proposals
     
     def mint_from_invoice(self, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -32,6 +43,10 @@ class ESGInvoiceAsset:
         """
         # Gerar hash único da nota fiscal
         invoice_hash = self._generate_invoice_hash(invoice_data)
+        # Sem número da nota não há identidade para deduplicar
+        has_identity = bool(invoice_data.get("invoice_number"))
+        if has_identity and invoice_hash in self._invoice_hashes:
+            return {"error": "Invoice already tokenized", "asset_id": self._invoice_hashes[invoice_hash]}
         
         # Calcular score ESG
         esg_score = self._calculate_esg_score(invoice_data)
@@ -42,8 +57,8 @@ class ESGInvoiceAsset:
         # Identificar créditos fiscais disponíveis
         tax_credits = self._identify_tax_credits(invoice_data)
         
-        # Criar asset ESG
-        asset_id = f"ESG_ASSET_{random.randint(100000, 999999)}"
+        # Criar asset ESG (ID sequencial no registro, único mesmo com milhões de notas)
+        asset_id = f"ESG_ASSET_{len(self.registry) + 1:06d}"
         
         asset_data = {
             "asset_id": asset_id,
@@ -53,58 +68,159 @@ class ESGInvoiceAsset:
             "carbon_offset_kg": invoice_data.get("carbon_offset_kg", 0),
             "fiscal_value": fiscal_value,
             "tax_credits_available": tax_credits,
-            "block_number": random.randint(1000000, 9999999),
-            "transaction_hash": f"0x{random.randint(100000, 999999)}",
+            "created_at": datetime.utcnow().isoformat()
+        }
+        
+        # Registro imutável: entrada encadeada, confirmada no próximo lote Merkle
+        entry = self.registry.append(asset_id, asset_data)
+        if has_identity:
+            self._invoice_hashes[invoice_hash] = asset_id
+        self.attributes.put(asset_id, asset_data)
+        
+        asset_data = dict(asset_data)
+        asset_data.update({
+            "registry_sequence": entry["sequence"],
+            "chain_hash": entry["chain_hash"],
+            "commit_status": "committed" if "batch" in entry else "pending",
             "immutable": True,
             "staking_enabled": True,
             "governance_voting": True,
-            "tradeable": True,
-            "created_at": datetime.utcnow().isoformat()
-        }
+            "tradeable": True
+        })
         
         return asset_data
     
+    def commit_assets(self) -> Dict[str, Any]:
+        """
+        Confirmar assets pendentes sob uma raiz Merkle (uma ancoragem por lote)
+        """
+        batch = self.registry.commit()
+        if batch is None:
+            return {"status": "nothing_to_commit", "pending": 0}
+        return batch
+    
+    def get_asset_proof(self, asset_id: str) -> Dict[str, Any]:
+        """
+        Obter prova de inclusão Merkle do asset
+        """
+        if asset_id not in self.registry:
+            return {"error": "Asset not found"}
+        proof = self.registry.proof(asset_id)
+        if proof is None:
+            return {"error": "Asset not committed yet", "asset_id": asset_id}
+        return proof
+    
+    def verify_asset_proof(self, proof: Dict[str, Any]) -> bool:
+        """
+        Verificar prova de inclusão offline, sem consultar o registro
+        """
+        return verify_inclusion(proof["record"], proof["proof"], proof["merkle_root"])
+    
     def stake_for_rewards(self, asset_id: str, amount: float, duration_days: int) -> Dict[str, Any]:
         """
         Staking de tokens ESG para rendimento
         """
+        attributes = self.attributes.get(asset_id)
+        if attributes is None:
+            return {"error": "Asset not found"}
+        
         # Calcular APY baseado no score ESG
-        esg_score = self._get_asset_esg_score(asset_id)
+        esg_score = attributes["esg_score"]
         base_apy = 8.0
         esg_bonus = (esg_score / 100.0) * 7.0  # Até 7% bônus
         total_apy = base_apy + esg_bonus
         
-        # Calcular recompensas
-        annual_reward = amount * (total_apy / 100.0)
-        duration_reward = annual_reward * (duration_days / 365.0)
+        if amount <= 0 or duration_days <= 0:
+            return {"error": "Amount and duration must be positive"}
         
-        staking_id = f"STAKE_{random.randint(100000, 999999)}"
+        # Posição registrada no motor de staking (indexada por vencimento)
+        # Mesmo relógio (time.time) do vencimento em process_matured_stakes
+        slot = self.staking.stake(asset_id, amount, total_apy, duration_days)
+        position = self.staking.position(slot)
         
         return {
-            "staking_id": staking_id,
+            "staking_id": f"STAKE_{slot + 1:06d}",
             "asset_id": asset_id,
             "amount_staked": amount,
             "duration_days": duration_days,
             "apy": total_apy,
-            "expected_reward": duration_reward,
+            "expected_reward": position["expected_reward"],
             "esg_bonus_apy": esg_bonus,
             "status": "active",
-            "created_at": datetime.utcnow().isoformat(),
-            "maturity_date": (datetime.utcnow().timestamp() + duration_days * 86400)
+            "created_at": datetime.utcfromtimestamp(position["created_at"]).isoformat(),
+            "maturity_date": position["maturity_date"]
+        }
+    
+    def get_stake(self, staking_id: str) -> Dict[str, Any]:
+        """
+        Consultar posição de staking
+        """
+        slot = self._staking_slot(staking_id)
+        if slot is None:
+            return {"error": "Stake not found"}
+        position = self.staking.position(slot)
+        position["staking_id"] = staking_id
+        return position
+    
+    def process_matured_stakes(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Liberar em lote as posições vencidas (chamar periodicamente)
+        """
+        released = self.staking.tick(now)
+        for stake in released:
+            stake["staking_id"] = f"STAKE_{stake.pop('slot') + 1:06d}"
+        return {
+            "released": released,
+            "released_count": len(released),
+            "rewards_paid": sum(stake["reward"] for stake in released),
+            "active_stakes": self.staking.active_count,
+            "next_maturity": self.staking.next_maturity()
+        }
+    
+    def create_governance_proposal(self, proposal_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Criar proposta de governança ESG
+        """
+        proposal_id = proposal_data.get("proposal_id") or f"PROP_{len(self.governance.proposals) + 1:03d}"
+        try:
+            proposal = self.governance.create(
+                proposal_id,
+                proposal_data.get("title", ""),
+                proposal_data.get("options"),
+                proposal_data.get("duration_days", 7)
+            )
+        except GovernanceError as exc:
+            return {"error": str(exc)}
+        
+        return {
+            "proposal_id": proposal.proposal_id,
+            "title": proposal.title,
+            "options": list(proposal.options),
+            "status": proposal.status,
+            "ends_at": proposal.ends_at,
+            "created_at": datetime.utcnow().isoformat()
         }
     
     def vote_on_proposal(self, asset_id: str, proposal_id: str, vote: str) -> Dict[str, Any]:
         """
         Votar em propostas de governança ESG
         """
+        attributes = self.attributes.get(asset_id)
+        if attributes is None:
+            return {"error": "Asset not found"}
+        
         # Calcular poder de voto baseado no score ESG
-        esg_score = self._get_asset_esg_score(asset_id)
+        esg_score = attributes["esg_score"]
         voting_power = esg_score / 100.0  # 0.0 a 1.0
         
-        vote_id = f"VOTE_{random.randint(100000, 999999)}"
+        # Apuração incremental; votos duplicados do mesmo asset são rejeitados
+        try:
+            proposal = self.governance.vote(proposal_id, asset_id, vote, voting_power)
+        except GovernanceError as exc:
+            return {"error": str(exc)}
         
         return {
-            "vote_id": vote_id,
+            "vote_id": f"VOTE_{proposal_id}_{len(proposal.votes):06d}",
             "asset_id": asset_id,
             "proposal_id": proposal_id,
             "vote": vote,
@@ -114,12 +230,42 @@ class ESGInvoiceAsset:
             "timestamp": datetime.utcnow().isoformat()
         }
     
+    def get_proposal_results(self, proposal_id: str) -> Dict[str, Any]:
+        """
+        Resultado corrente da proposta (totais mantidos a cada voto)
+        """
+        proposal = self.governance.proposals.get(proposal_id)
+        if proposal is None:
+            return {"error": "Proposal not found"}
+        return proposal.results()
+    
+    def checkpoint_proposal(self, proposal_id: str) -> Dict[str, Any]:
+        """
+        Gravar checkpoint dos totais da proposta
+        """
+        proposal = self.governance.proposals.get(proposal_id)
+        if proposal is None:
+            return {"error": "Proposal not found"}
+        return proposal.checkpoint()
+    
+    def finalize_proposal(self, proposal_id: str) -> Dict[str, Any]:
+        """
+        Encerrar proposta e obter o resultado final
+        """
+        try:
+            return self.governance.finalize(proposal_id)
+        except GovernanceError as exc:
+            return {"error": str(exc)}
+    
     def get_monetization_options(self, asset_id: str) -> Dict[str, Any]:
         """
         Obter opções de monetização do asset ESG
         """
-        esg_score = self._get_asset_esg_score(asset_id)
-        fiscal_value = self._get_asset_fiscal_value(asset_id)
+        attributes = self.attributes.get(asset_id)
+        if attributes is None:
+            return {"error": "Asset not found"}
+        esg_score = attributes["esg_score"]
+        fiscal_value = attributes["fiscal_value"]
         
         # Tokenização ESG
         tokenization_reward = fiscal_value * 0.03  # 3% base
@@ -134,7 +280,7 @@ class ESGInvoiceAsset:
         tax_credits = self._calculate_tax_credits(fiscal_value)
         
         # Carbon credits
-        carbon_credits = self._calculate_carbon_credits(asset_id)
+        carbon_credits = self._calculate_carbon_credits(esg_score)
         
         return {
             "asset_id": asset_id,
@@ -169,10 +315,51 @@ class ESGInvoiceAsset:
             "total_potential_value": tokenization_reward + staking_yield + governance_reward + tax_credits + carbon_credits
         }
     
+    def get_portfolio_monetization(self, asset_ids: List[str]) -> Dict[str, Any]:
+        """
+        Valorar as opções de monetização de um portfólio inteiro em uma passada vetorizada
+        """
+        attributes = self.attributes.get_many(asset_ids)
+        found_ids = [asset_id for asset_id in asset_ids if asset_id in attributes]
+        missing_ids = [asset_id for asset_id in asset_ids if asset_id not in attributes]
+        
+        count = len(found_ids)
+        esg_scores = np.fromiter((attributes[asset_id]["esg_score"] for asset_id in found_ids), dtype=np.float64, count=count)
+        fiscal_values = np.fromiter((attributes[asset_id]["fiscal_value"] for asset_id in found_ids), dtype=np.float64, count=count)
+        
+        # Mesmas regras de get_monetization_options, aplicadas por coluna
+        streams = {
+            "tokenization_reward": fiscal_values * 0.03,
+            "staking_yield": fiscal_values * 0.08 * (esg_scores / 100.0),
+            "governance_reward": esg_scores * 2,
+            "tax_credits": self._calculate_tax_credits(fiscal_values),
+            "carbon_credits": self._calculate_carbon_credits(esg_scores)
+        }
+        total_values = sum(streams.values()) if count else np.zeros(0)
+        
+        assets = {"asset_id": found_ids, "esg_score": esg_scores.tolist()}
+        assets.update((name, values.tolist()) for name, values in streams.items())
+        assets["total_potential_value"] = total_values.tolist()
+        
+        return {
+            "asset_count": count,
+            "missing_assets": missing_ids,
+            "assets": assets,
+            "totals": {name: float(values.sum()) for name, values in streams.items()},
+            "average_esg_score": float(esg_scores.mean()) if count else 0.0,
+            "total_potential_value": float(total_values.sum())
+        }
+    
     def _generate_invoice_hash(self, invoice_data: Dict[str, Any]) -> str:
-        """Gerar hash único da nota fiscal"""
-        invoice_string = f"{invoice_data.get('invoice_number', '')}{invoice_data.get('amount', 0)}{invoice_data.get('date', '')}"
-        return hashlib.sha256(invoice_string.encode()).hexdigest()[:16]
+        """Gerar hash único da nota fiscal (chave canônica: emissor, número, data, valor)"""
+        amount = invoice_data.get("amount")
+        key = json.dumps([
+            invoice_data.get("issuer"),
+            invoice_data.get("invoice_number"),
+            invoice_data.get("date"),
+            float(amount) if amount is not None else None
+        ], separators=(",", ":"))
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
     
     def _calculate_esg_score(self, invoice_data: Dict[str, Any]) -> float:
         """Calcular score ESG da nota fiscal"""
@@ -245,24 +432,23 @@ class ESGInvoiceAsset:
         
         return tax_credits
     
-    def _get_asset_esg_score(self, asset_id: str) -> float:
-        """Obter score ESG do asset"""
-        # Mock - em produção viria da blockchain
-        return random.uniform(60, 95)
+    def get_asset_attributes(self, asset_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Leitura em lote dos atributos (dashboards de monetização)"""
+        return self.attributes.get_many(asset_ids)
     
-    def _get_asset_fiscal_value(self, asset_id: str) -> float:
-        """Obter valor fiscal do asset"""
-        # Mock - em produção viria da blockchain
-        return random.uniform(100, 5000)
+    def _staking_slot(self, staking_id: str) -> Optional[int]:
+        if not staking_id.startswith("STAKE_") or not staking_id[6:].isdigit():
+            return None
+        slot = int(staking_id[6:]) - 1
+        return slot if 0 <= slot < len(self.staking) else None
     
     def _calculate_tax_credits(self, fiscal_value: float) -> float:
         """Calcular valor dos créditos fiscais"""
         return fiscal_value * 0.15  # 15% médio
     
-    def _calculate_carbon_credits(self, asset_id: str) -> float:
+    def _calculate_carbon_credits(self, esg_score: float) -> float:
         """Calcular créditos de carbono"""
-        # Mock - baseado no ESG score
-        esg_score = self._get_asset_esg_score(asset_id)
+        # Baseado no ESG score
         return esg_score * 0.5  # R$ 0.50 por ponto ESG
     
     def get_status(self) -> Dict[str, Any]:
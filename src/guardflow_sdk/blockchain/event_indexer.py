@@ -0,0 +1,198 @@
+from typing import Dict, Any, List, Optional
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cursor (id INTEGER PRIMARY KEY CHECK (id = 1), block_number INTEGER, block_hash TEXT);
+CREATE TABLE IF NOT EXISTS checkpoints (block_number INTEGER PRIMARY KEY, block_hash TEXT);
+CREATE TABLE IF NOT EXISTS transfers (block_number INTEGER, tx_hash TEXT, from_user TEXT, to_user TEXT, amount REAL, fee REAL, timestamp REAL);
+CREATE TABLE IF NOT EXISTS mints (block_number INTEGER, tx_hash TEXT, token_id TEXT, user_id TEXT, amount REAL);
+CREATE TABLE IF NOT EXISTS stakes (block_number INTEGER, tx_hash TEXT, stake_id TEXT, user_id TEXT, amount REAL, apy REAL, duration_days INTEGER);
+CREATE TABLE IF NOT EXISTS balances (user_id TEXT PRIMARY KEY, balance REAL NOT NULL DEFAULT 0, staked REAL NOT NULL DEFAULT 0);
+CREATE INDEX IF NOT EXISTS transfers_from ON transfers (from_user);
+CREATE INDEX IF NOT EXISTS transfers_to ON transfers (to_user);
+CREATE INDEX IF NOT EXISTS transfers_block ON transfers (block_number);
+CREATE INDEX IF NOT EXISTS mints_user ON mints (user_id);
+CREATE INDEX IF NOT EXISTS mints_token ON mints (token_id);
+CREATE INDEX IF NOT EXISTS mints_block ON mints (block_number);
+CREATE INDEX IF NOT EXISTS stakes_user ON stakes (user_id);
+CREATE INDEX IF NOT EXISTS stakes_block ON stakes (block_number);
+"""
+
+class ChainEventIndexer:
+    """
+    Indexador local de eventos da blockchain em SQLite
+    Segue a cadeia a partir de um cursor persistido, decodifica eventos em lote
+    e volta ao último checkpoint seguro em caso de reorg
+    """
+    
+    def __init__(self, chain, db_path: str = ":memory:", batch_size: int = 500,
+                 confirmations: int = 12, max_checkpoints: int = 64):
+        self.chain = chain
+        self.batch_size = batch_size
+        self.confirmations = confirmations
+        self.max_checkpoints = max_checkpoints
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(transfers)")]
+        if "timestamp" not in columns:
+            # Índices gravados antes da coluna de timestamp
+            self.db.execute("ALTER TABLE transfers ADD COLUMN timestamp REAL")
+        self._lock = threading.Lock()
+        self.reorgs = 0
+    
+    @property
+    def cursor(self) -> int:
+        row = self.db.execute("SELECT block_number FROM cursor WHERE id = 1").fetchone()
+        return row[0] if row else 0
+    
+    def sync(self, max_batches: Optional[int] = None) -> Dict[str, Any]:
+        """Indexar blocos novos até a cabeça da cadeia"""
+        with self._lock:
+            indexed = 0
+            rolled_back = 0
+            batches = 0
+            while max_batches is None or batches < max_batches:
+                cursor, cursor_hash = self._cursor()
+                head = self.chain.head_number()
+                if self.chain.block_hash(cursor) != cursor_hash:
+                    # Bloco do cursor saiu da cadeia canônica (reorg)
+                    rolled_back += self._rollback()
+                    continue
+                if cursor >= head:
+                    break
+                blocks = self.chain.get_blocks(cursor + 1, min(head, cursor + self.batch_size))
+                if not blocks:
+                    break
+                if blocks[0]["parent_hash"] != cursor_hash:
+                    rolled_back += self._rollback()
+                    continue
+                indexed += self._index_batch(blocks, head)
+                batches += 1
+            return {"indexed_blocks": indexed, "rolled_back_blocks": rolled_back, "cursor": self.cursor}
+    
+    def _cursor(self):
+        row = self.db.execute("SELECT block_number, block_hash FROM cursor WHERE id = 1").fetchone()
+        return row if row else (0, self.chain.block_hash(0))
+    
+    def _index_batch(self, blocks: List[Dict[str, Any]], head: int) -> int:
+        """Decodificar e gravar um lote de blocos em uma única transação"""
+        transfers, mints, stakes = [], [], []
+        deltas: Dict[str, List[float]] = {}
+        previous_hash = blocks[0]["parent_hash"]
+        for block in blocks:
+            if block["parent_hash"] != previous_hash:
+                # Cadeia mudou no meio do lote: indexa só o prefixo consistente
+                blocks = blocks[:blocks.index(block)]
+                break
+            previous_hash = block["hash"]
+            number = block["number"]
+            for event in block["events"]:
+                kind = event["type"]
+                if kind == "transfer":
+                    transfers.append((number, event["tx_hash"], event["from_user"], event["to_user"],
+                                      event["amount"], event.get("fee", 0.0), block.get("timestamp")))
+                    self._delta(deltas, event["from_user"], -(event["amount"] + event.get("fee", 0.0)), 0.0)
+                    self._delta(deltas, event["to_user"], event["amount"], 0.0)
+                elif kind == "mint":
+                    mints.append((number, event["tx_hash"], event["token_id"], event["user_id"], event["amount"]))
+                    self._delta(deltas, event["user_id"], event["amount"], 0.0)
+                elif kind == "stake":
+                    stakes.append((number, event["tx_hash"], event["stake_id"], event["user_id"],
+                                   event["amount"], event["apy"], event["duration_days"]))
+                    self._delta(deltas, event["user_id"], -event["amount"], event["amount"])
+        if not blocks:
+            return 0
+        
+        last = blocks[-1]
+        with self.db:
+            self.db.executemany("INSERT INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?)", transfers)
+            self.db.executemany("INSERT INTO mints VALUES (?, ?, ?, ?, ?)", mints)
+            self.db.executemany("INSERT INTO stakes VALUES (?, ?, ?, ?, ?, ?, ?)", stakes)
+            self._apply_deltas(deltas)
+            self.db.execute("INSERT OR REPLACE INTO cursor VALUES (1, ?, ?)", (last["number"], last["hash"]))
+            # Checkpoints seguros: blocos com confirmações suficientes
+            safe = [(block["number"], block["hash"]) for block in blocks
+                    if head - block["number"] >= self.confirmations]
+            if safe:
+                self.db.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?)", safe[-1])
+                self.db.execute(
+                    "DELETE FROM checkpoints WHERE block_number NOT IN "
+                    "(SELECT block_number FROM checkpoints ORDER BY block_number DESC LIMIT ?)",
+                    (self.max_checkpoints,)
+                )
+        return len(blocks)
+    
+    def _rollback(self) -> int:
+        """Voltar ao checkpoint mais recente que ainda está na cadeia canônica"""
+        self.reorgs += 1
+        target, target_hash = 0, self.chain.block_hash(0)
+        for number, block_hash in self.db.execute("SELECT block_number, block_hash FROM checkpoints ORDER BY block_number DESC"):
+            if self.chain.block_hash(number) == block_hash:
+                target, target_hash = number, block_hash
+                break
+        cursor = self.cursor
+        
+        deltas: Dict[str, List[float]] = {}
+        for from_user, to_user, amount, fee in self.db.execute(
+                "SELECT from_user, to_user, amount, fee FROM transfers WHERE block_number > ?", (target,)):
+            self._delta(deltas, from_user, amount + fee, 0.0)
+            self._delta(deltas, to_user, -amount, 0.0)
+        for user_id, amount in self.db.execute("SELECT user_id, amount FROM mints WHERE block_number > ?", (target,)):
+            self._delta(deltas, user_id, -amount, 0.0)
+        for user_id, amount in self.db.execute("SELECT user_id, amount FROM stakes WHERE block_number > ?", (target,)):
+            self._delta(deltas, user_id, amount, -amount)
+        
+        with self.db:
+            for table in ("transfers", "mints", "stakes", "checkpoints"):
+                self.db.execute(f"DELETE FROM {table} WHERE block_number > ?", (target,))
+            self._apply_deltas(deltas)
+            self.db.execute("INSERT OR REPLACE INTO cursor VALUES (1, ?, ?)", (target, target_hash))
+        return cursor - target
+    
+    def _delta(self, deltas: Dict[str, List[float]], user_id: str, balance: float, staked: float):
+        delta = deltas.get(user_id)
+        if delta is None:
+            delta = deltas[user_id] = [0.0, 0.0]
+        delta[0] += balance
+        delta[1] += staked
+    
+    def _apply_deltas(self, deltas: Dict[str, List[float]]):
+        self.db.executemany(
+            "INSERT INTO balances (user_id, balance, staked) VALUES (?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET balance = balance + excluded.balance, staked = staked + excluded.staked",
+            [(user_id, balance, staked) for user_id, (balance, staked) in deltas.items()]
+        )
+    
+    # Leituras: todas servidas pelo índice local
+    
+    def balance(self, user_id: str) -> Dict[str, float]:
+        row = self.db.execute("SELECT balance, staked FROM balances WHERE user_id = ?", (user_id,)).fetchone()
+        balance, staked = row if row else (0.0, 0.0)
+        return {"balance": balance, "staked": staked}
+    
+    def transfers(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        rows = self.db.execute(
+            "SELECT block_number, tx_hash, from_user, to_user, amount, fee, timestamp FROM transfers "
+            "WHERE from_user = ? UNION ALL SELECT block_number, tx_hash, from_user, to_user, amount, fee, timestamp "
+            "FROM transfers WHERE to_user = ? AND from_user != ? ORDER BY block_number DESC LIMIT ?",
+            (user_id, user_id, user_id, limit)
+        )
+        return [dict(zip(("block_number", "tx_hash", "from_user", "to_user", "amount", "fee", "timestamp"), row))
+                for row in rows]
+    
+    def stakes(self, user_id: str) -> List[Dict[str, Any]]:
+        rows = self.db.execute(
+            "SELECT block_number, tx_hash, stake_id, amount, apy, duration_days FROM stakes "
+            "WHERE user_id = ? ORDER BY block_number", (user_id,)
+        )
+        return [dict(zip(("block_number", "tx_hash", "stake_id", "amount", "apy", "duration_days"), row)) for row in rows]
+    
+    def token(self, token_id: str) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(
+            "SELECT block_number, tx_hash, token_id, user_id, amount FROM mints WHERE token_id = ?", (token_id,)
+        ).fetchone()
+        return dict(zip(("block_number", "tx_hash", "token_id", "user_id", "amount"), row)) if row else None
+    
+    def close(self):
+        self.db.close()
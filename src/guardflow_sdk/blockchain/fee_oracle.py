@@ -0,0 +1,133 @@
+from typing import Dict, Any, List, Optional, Callable
+from array import array
+import math
+import threading
+import time
+
+# Percentis servidos por nível de prioridade
+FEE_LEVELS = {"slow": 25, "standard": 50, "fast": 75, "urgent": 95}
+
+class FeeHistogram:
+    """
+    Histograma log-espaçado das últimas N amostras de taxa
+    Janela circular: cada amostra nova expira a mais antiga
+    """
+    
+    def __init__(self, window: int = 512, min_fee: float = 1e-9, max_fee: float = 1.0, buckets: int = 256):
+        self.window = window
+        self.min_fee = min_fee
+        self.buckets = buckets
+        self._log_min = math.log(min_fee)
+        self._log_step = (math.log(max_fee) - self._log_min) / buckets
+        self.counts = [0] * buckets
+        self._ring = array("H", [0] * window)
+        self._position = 0
+        self.size = 0
+    
+    def add(self, fee: float):
+        bucket = self._bucket(fee)
+        if self.size == self.window:
+            self.counts[self._ring[self._position]] -= 1
+        else:
+            self.size += 1
+        self._ring[self._position] = bucket
+        self._position = (self._position + 1) % self.window
+        self.counts[bucket] += 1
+    
+    def percentiles(self, levels: List[float]) -> List[float]:
+        """Limites superiores dos buckets que contêm cada percentil"""
+        targets = sorted((math.ceil(self.size * level / 100.0) or 1, level) for level in levels)
+        results: Dict[float, float] = {}
+        cumulative = 0
+        position = 0
+        for bucket, count in enumerate(self.counts):
+            cumulative += count
+            while position < len(targets) and cumulative >= targets[position][0]:
+                results[targets[position][1]] = self._upper_bound(bucket)
+                position += 1
+            if position == len(targets):
+                break
+        return [results.get(level, 0.0) for level in levels]
+    
+    def _bucket(self, fee: float) -> int:
+        if fee <= self.min_fee:
+            return 0
+        return min(self.buckets - 1, int((math.log(fee) - self._log_min) / self._log_step))
+    
+    def _upper_bound(self, bucket: int) -> float:
+        return math.exp(self._log_min + (bucket + 1) * self._log_step)
+
+class FeeOracle:
+    """
+    Oráculo local de taxas
+    Amostra a rede em background e serve estimativas da memória,
+    com amostragem síncrona quando o dado passa do limite de staleness
+    """
+    
+    def __init__(self, sample_fee: Callable[[], float], interval: float = 5.0,
+                 max_staleness: float = 30.0, window: int = 512, autostart: bool = True):
+        self.sample_fee = sample_fee
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self.autostart = autostart
+        self.histogram = FeeHistogram(window)
+        self.estimates: Dict[str, float] = {}
+        self.last_sample_at: Optional[float] = None
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False  # Após stop(), sem autostart: amostragem síncrona
+    
+    def start(self):
+        """Iniciar amostragem periódica em background"""
+        self._closed = False
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="fee-oracle", daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        self._closed = True
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def sample(self) -> float:
+        """Coletar uma amostra e recalcular as estimativas"""
+        fee = self.sample_fee()
+        with self._lock:
+            self.histogram.add(fee)
+            levels = list(FEE_LEVELS.values())
+            self.estimates = dict(zip(FEE_LEVELS, self.histogram.percentiles(levels)))
+            self.last_sample_at = time.monotonic()
+            self.samples += 1
+        return fee
+    
+    def estimate(self, level: str = "standard") -> float:
+        """Taxa estimada para o nível de prioridade (servida da memória)"""
+        if level not in FEE_LEVELS:
+            raise ValueError(f"Unknown fee level: {level}")
+        if self.autostart and self._thread is None and not self._closed:
+            self.start()
+        last_sample_at = self.last_sample_at
+        if last_sample_at is None or time.monotonic() - last_sample_at > self.max_staleness:
+            self.sample()
+        return self.estimates[level]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "estimates": dict(self.estimates),
+            "samples": self.samples,
+            "window_size": self.histogram.size,
+            "age_seconds": time.monotonic() - self.last_sample_at if self.last_sample_at is not None else None
+        }
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception:
+                pass  # Falha de amostragem: estimativa anterior continua valendo até ficar stale
+            self._stop.wait(self.interval)
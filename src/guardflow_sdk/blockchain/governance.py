@@ -0,0 +1,98 @@
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import hashlib
+import time
+
+class GovernanceError(Exception):
+    """Erro de votação em proposta de governança"""
+
+class Proposal:
+    """
+    Proposta de governança com apuração incremental
+    Cada voto atualiza os totais; o resultado corrente nunca exige recontagem
+    """
+    
+    def __init__(self, proposal_id: str, title: str, options: Sequence[str], ends_at: float):
+        self.proposal_id = proposal_id
+        self.title = title
+        self.options = tuple(options)
+        self.ends_at = ends_at
+        self.status = "open"
+        self.tallies: Dict[str, float] = {option: 0.0 for option in self.options}
+        self.counts: Dict[str, int] = {option: 0 for option in self.options}
+        self.total_power = 0.0
+        self.votes: Dict[str, Tuple[str, float]] = {}
+        self.checkpoints: List[Dict[str, Any]] = []
+        self._digest = hashlib.sha256(proposal_id.encode()).digest()
+    
+    def is_open(self, now: float) -> bool:
+        return self.status == "open" and now < self.ends_at
+    
+    def record(self, asset_id: str, option: str, power: float):
+        if option not in self.tallies:
+            raise GovernanceError(f"Invalid option: {option}")
+        if asset_id in self.votes:
+            raise GovernanceError("Asset already voted")
+        self.votes[asset_id] = (option, power)
+        self.tallies[option] += power
+        self.counts[option] += 1
+        self.total_power += power
+        # Digest encadeado dos votos, para auditar checkpoints
+        self._digest = hashlib.sha256(self._digest + f"{asset_id}|{option}|{power!r}".encode()).digest()
+    
+    def results(self) -> Dict[str, Any]:
+        leading = max(self.options, key=self.tallies.__getitem__) if self.votes else None
+        return {
+            "proposal_id": self.proposal_id,
+            "status": self.status,
+            "tallies": dict(self.tallies),
+            "vote_counts": dict(self.counts),
+            "total_votes": len(self.votes),
+            "total_voting_power": self.total_power,
+            "leading_option": leading
+        }
+    
+    def checkpoint(self) -> Dict[str, Any]:
+        """Snapshot dos totais atuais, com digest dos votos apurados"""
+        snapshot = self.results()
+        snapshot["checkpoint"] = len(self.checkpoints) + 1
+        snapshot["votes_digest"] = self._digest.hex()
+        snapshot["created_at"] = time.time()
+        self.checkpoints.append(snapshot)
+        return snapshot
+
+class GovernanceEngine:
+    """
+    Registro de propostas e apuração ponderada por poder de voto
+    """
+    
+    DEFAULT_OPTIONS = ("YES", "NO", "ABSTAIN")
+    
+    def __init__(self):
+        self.proposals: Dict[str, Proposal] = {}
+    
+    def create(self, proposal_id: str, title: str, options: Optional[Sequence[str]] = None,
+               duration_days: float = 7) -> Proposal:
+        if proposal_id in self.proposals:
+            raise GovernanceError("Proposal already exists")
+        proposal = Proposal(proposal_id, title, options or self.DEFAULT_OPTIONS, time.time() + duration_days * 86400)
+        self.proposals[proposal_id] = proposal
+        return proposal
+    
+    def vote(self, proposal_id: str, asset_id: str, option: str, power: float) -> Proposal:
+        proposal = self.proposals.get(proposal_id)
+        if proposal is None:
+            raise GovernanceError("Proposal not found")
+        if not proposal.is_open(time.time()):
+            raise GovernanceError("Proposal is closed")
+        proposal.record(asset_id, option, power)
+        return proposal
+    
+    def finalize(self, proposal_id: str) -> Dict[str, Any]:
+        """Encerrar proposta e gravar o checkpoint final"""
+        proposal = self.proposals.get(proposal_id)
+        if proposal is None:
+            raise GovernanceError("Proposal not found")
+        if proposal.status != "closed":
+            proposal.status = "closed"
+            proposal.checkpoint()
+        return proposal.checkpoints[-1]
@@ -0,0 +1,140 @@
+from typing import Dict, Any, List, Optional
+import hashlib
+import threading
+import time
+
+class LocalChain:
+    """
+    Cadeia local usada no lugar do nó RPC (desenvolvimento e testes)
+    Blocos com hash encadeado; permite simular reorgs
+    """
+    
+    GENESIS_HASH = "0x" + "0" * 64
+    
+    def __init__(self, name: str = "local"):
+        self.name = name
+        self.blocks: List[Dict[str, Any]] = []
+        self._pending: List[Dict[str, Any]] = []
+        self._tx_counter = 0
+        self._fork = 0
+        self._tx_blocks: Dict[str, int] = {}
+        self._nonces: Dict[str, int] = {}
+        self._mined_nonces = set()
+        self._lock = threading.Lock()
+    
+    def head_number(self) -> int:
+        return len(self.blocks)
+    
+    def block_hash(self, number: int) -> Optional[str]:
+        if number == 0:
+            return self.GENESIS_HASH
+        if 1 <= number <= len(self.blocks):
+            return self.blocks[number - 1]["hash"]
+        return None
+    
+    def get_blocks(self, start: int, end: int) -> List[Dict[str, Any]]:
+        """Blocos de start a end (inclusive), numeração a partir de 1"""
+        return self.blocks[max(start, 1) - 1:end]
+    
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+    
+    def submit(self, event: Dict[str, Any]) -> str:
+        """
+        Enfileirar evento para o próximo bloco; retorna o hash da transação
+        Eventos com signer/nonce substituem o pendente de mesmo nonce
+        """
+        with self._lock:
+            signer = event.get("signer")
+            if signer is not None:
+                nonce = event["nonce"]
+                if (signer, nonce) in self._mined_nonces:
+                    raise ValueError(f"Nonce {nonce} already used by {signer}")
+                self._pending = [pending for pending in self._pending
+                                 if (pending.get("signer"), pending.get("nonce")) != (signer, nonce)]
+                self._nonces[signer] = max(self._nonces.get(signer, 0), nonce + 1)
+            self._tx_counter += 1
+            tx_hash = "0x" + hashlib.sha256(f"{self.name}:{self._tx_counter}:{time.time()}".encode()).hexdigest()
+            self._pending.append(dict(event, tx_hash=tx_hash))
+            return tx_hash
+    
+    def transaction_count(self, address: str) -> int:
+        """Próximo nonce do signer, contando os pendentes"""
+        return self._nonces.get(address, 0)
+    
+    def get_receipts(self, tx_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Recibos das transações já incluídas em bloco"""
+        head = len(self.blocks)
+        receipts = {}
+        for tx_hash in tx_hashes:
+            number = self._tx_blocks.get(tx_hash)
+            if number is not None:
+                receipts[tx_hash] = {"status": 1, "block_number": number, "confirmations": head - number + 1}
+        return receipts
+    
+    def mine(self, min_gas_price: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Fechar bloco com os eventos pendentes
+        Com min_gas_price, transações abaixo da taxa ficam pendentes e
+        seguram os nonces seguintes do mesmo signer
+        """
+        with self._lock:
+            if min_gas_price is None:
+                events, self._pending = self._pending, []
+            else:
+                events, self._pending = self._select(min_gas_price)
+            number = len(self.blocks) + 1
+            parent_hash = self.block_hash(number - 1)
+            block_hash = "0x" + hashlib.sha256(
+                f"{parent_hash}:{number}:{self._fork}:{[event['tx_hash'] for event in events]}".encode()
+            ).hexdigest()
+            block = {"number": number, "hash": block_hash, "parent_hash": parent_hash,
+                     "timestamp": time.time(), "events": events}
+            self.blocks.append(block)
+            for event in events:
+                self._tx_blocks[event["tx_hash"]] = number
+                if event.get("signer") is not None:
+                    self._mined_nonces.add((event["signer"], event["nonce"]))
+            return block
+    
+    def _select(self, min_gas_price: float):
+        """Separar eventos incluídos no bloco dos que continuam pendentes"""
+        included, remaining = [], []
+        blocked = set()
+        for event in sorted(self._pending, key=lambda event: event.get("nonce", -1)):
+            signer = event.get("signer")
+            if signer is None:
+                included.append(event)
+            elif signer in blocked or event.get("gas_price", 0.0) < min_gas_price:
+                blocked.add(signer)
+                remaining.append(event)
+            else:
+                included.append(event)
+        return included, remaining
+    
+    def reorg(self, depth: int, replacement_blocks: Optional[int] = None) -> int:
+        """Descartar os últimos `depth` blocos e minerar um fork vazio no lugar"""
+        with self._lock:
+            # Não dá para descartar além da gênese
+            depth = max(0, min(depth, len(self.blocks)))
+            del self.blocks[len(self.blocks) - depth:]
+            self._fork += 1
+            self._reindex()
+        for _ in range(depth if replacement_blocks is None else replacement_blocks):
+            self.mine()
+        return self.head_number()
+    
+    def _reindex(self):
+        """Reconstruir índices de transações e nonces após reorg"""
+        self._tx_blocks = {}
+        self._mined_nonces = set()
+        self._nonces = {}
+        for block in self.blocks:
+            for event in block["events"]:
+                self._tx_blocks[event["tx_hash"]] = block["number"]
+                if event.get("signer") is not None:
+                    self._mined_nonces.add((event["signer"], event["nonce"]))
+        for event in [event for block in self.blocks for event in block["events"]] + self._pending:
+            if event.get("signer") is not None:
+                self._nonces[event["signer"]] = max(self._nonces.get(event["signer"], 0), event["nonce"] + 1)
@@ -0,0 +1,74 @@
+from typing import Dict, Callable, Optional, Set
+import threading
+
+class NonceManager:
+    """
+    Nonces por endereço gerenciados localmente (thread-safe)
+    Permite assinar e enviar várias transações em paralelo sem consultar a rede
+    Nonces devolvidos com outros ainda em voo viram lacunas, reusadas primeiro
+    """
+    
+    def __init__(self, fetch_nonce: Callable[[str], int]):
+        self.fetch_nonce = fetch_nonce
+        self._next: Dict[str, int] = {}
+        self._outstanding: Dict[str, Set[int]] = {}
+        self._gaps: Dict[str, Set[int]] = {}
+        self._lock = threading.Lock()
+    
+    def reserve(self, address: str, count: int = 1) -> int:
+        """Reservar um bloco contíguo de nonces; retorna o primeiro"""
+        with self._lock:
+            outstanding = self._outstanding.setdefault(address, set())
+            gaps = self._gaps.get(address)
+            if count == 1 and gaps:
+                # Preencher a lacuna mais antiga antes de avançar
+                start = min(gaps)
+                gaps.discard(start)
+                outstanding.add(start)
+                return start
+            start = self._next.get(address)
+            if start is None:
+                start = self.fetch_nonce(address)
+            self._next[address] = start + count
+            outstanding.update(range(start, start + count))
+            return start
+    
+    def release(self, address: str, nonce: int):
+        """
+        Devolver nonce não usado (envio falhou ou expirou)
+        Só recua o contador se for o último reservado; senão marca lacuna
+        """
+        with self._lock:
+            self._outstanding.get(address, set()).discard(nonce)
+            gaps = self._gaps.setdefault(address, set())
+            if nonce == self._next.get(address, 0) - 1:
+                self._next[address] = nonce
+                # Lacunas no topo também saem do contador
+                while self._next[address] - 1 in gaps:
+                    self._next[address] -= 1
+                    gaps.discard(self._next[address])
+            else:
+                gaps.add(nonce)
+    
+    def complete(self, address: str, nonce: int):
+        """Nonce consumido por uma transação confirmada"""
+        with self._lock:
+            self._outstanding.get(address, set()).discard(nonce)
+    
+    def in_flight(self, address: str) -> int:
+        return len(self._outstanding.get(address, ()))
+    
+    def peek(self, address: str) -> Optional[int]:
+        return self._next.get(address)
+    
+    def resync(self, address: str) -> Optional[int]:
+        """
+        Descartar o estado local e reler o nonce da rede (após lacunas)
+        Não faz nada enquanto houver nonces reservados em voo
+        """
+        with self._lock:
+            if self._outstanding.get(address):
+                return self._next.get(address)
+            self._gaps.pop(address, None)
+            self._next[address] = self.fetch_nonce(address)
+            return self._next[address]
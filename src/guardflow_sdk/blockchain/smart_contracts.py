@@ -1,8 +1,17 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import httpx
 import random
+import hashlib
+import time
 from datetime import datetime
 from enum import Enum
+from .nonces import NonceManager
+from .deploy_pipeline import DeployPipeline
+from .tx_submitter import TransactionSubmitter
+from .local_chain import LocalChain
+from .contract_registry import ContractRegistry
+from .contract_analytics import ContractAnalyticsProjector
+from .fee_oracle import FeeOracle
 
 class ContractType(Enum):
     """Tipos de smart contracts ESG"""
@@ -12,127 +21,136 @@ class ContractType(Enum):
     TAX_CREDIT = "tax_credit"
     CARBON_CREDIT = "carbon_credit"
 
+# Parâmetros de deploy por tipo de contrato
+CONTRACT_SPECS = {
+    ContractType.ESG_TOKEN: {"id_prefix": "ESG_TOKEN", "gas_range": (500000, 1000000), "deployment_cost": 0.02},
+    ContractType.STAKING_POOL: {"id_prefix": "STAKING_POOL", "gas_range": (300000, 600000), "deployment_cost": 0.012},
+    ContractType.GOVERNANCE: {"id_prefix": "GOVERNANCE", "gas_range": (400000, 800000), "deployment_cost": 0.016},
+    ContractType.TAX_CREDIT: {"id_prefix": "TAX_CREDIT", "gas_range": (200000, 400000), "deployment_cost": 0.008},
+    ContractType.CARBON_CREDIT: {"id_prefix": "CARBON_CREDIT", "gas_range": (250000, 500000), "deployment_cost": 0.010}
+}
+
 class SmartContracts:
     """
     Smart contracts ESG para blockchain própria
     Implementa contratos inteligentes para o ecossistema GuardFlow
     """
     
-    def __init__(self, client: httpx.Client, api_key: str = None):
+    def __init__(self, client: httpx.Client, api_key: str = None,
+                 deployer_address: str = "0xGuardFlowDeployer", max_workers: int = 16):
         self.client = client
         self.api_key = api_key
-        self.contract_registry = {}
-        self.deployed_contracts = {}
+        self.contract_registry = ContractRegistry()
+        self.deployed_contracts = self.contract_registry.contracts
+        self.deployer_address = deployer_address
+        self.chain = LocalChain("guardflow")  # Mock - em produção seria o nó RPC
+        self.nonces = NonceManager(self._fetch_chain_nonce)
+        self.fee_oracle = FeeOracle(self._sample_gas_price)
+        self.submitter = TransactionSubmitter(
+            deployer_address, self.nonces, self._send_raw_transaction, self._get_receipts, self.fee_oracle
+        )
+        self.pipeline = DeployPipeline(self.submitter, self._compile_contract, max_workers=max_workers)
+        self.analytics = ContractAnalyticsProjector()
+        self._sent_transactions: Dict[str, Dict[str, Any]] = {}
+        self._nonce_hashes: Dict[int, List[str]] = {}  # Hashes enviados por nonce (bumps incluídos)
     
-    def deploy_esg_token_contract(self, contract_config: Dict[str, Any]) -> Dict[str, Any]:
+    def deploy_contracts(self, deployments: List[Tuple[ContractType, Dict[str, Any]]]) -> Dict[str, Any]:
         """
-        Deploy do contrato ESG Token
+        Deploy em lote de vários contratos (onboarding de redes/mercados)
         """
-        contract_id = f"ESG_TOKEN_{random.randint(100000, 999999)}"
+        deployed = []
+        failed = []
+        for result in self.pipeline.deploy(deployments):
+            transaction = result["transaction"]
+            contract_type = transaction["contract_type"]
+            receipt = result["receipt"]
+            if receipt is None or not receipt.get("status"):
+                failed.append({
+                    "contract_type": contract_type.value,
+                    "config": transaction["config"],
+                    "nonce": transaction["nonce"],
+                    "deployment_tx": result["tx_hash"],
+                    "status": "pending" if result["error"] == "Confirmation timeout" else "failed",
+                    "error": result["error"] or "Deployment reverted"
+                })
+                continue
+            
+            spec = CONTRACT_SPECS[contract_type]
+            contract_id = f"{spec['id_prefix']}_{transaction['nonce']:06d}"
+            contract_data = {
+                "contract_id": contract_id,
+                "contract_type": contract_type.value,
+                "contract_address": receipt["contract_address"],
+                "deployment_tx": result["tx_hash"],
+                "nonce": transaction["nonce"],
+                "block_number": receipt["block_number"],
+                "gas_used": receipt["gas_used"],
+                "gas_price": transaction["gas_price"],
+                "deployment_cost": spec["deployment_cost"],
+                "config": transaction["config"],
+                "status": "deployed",
+                "deployed_at": datetime.utcnow().isoformat()
+            }
+            self.contract_registry.add(contract_data)
+            deployed.append(contract_data)
         
-        contract_data = {
-            "contract_id": contract_id,
-            "contract_type": ContractType.ESG_TOKEN.value,
-            "contract_address": f"0x{random.randint(100000, 999999)}",
-            "deployment_tx": f"0x{random.randint(100000, 999999)}",
-            "gas_used": random.randint(500000, 1000000),
-            "gas_price": 0.00002,
-            "deployment_cost": 0.02,
-            "config": contract_config,
-            "status": "deployed",
-            "deployed_at": datetime.utcnow().isoformat()
+        return {
+            "deployed": deployed,
+            "failed": failed,
+            "total_deployed": len(deployed),
+            "total_failed": len(failed),
+            "total_deployment_cost": sum(contract["deployment_cost"] for contract in deployed),
+            "total_gas_used": sum(contract["gas_used"] for contract in deployed)
         }
-        
-        self.deployed_contracts[contract_id] = contract_data
-        return contract_data
+    
+    def _deploy_single(self, contract_type: ContractType, config: Dict[str, Any]) -> Dict[str, Any]:
+        result = self.deploy_contracts([(contract_type, config)])
+        if result["failed"]:
+            return {"error": result["failed"][0]["error"]}
+        return result["deployed"][0]
+    
+    def deploy_esg_token_contract(self, contract_config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Deploy do contrato ESG Token
+        """
+        return self._deploy_single(ContractType.ESG_TOKEN, contract_config)
     
     def deploy_staking_pool_contract(self, pool_config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Deploy do contrato Staking Pool ESG
         """
-        contract_id = f"STAKING_POOL_{random.randint(100000, 999999)}"
-        
-        contract_data = {
-            "contract_id": contract_id,
-            "contract_type": ContractType.STAKING_POOL.value,
-            "contract_address": f"0x{random.randint(100000, 999999)}",
-            "deployment_tx": f"0x{random.randint(100000, 999999)}",
-            "gas_used": random.randint(300000, 600000),
-            "gas_price": 0.00002,
-            "deployment_cost": 0.012,
-            "config": pool_config,
-            "status": "deployed",
-            "deployed_at": datetime.utcnow().isoformat()
-        }
-        
-        self.deployed_contracts[contract_id] = contract_data
-        return contract_data
+        return self._deploy_single(ContractType.STAKING_POOL, pool_config)
     
     def deploy_governance_contract(self, governance_config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Deploy do contrato Governance ESG
         """
-        contract_id = f"GOVERNANCE_{random.randint(100000, 999999)}"
-        
-        contract_data = {
-            "contract_id": contract_id,
-            "contract_type": ContractType.GOVERNANCE.value,
-            "contract_address": f"0x{random.randint(100000, 999999)}",
-            "deployment_tx": f"0x{random.randint(100000, 999999)}",
-            "gas_used": random.randint(400000, 800000),
-            "gas_price": 0.00002,
-            "deployment_cost": 0.016,
-            "config": governance_config,
-            "status": "deployed",
-            "deployed_at": datetime.utcnow().isoformat()
-        }
-        
-        self.deployed_contracts[contract_id] = contract_data
-        return contract_data
+        return self._deploy_single(ContractType.GOVERNANCE, governance_config)
     
     def deploy_tax_credit_contract(self, tax_config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Deploy do contrato Tax Credit ESG
         """
-        contract_id = f"TAX_CREDIT_{random.randint(100000, 999999)}"
-        
-        contract_data = {
-            "contract_id": contract_id,
-            "contract_type": ContractType.TAX_CREDIT.value,
-            "contract_address": f"0x{random.randint(100000, 999999)}",
-            "deployment_tx": f"0x{random.randint(100000, 999999)}",
-            "gas_used": random.randint(200000, 400000),
-            "gas_price": 0.00002,
-            "deployment_cost": 0.008,
-            "config": tax_config,
-            "status": "deployed",
-            "deployed_at": datetime.utcnow().isoformat()
-        }
-        
-        self.deployed_contracts[contract_id] = contract_data
-        return contract_data
+        return self._deploy_single(ContractType.TAX_CREDIT, tax_config)
     
     def deploy_carbon_credit_contract(self, carbon_config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Deploy do contrato Carbon Credit ESG
         """
-        contract_id = f"CARBON_CREDIT_{random.randint(100000, 999999)}"
-        
-        contract_data = {
-            "contract_id": contract_id,
-            "contract_type": ContractType.CARBON_CREDIT.value,
-            "contract_address": f"0x{random.randint(100000, 999999)}",
-            "deployment_tx": f"0x{random.randint(100000, 999999)}",
-            "gas_used": random.randint(250000, 500000),
-            "gas_price": 0.00002,
-            "deployment_cost": 0.010,
-            "config": carbon_config,
-            "status": "deployed",
-            "deployed_at": datetime.utcnow().isoformat()
-        }
-        
-        self.deployed_contracts[contract_id] = contract_data
-        return contract_data
+        return self._deploy_single(ContractType.CARBON_CREDIT, carbon_config)
+    
+    def ingest_contract_events(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Aplicar eventos de contratos na projeção de analytics
+        """
+        applied = self.analytics.apply_many(events)
+        return {"events_applied": applied, "cursor": self.analytics.cursor}
+    
+    def sync_contract_events(self) -> Dict[str, Any]:
+        """
+        Consumir novos eventos do feed da blockchain a partir do cursor
+        """
+        return self.ingest_contract_events(self._fetch_contract_events(self.analytics.cursor))
     
     def get_contract_status(self, contract_id: str) -> Dict[str, Any]:
         """
@@ -142,29 +160,44 @@ class SmartContracts:
             return {"error": "Contract not found"}
         
         contract = self.deployed_contracts[contract_id]
+        metrics = self.analytics.snapshot(contract_id)
         
-        # Mock contract status
         return {
             "contract_id": contract_id,
             "status": contract["status"],
             "contract_address": contract["contract_address"],
-            "total_transactions": random.randint(100, 1000),
-            "total_volume": random.uniform(10000, 100000),
-            "active_users": random.randint(50, 500),
-            "last_activity": datetime.utcnow().isoformat()
+            "total_transactions": metrics["total_transactions"],
+            "total_volume": metrics["total_volume"],
+            "active_users": metrics["active_users"],
+            "last_activity": metrics["last_activity"]
         }
     
-    def get_all_contracts(self) -> Dict[str, Any]:
+    def get_all_contracts(self, contract_type: Optional[str] = None, status: Optional[str] = None,
+                          cursor: Optional[int] = None, limit: int = 100) -> Dict[str, Any]:
         """
-        Obter todos os contratos deployados
+        Obter contratos deployados (paginado, com filtros por tipo e status)
         """
+        registry = self.contract_registry
+        page = registry.page(contract_type, status, cursor, limit)
         return {
-            "total_contracts": len(self.deployed_contracts),
-            "contracts": list(self.deployed_contracts.values()),
-            "total_deployment_cost": sum(contract["deployment_cost"] for contract in self.deployed_contracts.values()),
-            "total_gas_used": sum(contract["gas_used"] for contract in self.deployed_contracts.values())
+            "total_contracts": len(registry),
+            "matching_contracts": registry.count(contract_type, status),
+            "contracts": page["contracts"],
+            "next_cursor": page["next_cursor"],
+            "total_deployment_cost": registry.total_deployment_cost,
+            "total_gas_used": registry.total_gas_used,
+            "totals_by_type": registry.type_totals
         }
     
+    def get_contract_by_address(self, contract_address: str) -> Dict[str, Any]:
+        """
+        Obter contrato pelo endereço
+        """
+        contract = self.contract_registry.get_by_address(contract_address)
+        if contract is None:
+            return {"error": "Contract not found"}
+        return contract
+    
     def upgrade_contract(self, contract_id: str, new_version: str) -> Dict[str, Any]:
         """
         Upgrade de contrato para nova versão
@@ -193,26 +226,106 @@ class SmartContracts:
         if contract_id not in self.deployed_contracts:
             return {"error": "Contract not found"}
         
-        # Mock analytics
+        metrics = self.analytics.snapshot(contract_id)
         return {
             "contract_id": contract_id,
             "analytics": {
-                "total_transactions": random.randint(1000, 10000),
-                "total_volume": random.uniform(100000, 1000000),
-                "active_users": random.randint(100, 1000),
-                "average_gas_used": random.randint(50000, 150000),
-                "success_rate": random.uniform(0.95, 0.99),
-                "daily_volume": random.uniform(1000, 10000),
-                "weekly_volume": random.uniform(10000, 100000),
-                "monthly_volume": random.uniform(100000, 1000000)
+                "total_transactions": metrics["total_transactions"],
+                "total_volume": metrics["total_volume"],
+                "active_users": metrics["active_users"],
+                "average_gas_used": metrics["average_gas_used"],
+                "success_rate": metrics["success_rate"],
+                "daily_volume": metrics["daily_volume"],
+                "weekly_volume": metrics["weekly_volume"],
+                "monthly_volume": metrics["monthly_volume"],
+                "daily_success_rate": metrics["daily_success_rate"],
+                "daily_average_gas": metrics["daily_average_gas"]
             },
             "performance_metrics": {
-                "avg_transaction_time": random.uniform(2, 10),
-                "gas_efficiency": random.uniform(0.85, 0.95),
-                "user_retention": random.uniform(0.70, 0.90),
-                "revenue_generated": random.uniform(5000, 50000)
+                "avg_transaction_time": metrics["avg_transaction_time"],
+                "gas_efficiency": metrics["gas_efficiency"],
+                "user_retention": metrics["user_retention"],
+                "revenue_generated": metrics["revenue_generated"]
             }
         }
     
+    def _compile_contract(self, contract_type: ContractType) -> str:
+        """Compilar bytecode do contrato"""
+        # Mock - em produção viria do compilador Solidity
+        return "0x" + hashlib.sha256(f"guardflow:{contract_type.value}".encode()).hexdigest() * 8
+    
+    def _sample_gas_price(self) -> float:
+        """Preço de gas atual da rede"""
+        # Mock - em produção viria de eth_gasPrice / eth_feeHistory
+        return 0.00002 * random.lognormvariate(0, 0.25)
+    
+    def _fetch_chain_nonce(self, address: str) -> int:
+        """Nonce atual do endereço na rede"""
+        # Mock - em produção viria de eth_getTransactionCount (pending)
+        return self.chain.transaction_count(address)
+    
+    def _send_raw_transaction(self, transaction: Dict[str, Any]) -> str:
+        """Assinar e enviar transação de deploy"""
+        # Mock - em produção: assinatura local + eth_sendRawTransaction
+        contract_type = transaction["payload"]["contract_type"]
+        tx_hash = self.chain.submit({
+            "type": "deploy",
+            "contract_type": contract_type.value,
+            "signer": transaction["from"],
+            "nonce": transaction["nonce"],
+            "gas_price": transaction["gas_price"]
+        })
+        self._sent_transactions[tx_hash] = transaction
+        self._nonce_hashes.setdefault(transaction["nonce"], []).append(tx_hash)
+        return tx_hash
+    
+    def _get_receipts(self, tx_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Consultar recibos de várias transações em uma chamada"""
+        # Mock - em produção: batch JSON-RPC de eth_getTransactionReceipt
+        if self.chain.pending_count:
+            self.chain.mine()
+        receipts = self.chain.get_receipts(tx_hashes)
+        for tx_hash, receipt in receipts.items():
+            transaction = self._sent_transactions[tx_hash]
+            gas_low, gas_high = CONTRACT_SPECS[transaction["payload"]["contract_type"]]["gas_range"]
+            receipt["contract_address"] = "0x" + hashlib.sha256(tx_hash.encode()).hexdigest()[:40]
+            receipt["gas_used"] = random.randint(gas_low, gas_high)
+            # Recibo consumido: descartar este hash e as versões substituídas do nonce
+            for sent_hash in self._nonce_hashes.pop(transaction["nonce"], ()):
+                self._sent_transactions.pop(sent_hash, None)
+        return receipts
+    
+    def _fetch_contract_events(self, from_block: int) -> List[Dict[str, Any]]:
+        """Eventos de contratos após o bloco informado"""
+        # Mock - em produção viria de eth_getLogs a partir do cursor
+        events = []
+        block_number = from_block
+        now = time.time()
+        for position, contract_id in enumerate(
+                random.sample(list(self.deployed_contracts), min(50, len(self.deployed_contracts)))):
+            # Vários eventos por bloco, como nos logs reais
+            if position % 5 == 0:
+                block_number += 1
+            gas_limit = random.randint(60000, 160000)
+            events.append({
+                "contract_id": contract_id,
+                "block_number": block_number,
+                "log_index": position % 5,
+                "user": f"0x{random.randint(1, 500):040x}",
+                "value": random.uniform(10, 1000),
+                "gas_used": int(gas_limit * random.uniform(0.85, 0.95)),
+                "gas_limit": gas_limit,
+                "fee": random.uniform(0.5, 5),
+                "success": random.random() < 0.97,
+                "confirmation_seconds": random.uniform(2, 10),
+                "timestamp": now
+            })
+        return events
+    
+    def close(self):
+        """Parar a amostragem de taxas e o loop de confirmação em background"""
+        self.submitter.stop()
+        self.fee_oracle.stop()
+    
     def get_status(self) -> Dict[str, Any]:
         return {"status": "active", "module": "smart_contracts"}
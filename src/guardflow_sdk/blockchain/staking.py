@@ -0,0 +1,87 @@
+from typing import Dict, Any, List, Optional
+from array import array
+import heapq
+import time
+
+# Estados compactos de cada posição
+ACTIVE, MATURED = 0, 1
+
+class StakingEngine:
+    """
+    Posições de staking ESG em colunas compactas
+    Min-heap por vencimento: cada tick libera só o que venceu, sem varrer as ativas
+    """
+    
+    def __init__(self):
+        self.asset_ids: List[str] = []
+        self.amounts = array("d")
+        self.apys = array("d")
+        self.rewards = array("d")
+        self.created_at = array("d")
+        self.maturities = array("d")
+        self.status = bytearray()
+        self.pools: Dict[str, Dict[str, Any]] = {}
+        self.active_count = 0
+        self.total_staked = 0.0
+        self._maturity_heap: List[tuple] = []
+    
+    def __len__(self) -> int:
+        return len(self.asset_ids)
+    
+    def stake(self, asset_id: str, amount: float, apy: float, duration_days: int,
+              now: Optional[float] = None) -> int:
+        """Abrir posição; retorna o slot da posição"""
+        now = time.time() if now is None else now
+        maturity = now + duration_days * 86400
+        slot = len(self.asset_ids)
+        self.asset_ids.append(asset_id)
+        self.amounts.append(amount)
+        self.apys.append(apy)
+        self.rewards.append(amount * (apy / 100.0) * (duration_days / 365.0))
+        self.created_at.append(now)
+        self.maturities.append(maturity)
+        self.status.append(ACTIVE)
+        heapq.heappush(self._maturity_heap, (maturity, slot))
+        
+        pool = self.pools.get(asset_id)
+        if pool is None:
+            pool = self.pools[asset_id] = {"total_staked": 0.0, "active_stakes": 0, "rewards_paid": 0.0}
+        pool["total_staked"] += amount
+        pool["active_stakes"] += 1
+        self.active_count += 1
+        self.total_staked += amount
+        return slot
+    
+    def tick(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Liberar em lote todas as posições vencidas até agora"""
+        now = time.time() if now is None else now
+        heap = self._maturity_heap
+        released = []
+        while heap and heap[0][0] <= now:
+            _, slot = heapq.heappop(heap)
+            self.status[slot] = MATURED
+            asset_id = self.asset_ids[slot]
+            amount = self.amounts[slot]
+            reward = self.rewards[slot]
+            pool = self.pools[asset_id]
+            pool["total_staked"] -= amount
+            pool["active_stakes"] -= 1
+            pool["rewards_paid"] += reward
+            self.active_count -= 1
+            self.total_staked -= amount
+            released.append({"slot": slot, "asset_id": asset_id, "amount": amount, "reward": reward})
+        return released
+    
+    def next_maturity(self) -> Optional[float]:
+        return self._maturity_heap[0][0] if self._maturity_heap else None
+    
+    def position(self, slot: int) -> Dict[str, Any]:
+        return {
+            "asset_id": self.asset_ids[slot],
+            "amount_staked": self.amounts[slot],
+            "apy": self.apys[slot],
+            "expected_reward": self.rewards[slot],
+            "created_at": self.created_at[slot],
+            "maturity_date": self.maturities[slot],
+            "status": "matured" if self.status[slot] == MATURED else "active"
+        }
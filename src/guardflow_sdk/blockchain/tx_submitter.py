@@ -0,0 +1,206 @@
+from typing import Dict, Any, List, Optional, Callable
+from concurrent.futures import Future
+import threading
+import time
+from .nonces import NonceManager
+from .fee_oracle import FeeOracle
+
+class PendingTransaction:
+    __slots__ = ("transaction", "hashes", "gas_prices", "future", "submitted_at", "sent_at", "bumps")
+    
+    def __init__(self, transaction: Dict[str, Any], tx_hash: str, future: Future, now: float):
+        self.transaction = transaction
+        self.hashes = [tx_hash]
+        self.gas_prices = [transaction["gas_price"]]
+        self.future = future
+        self.submitted_at = now
+        self.sent_at = now
+        self.bumps = 0
+
+class TransactionSubmitter:
+    """
+    Envio concorrente de transações de um signer
+    Nonces locais, janela limitada de transações em voo, bump de taxa para
+    transações presas e um único loop de confirmação que resolve os futures
+    """
+    
+    def __init__(self, signer: str, nonces: NonceManager,
+                 send_transaction: Callable[[Dict[str, Any]], str],
+                 get_receipts: Callable[[List[str]], Dict[str, Dict[str, Any]]],
+                 fee_oracle: FeeOracle, max_in_flight: int = 64, confirmations: int = 1,
+                 poll_interval: float = 1.0, min_poll_interval: float = 0.05,
+                 bump_after: float = 30.0, bump_factor: float = 1.125, max_bumps: int = 5,
+                 timeout: float = 600.0):
+        self.signer = signer
+        self.nonces = nonces
+        self.send_transaction = send_transaction
+        self.get_receipts = get_receipts
+        self.fee_oracle = fee_oracle
+        self.max_in_flight = max_in_flight
+        self.confirmations = confirmations
+        self.poll_interval = poll_interval
+        self.min_poll_interval = min_poll_interval
+        self.bump_after = bump_after
+        self.bump_factor = bump_factor
+        self.max_bumps = max_bumps
+        self.timeout = timeout
+        self.pending: Dict[int, PendingTransaction] = {}
+        self.stats = {"submitted": 0, "confirmed": 0, "bumped": 0, "failed": 0}
+        self._window = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._tracker: Optional[threading.Thread] = None
+        self._closed = False
+    
+    def submit(self, payload: Dict[str, Any], fee_level: str = "standard") -> Future:
+        """Assinar e enviar; o future resolve com o recibo confirmado"""
+        future: Future = Future()
+        if self._closed:
+            self._fail(future, RuntimeError("Transaction submitter is closed"))
+            return future
+        self._window.acquire()  # Bloqueia quando a janela em voo está cheia
+        nonce = self.nonces.reserve(self.signer)
+        transaction = {
+            "from": self.signer,
+            "nonce": nonce,
+            "gas_price": self.fee_oracle.estimate(fee_level),
+            "payload": payload
+        }
+        with self._lock:
+            collision = nonce in self.pending
+        if collision:
+            # Nunca substituir outra transação em voo com o mesmo nonce
+            self._window.release()
+            self._fail(future, ValueError(f"Nonce {nonce} already in flight"))
+            return future
+        try:
+            tx_hash = self.send_transaction(transaction)
+        except Exception as exc:
+            self._window.release()
+            # Nonce sem transação: devolvido ao manager (ou vira lacuna)
+            self.nonces.release(self.signer, nonce)
+            self._fail(future, exc)
+            return future
+        
+        with self._lock:
+            closed = self._closed
+            collision = nonce in self.pending
+            if not (closed or collision):
+                self.pending[nonce] = PendingTransaction(transaction, tx_hash, future, time.monotonic())
+                self.stats["submitted"] += 1
+        if closed:
+            # Fechado durante o envio: ninguém mais acompanharia a confirmação
+            self._window.release()
+            self.nonces.release(self.signer, nonce)
+            self._fail(future, RuntimeError("Transaction submitter is closed"))
+            return future
+        if collision:
+            self._window.release()
+            self._fail(future, ValueError(f"Nonce {nonce} already in flight"))
+            return future
+        self._ensure_tracker()
+        self._wake.set()
+        return future
+    
+    def submit_many(self, payloads: List[Dict[str, Any]], fee_level: str = "standard") -> List[Future]:
+        return [self.submit(payload, fee_level) for payload in payloads]
+    
+    def poll(self) -> int:
+        """Uma rodada do loop: recibos de todas as pendentes + bump das presas"""
+        with self._lock:
+            by_hash = {tx_hash: (nonce, position) for nonce, pending in self.pending.items()
+                       for position, tx_hash in enumerate(pending.hashes)}
+        if not by_hash:
+            return 0
+        
+        receipts = self.get_receipts(list(by_hash))
+        now = time.monotonic()
+        resolved = []
+        with self._lock:
+            for tx_hash, receipt in receipts.items():
+                if not receipt or receipt.get("confirmations", 0) < self.confirmations:
+                    continue
+                nonce, position = by_hash[tx_hash]
+                pending = self.pending.pop(nonce, None)
+                if pending is not None:
+                    # Pode confirmar uma versão anterior ao bump: taxa daquele hash
+                    resolved.append((pending, dict(receipt, tx_hash=tx_hash, nonce=nonce,
+                                                   gas_price=pending.gas_prices[position], bumps=pending.bumps)))
+            stuck = [pending for pending in self.pending.values() if now - pending.sent_at >= self.bump_after]
+            expired = [nonce for nonce, pending in self.pending.items() if now - pending.submitted_at >= self.timeout]
+            expired_pending = [self.pending.pop(nonce) for nonce in expired]
+            self.stats["confirmed"] += len(resolved)
+            self.stats["failed"] += len(expired_pending)
+        
+        for pending, receipt in resolved:
+            self._window.release()
+            self.nonces.complete(self.signer, receipt["nonce"])
+            pending.future.set_result(receipt)
+        for pending in expired_pending:
+            self._window.release()
+            # Só este nonce volta ao manager; as demais pendentes seguem intactas
+            self.nonces.release(self.signer, pending.transaction["nonce"])
+            pending.future.set_exception(TimeoutError(f"Transaction {pending.hashes[-1]} not confirmed"))
+        for pending in stuck:
+            if pending.bumps < self.max_bumps and not pending.future.done():
+                self._bump(pending, now)
+        return len(resolved)
+    
+    def stop(self):
+        """Encerrar o loop de confirmação; pendentes falham e não há reinício"""
+        self._closed = True
+        self._stop.set()
+        self._wake.set()
+        if self._tracker is not None:
+            self._tracker.join()
+            self._tracker = None
+        with self._lock:
+            abandoned = list(self.pending.values())
+            self.pending.clear()
+            self.stats["failed"] += len(abandoned)
+        for pending in abandoned:
+            self._window.release()
+            self.nonces.release(self.signer, pending.transaction["nonce"])
+            pending.future.set_exception(RuntimeError("Transaction submitter is closed"))
+    
+    def _fail(self, future: Future, exc: Exception):
+        with self._lock:
+            self.stats["failed"] += 1
+        future.set_exception(exc)
+    
+    def _bump(self, pending: PendingTransaction, now: float):
+        """Reenviar com o mesmo nonce e taxa maior (substituição)"""
+        transaction = dict(pending.transaction)
+        transaction["gas_price"] = max(transaction["gas_price"] * self.bump_factor, self.fee_oracle.estimate("fast"))
+        try:
+            tx_hash = self.send_transaction(transaction)
+        except Exception:
+            return  # Tenta de novo na próxima rodada
+        with self._lock:
+            pending.transaction = transaction
+            pending.hashes.append(tx_hash)
+            pending.gas_prices.append(transaction["gas_price"])
+            pending.sent_at = now
+            pending.bumps += 1
+            self.stats["bumped"] += 1
+    
+    def _ensure_tracker(self):
+        if self._tracker is None or not self._tracker.is_alive():
+            with self._lock:
+                if self._closed:
+                    return
+                if self._tracker is None or not self._tracker.is_alive():
+                    self._stop.clear()
+                    self._tracker = threading.Thread(target=self._track, name=f"tx-tracker-{self.signer}", daemon=True)
+                    self._tracker.start()
+    
+    def _track(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                self.poll()
+            except Exception:
+                pass  # Falha de RPC: a próxima rodada tenta de novo
+            self._stop.wait(self.min_poll_interval)
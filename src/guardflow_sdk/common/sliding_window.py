@@ -0,0 +1,42 @@
+from typing import Optional
+import time
+
+class SlidingWindowCounter:
+    """
+    Contador em janela deslizante com buckets fixos
+    Memória constante: window_seconds / bucket_seconds posições
+    """
+    
+    def __init__(self, window_seconds: int = 3600, bucket_seconds: int = 60):
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = max(1, window_seconds // bucket_seconds)
+        self._counts = [0.0] * self.num_buckets
+        self._total = 0.0
+        self._head = -1  # epoch do bucket mais recente
+    
+    def add(self, timestamp: float, value: float = 1.0):
+        """Somar valor ao bucket do timestamp"""
+        epoch = int(timestamp // self.bucket_seconds)
+        self._advance(epoch)
+        if epoch <= self._head - self.num_buckets:
+            return  # Evento fora da janela
+        slot = epoch % self.num_buckets
+        self._counts[slot] += value
+        self._total += value
+    
+    def total(self, now: Optional[float] = None) -> float:
+        """Total acumulado na janela atual"""
+        now = time.time() if now is None else now
+        self._advance(int(now // self.bucket_seconds))
+        return self._total
+    
+    def _advance(self, epoch: int):
+        """Expirar buckets que saíram da janela"""
+        if epoch <= self._head:
+            return
+        start = max(self._head + 1, epoch - self.num_buckets + 1)
+        for e in range(start, epoch + 1):
+            slot = e % self.num_buckets
+            self._total -= self._counts[slot]
+            self._counts[slot] = 0.0
+        self._head = epoch
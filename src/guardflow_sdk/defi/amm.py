@@ -0,0 +1,168 @@
+from typing import Dict, Any, Tuple, Union
+from decimal import Decimal, Context, ROUND_DOWN
+import numpy as np
+
+# Precisão das contas do AMM; arredondamento sempre a favor do pool
+AMM_CONTEXT = Context(prec=50, rounding=ROUND_DOWN)
+
+Number = Union[Decimal, float, int, str]
+
+def to_decimal(value: Number) -> Decimal:
+    """Converter para Decimal sem herdar o erro binário do float"""
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+class AMMError(Exception):
+    pass
+
+class ConstantProductPool:
+    """
+    Pool de produto constante (x·y = k) com contas em Decimal
+    A taxa de swap fica nas reservas e remunera os provedores de liquidez
+    """
+    
+    def __init__(self, token_a: str, token_b: str, fee_rate: Number = "0.003"):
+        self.token_a = token_a
+        self.token_b = token_b
+        self.fee_rate = to_decimal(fee_rate)
+        self.reserve_a = Decimal(0)
+        self.reserve_b = Decimal(0)
+        self.total_shares = Decimal(0)
+        self.fees_a = Decimal(0)
+        self.fees_b = Decimal(0)
+        # Taxa acumulada por share, para apurar as taxas de cada posição
+        self.fee_growth_a = Decimal(0)
+        self.fee_growth_b = Decimal(0)
+        self.volume_a = Decimal(0)
+        self.volume_b = Decimal(0)
+    
+    def reserves(self, token_in: str) -> Tuple[Decimal, Decimal]:
+        """Reservas (entrada, saída) para a direção do swap"""
+        if token_in == self.token_a:
+            return self.reserve_a, self.reserve_b
+        if token_in == self.token_b:
+            return self.reserve_b, self.reserve_a
+        raise AMMError(f"Token {token_in} not in pool")
+    
+    def spot_price(self, token_in: str) -> Decimal:
+        reserve_in, reserve_out = self.reserves(token_in)
+        if reserve_in == 0:
+            return Decimal(0)
+        return AMM_CONTEXT.divide(reserve_out, reserve_in)
+    
+    def quote(self, token_in: str, amount_in: Number) -> Dict[str, Decimal]:
+        """Saída de um swap sem alterar o pool"""
+        amount_in = to_decimal(amount_in)
+        if amount_in <= 0:
+            raise AMMError("Swap amount must be positive")
+        reserve_in, reserve_out = self.reserves(token_in)
+        if reserve_in == 0 or reserve_out == 0:
+            raise AMMError("Pool has no liquidity")
+        
+        ctx = AMM_CONTEXT
+        fee = ctx.multiply(amount_in, self.fee_rate)
+        amount_in_after_fee = ctx.subtract(amount_in, fee)
+        amount_out = ctx.divide(ctx.multiply(reserve_out, amount_in_after_fee),
+                                ctx.add(reserve_in, amount_in_after_fee))
+        spot = ctx.divide(reserve_out, reserve_in)
+        return {
+            "amount_in": amount_in,
+            "amount_out": amount_out,
+            "fee": fee,
+            "execution_price": ctx.divide(amount_out, amount_in),
+            "price_impact": 1 - ctx.divide(ctx.divide(amount_out, amount_in), spot)
+        }
+    
+    def swap(self, token_in: str, amount_in: Number, min_amount_out: Number = 0) -> Dict[str, Decimal]:
+        """Executar swap; a entrada inteira (com taxa) vai para a reserva"""
+        quote = self.quote(token_in, amount_in)
+        if quote["amount_out"] < to_decimal(min_amount_out):
+            raise AMMError("Insufficient output amount")
+        if token_in == self.token_a:
+            self.reserve_a += quote["amount_in"]
+            self.reserve_b -= quote["amount_out"]
+            self.fees_a += quote["fee"]
+            self.fee_growth_a += AMM_CONTEXT.divide(quote["fee"], self.total_shares)
+            self.volume_a += quote["amount_in"]
+        else:
+            self.reserve_b += quote["amount_in"]
+            self.reserve_a -= quote["amount_out"]
+            self.fees_b += quote["fee"]
+            self.fee_growth_b += AMM_CONTEXT.divide(quote["fee"], self.total_shares)
+            self.volume_b += quote["amount_in"]
+        return quote
+    
+    def add_liquidity(self, amount_a: Number, amount_b: Number) -> Dict[str, Decimal]:
+        """
+        Depositar liquidez e emitir shares proporcionais
+        Fora da proporção das reservas só a parte proporcional é usada
+        """
+        amount_a, amount_b = to_decimal(amount_a), to_decimal(amount_b)
+        if amount_a <= 0 or amount_b <= 0:
+            raise AMMError("Liquidity amounts must be positive")
+        
+        ctx = AMM_CONTEXT
+        if self.total_shares == 0:
+            used_a, used_b = amount_a, amount_b
+            shares = ctx.sqrt(ctx.multiply(amount_a, amount_b))
+        else:
+            optimal_b = ctx.divide(ctx.multiply(amount_a, self.reserve_b), self.reserve_a)
+            if optimal_b <= amount_b:
+                used_a, used_b = amount_a, optimal_b
+            else:
+                used_a, used_b = ctx.divide(ctx.multiply(amount_b, self.reserve_a), self.reserve_b), amount_b
+            shares = min(ctx.divide(ctx.multiply(used_a, self.total_shares), self.reserve_a),
+                         ctx.divide(ctx.multiply(used_b, self.total_shares), self.reserve_b))
+        if shares <= 0:
+            raise AMMError("Insufficient liquidity minted")
+        
+        self.reserve_a += used_a
+        self.reserve_b += used_b
+        self.total_shares += shares
+        return {"shares": shares, "amount_a": used_a, "amount_b": used_b,
+                "refund_a": amount_a - used_a, "refund_b": amount_b - used_b}
+    
+    def remove_liquidity(self, shares: Number) -> Dict[str, Decimal]:
+        """Queimar shares e devolver a fração correspondente das reservas"""
+        shares = to_decimal(shares)
+        if shares <= 0 or shares > self.total_shares:
+            raise AMMError("Invalid share amount")
+        ctx = AMM_CONTEXT
+        amount_a = ctx.divide(ctx.multiply(self.reserve_a, shares), self.total_shares)
+        amount_b = ctx.divide(ctx.multiply(self.reserve_b, shares), self.total_shares)
+        self.reserve_a -= amount_a
+        self.reserve_b -= amount_b
+        self.total_shares -= shares
+        return {"shares": shares, "amount_a": amount_a, "amount_b": amount_b}
+    
+    def quote_batch(self, token_in: str, amounts_in) -> Dict[str, np.ndarray]:
+        """
+        Cotação vetorizada de vários tamanhos de swap (float64)
+        Para roteamento; a execução continua em Decimal
+        """
+        amounts_in = np.asarray(amounts_in, dtype=np.float64)
+        if np.any(amounts_in <= 0):
+            raise AMMError("Swap amount must be positive")
+        reserve_in, reserve_out = (float(reserve) for reserve in self.reserves(token_in))
+        if reserve_in == 0 or reserve_out == 0:
+            raise AMMError("Pool has no liquidity")
+        after_fee = amounts_in * (1.0 - float(self.fee_rate))
+        amounts_out = reserve_out * after_fee / (reserve_in + after_fee)
+        execution_price = amounts_out / amounts_in
+        return {
+            "amounts_in": amounts_in,
+            "amounts_out": amounts_out,
+            "fees": amounts_in * float(self.fee_rate),
+            "price_impact": 1.0 - execution_price / (reserve_out / reserve_in)
+        }
+    
+    def state(self) -> Dict[str, Any]:
+        return {
+            "reserve_a": float(self.reserve_a),
+            "reserve_b": float(self.reserve_b),
+            "total_shares": float(self.total_shares),
+            "fees_a": float(self.fees_a),
+            "fees_b": float(self.fees_b),
+            "price_a_in_b": float(self.spot_price(self.token_a))
+        }
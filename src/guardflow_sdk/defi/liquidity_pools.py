@@ -1,8 +1,12 @@
 from typing import Dict, Any, List, Optional
 import httpx
 import random
+import time
 from datetime import datetime, timedelta
 from enum import Enum
+from .amm import ConstantProductPool, AMMError, to_decimal
+from .swap_router import SwapRouter
+from .pool_timeseries import PoolAnalyticsStore
 
 class PoolType(Enum):
     """Tipos de pools de liquidez ESG"""
@@ -21,6 +25,9 @@ class LiquidityPools:
         self.client = client
         self.api_key = api_key
         self.pools = {}
+        self.amm: Dict[str, ConstantProductPool] = {}
+        self.router = SwapRouter()
+        self.analytics = PoolAnalyticsStore()
         self.user_positions = {}
     
     def create_esg_pool(self, pool_config: Dict[str, Any]) -> Dict[str, Any]:
@@ -40,7 +47,7 @@ class LiquidityPools:
             "esg_bonus_apy": random.uniform(5, 15),  # 5-15% bônus ESG
             "total_apy": 0,  # Calculado automaticamente
             "total_liquidity": 0,
-            "total_fees": 0,
+            "total_fees": 0,  # Em unidades do token_a
             "active_users": 0,
             "status": "active",
             "created_at": datetime.utcnow().isoformat()
@@ -49,7 +56,18 @@ class LiquidityPools:
         # Calcular APY total
         pool_data["total_apy"] = pool_data["apy"] + pool_data["esg_bonus_apy"]
         
+        amm = ConstantProductPool(pool_data["token_a"], pool_data["token_b"], pool_data["fee_rate"])
+        initial_liquidity = to_decimal(pool_data["initial_liquidity"])
+        if initial_liquidity > 0:
+            # Liquidez inicial do protocolo, metade em cada token ao preço inicial
+            initial_price = to_decimal(pool_config.get("initial_price", 1))
+            amount_a = initial_liquidity / 2
+            amm.add_liquidity(amount_a, amount_a * initial_price)
+        
+        self.amm[pool_id] = amm
+        self.router.add_pool(pool_id, amm)
         self.pools[pool_id] = pool_data
+        self._sync_pool(pool_id)
         return pool_data
     
     def add_liquidity(self, pool_id: str, user_id: str, amount_a: float, amount_b: float) -> Dict[str, Any]:
@@ -61,12 +79,12 @@ class LiquidityPools:
         
         pool = self.pools[pool_id]
         
-        # Calcular shares do usuário
-        total_liquidity = pool["total_liquidity"]
-        if total_liquidity == 0:
-            user_shares = amount_a + amount_b
-        else:
-            user_shares = (amount_a + amount_b) / total_liquidity * pool["total_liquidity"]
+        # Shares proporcionais às reservas (x·y = k)
+        try:
+            minted = self.amm[pool_id].add_liquidity(amount_a, amount_b)
+        except AMMError as exc:
+            return {"error": str(exc)}
+        amount_a, amount_b = float(minted["amount_a"]), float(minted["amount_b"])
         
         position_id = f"POSITION_{random.randint(100000, 999999)}"
         
@@ -76,8 +94,13 @@ class LiquidityPools:
             "user_id": user_id,
             "amount_a": amount_a,
             "amount_b": amount_b,
-            "shares": user_shares,
-            "share_percentage": (user_shares / (total_liquidity + amount_a + amount_b)) * 100,
+            "refund_a": float(minted["refund_a"]),
+            "refund_b": float(minted["refund_b"]),
+            # Shares e taxa por share na entrada ficam em Decimal, como no AMM
+            "shares": minted["shares"],
+            "fee_growth_a": self.amm[pool_id].fee_growth_a,
+            "fee_growth_b": self.amm[pool_id].fee_growth_b,
+            "share_percentage": float(minted["shares"] / self.amm[pool_id].total_shares) * 100,
             "apy": pool["total_apy"],
             "expected_annual_reward": (amount_a + amount_b) * (pool["total_apy"] / 100),
             "status": "active",
@@ -85,15 +108,15 @@ class LiquidityPools:
         }
         
         # Atualizar pool
-        pool["total_liquidity"] += amount_a + amount_b
         pool["active_users"] += 1
+        self._sync_pool(pool_id)
         
         # Registrar posição do usuário
         if user_id not in self.user_positions:
             self.user_positions[user_id] = []
         self.user_positions[user_id].append(position_data)
         
-        return position_data
+        return self._position_view(position_data)
     
     def remove_liquidity(self, position_id: str, user_id: str, shares_to_remove: float) -> Dict[str, Any]:
         """
@@ -112,16 +135,35 @@ class LiquidityPools:
         
         pool_id = position["pool_id"]
         pool = self.pools[pool_id]
+        amm = self.amm[pool_id]
+        requested = to_decimal(shares_to_remove)
+        if float(requested) == float(position["shares"]):
+            # Valor lido da resposta (float): retira a posição inteira, sem poeira
+            requested = position["shares"]
+        if requested <= 0 or requested > position["shares"]:
+            return {"error": "Invalid share amount"}
         
-        # Calcular valores a retirar
-        total_shares = pool["total_liquidity"]
-        withdrawal_ratio = shares_to_remove / position["shares"]
-        
-        amount_a_to_remove = position["amount_a"] * withdrawal_ratio
-        amount_b_to_remove = position["amount_b"] * withdrawal_ratio
+        # Fração das reservas; taxas acumuladas já estão nas reservas
+        burned = min(requested, amm.total_shares)
+        # Taxas das shares queimadas desde a entrada da posição (parte do valor retirado)
+        fees_earned_a = float(burned * (amm.fee_growth_a - position["fee_growth_a"]))
+        fees_earned_b = float(burned * (amm.fee_growth_b - position["fee_growth_b"]))
+        price_a_in_b = float(amm.spot_price(amm.token_a))
+        try:
+            removed = amm.remove_liquidity(burned)
+        except AMMError as exc:
+            return {"error": str(exc)}
+        amount_a_to_remove, amount_b_to_remove = float(removed["amount_a"]), float(removed["amount_b"])
+        fees_earned = fees_earned_a + (fees_earned_b / price_a_in_b if price_a_in_b else 0.0)
         
-        # Calcular fees acumuladas
-        fees_earned = (position["shares"] / total_shares) * pool["total_fees"]
+        withdrawal_ratio = float(requested / position["shares"])
+        position["amount_a"] -= position["amount_a"] * withdrawal_ratio
+        position["amount_b"] -= position["amount_b"] * withdrawal_ratio
+        position["shares"] -= requested
+        if position["shares"] <= 0:
+            position["status"] = "closed"
+            pool["active_users"] -= 1
+        self._sync_pool(pool_id)
         
         return {
             "position_id": position_id,
@@ -129,12 +171,65 @@ class LiquidityPools:
             "user_id": user_id,
             "amount_a_removed": amount_a_to_remove,
             "amount_b_removed": amount_b_to_remove,
-            "fees_earned": fees_earned,
-            "total_withdrawal": amount_a_to_remove + amount_b_to_remove + fees_earned,
+            "fees_earned_a": fees_earned_a,
+            "fees_earned_b": fees_earned_b,
+            "fees_earned": fees_earned,  # Em unidades do token_a
+            "total_withdrawal": amount_a_to_remove + amount_b_to_remove,
             "status": "completed",
             "removed_at": datetime.utcnow().isoformat()
         }
     
+    def quote_swap(self, pool_id: str, token_in: str, amount_in: float) -> Dict[str, Any]:
+        """Cotação de swap sem alterar o pool"""
+        if pool_id not in self.amm:
+            return {"error": "Pool not found"}
+        try:
+            quote = self.amm[pool_id].quote(token_in, amount_in)
+        except AMMError as exc:
+            return {"error": str(exc)}
+        return dict({key: float(value) for key, value in quote.items()}, pool_id=pool_id, token_in=token_in)
+    
+    def quote_swap_batch(self, pool_id: str, token_in: str, amounts_in: List[float]) -> Dict[str, Any]:
+        """Cotação vetorizada de vários tamanhos de swap contra o pool"""
+        if pool_id not in self.amm:
+            return {"error": "Pool not found"}
+        try:
+            quotes = self.amm[pool_id].quote_batch(token_in, amounts_in)
+        except AMMError as exc:
+            return {"error": str(exc)}
+        return dict({key: values.tolist() for key, values in quotes.items()}, pool_id=pool_id, token_in=token_in)
+    
+    def swap(self, pool_id: str, user_id: str, token_in: str, amount_in: float,
+             min_amount_out: float = 0) -> Dict[str, Any]:
+        """
+        Swap no pool ESG; a taxa fica nas reservas e soma em fees_a/fees_b
+        """
+        if pool_id not in self.pools:
+            return {"error": "Pool not found"}
+        
+        pool = self.pools[pool_id]
+        amm = self.amm[pool_id]
+        try:
+            executed = amm.swap(token_in, amount_in, min_amount_out)
+        except AMMError as exc:
+            return {"error": str(exc)}
+        self._sync_pool(pool_id, token_in, executed)
+        
+        return {
+            "swap_id": f"SWAP_{random.randint(100000, 999999)}",
+            "pool_id": pool_id,
+            "user_id": user_id,
+            "token_in": token_in,
+            "token_out": amm.token_b if token_in == amm.token_a else amm.token_a,
+            "amount_in": float(executed["amount_in"]),
+            "amount_out": float(executed["amount_out"]),
+            "fee": float(executed["fee"]),
+            "execution_price": float(executed["execution_price"]),
+            "price_impact": float(executed["price_impact"]),
+            "status": "completed",
+            "executed_at": datetime.utcnow().isoformat()
+        }
+    
     def harvest_rewards(self, position_id: str, user_id: str) -> Dict[str, Any]:
         """
         Colher recompensas do yield farming ESG
@@ -156,7 +251,7 @@ class LiquidityPools:
         # Calcular recompensas acumuladas
         days_staked = (datetime.utcnow() - datetime.fromisoformat(position["created_at"].replace('Z', '+00:00'))).days
         daily_apy = pool["total_apy"] / 365
-        rewards_earned = position["shares"] * daily_apy * days_staked
+        rewards_earned = float(position["shares"]) * daily_apy * days_staked
         
         # Bônus ESG baseado no score do usuário
         user_esg_score = self._get_user_esg_score(user_id)
@@ -174,6 +269,66 @@ class LiquidityPools:
             "harvested_at": datetime.utcnow().isoformat()
         }
     
+    def quote_route(self, token_in: str, token_out: str, amount_in: float) -> Dict[str, Any]:
+        """Melhor rota multi-hop (ex.: ESG -> GST -> CARBON) para o valor"""
+        if token_in == token_out:
+            return {"error": "Tokens must differ"}
+        route = self.router.best_route(token_in, token_out, amount_in)
+        if route is None:
+            return {"error": "No route found"}
+        return {
+            "token_in": token_in,
+            "token_out": token_out,
+            "tokens": route["tokens"],
+            "pools": [hop[0] for hop in route["path"]],
+            "amount_in": amount_in,
+            "amount_out": route["amount_out"]
+        }
+    
+    def swap_route(self, user_id: str, token_in: str, token_out: str, amount_in: float,
+                   min_amount_out: float = 0) -> Dict[str, Any]:
+        """
+        Swap pela melhor rota multi-hop
+        A rota é recotada em Decimal antes de executar qualquer hop
+        """
+        if token_in == token_out:
+            return {"error": "Tokens must differ"}
+        route = self.router.best_route(token_in, token_out, amount_in)
+        if route is None:
+            return {"error": "No route found"}
+        
+        amount = to_decimal(amount_in)
+        try:
+            for pool_id, hop_in, _ in route["path"]:
+                amount = self.amm[pool_id].quote(hop_in, amount)["amount_out"]
+        except AMMError as exc:
+            return {"error": str(exc)}
+        if amount < to_decimal(min_amount_out):
+            return {"error": "Insufficient output amount"}
+        
+        hops = []
+        amount = to_decimal(amount_in)
+        for pool_id, hop_in, hop_out in route["path"]:
+            executed = self.amm[pool_id].swap(hop_in, amount)
+            self._sync_pool(pool_id, hop_in, executed)
+            hops.append({"pool_id": pool_id, "token_in": hop_in, "token_out": hop_out,
+                         "amount_in": float(executed["amount_in"]), "amount_out": float(executed["amount_out"]),
+                         "fee": float(executed["fee"])})
+            amount = executed["amount_out"]
+        
+        return {
+            "swap_id": f"SWAP_{random.randint(100000, 999999)}",
+            "user_id": user_id,
+            "token_in": token_in,
+            "token_out": token_out,
+            "tokens": route["tokens"],
+            "amount_in": amount_in,
+            "amount_out": float(amount),
+            "hops": hops,
+            "status": "completed",
+            "executed_at": datetime.utcnow().isoformat()
+        }
+    
     def get_pool_analytics(self, pool_id: str) -> Dict[str, Any]:
         """
         Obter analytics do pool ESG
@@ -182,28 +337,50 @@ class LiquidityPools:
             return {"error": "Pool not found"}
         
         pool = self.pools[pool_id]
+        day = self.analytics.aggregate(pool_id, 86400)
+        week = self.analytics.aggregate(pool_id, 7 * 86400)
+        month = self.analytics.aggregate(pool_id, 30 * 86400)
         
         return {
             "pool_id": pool_id,
             "analytics": {
                 "total_liquidity": pool["total_liquidity"],
                 "total_fees": pool["total_fees"],
+                "fees_a": pool["fees_a"],
+                "fees_b": pool["fees_b"],
                 "active_users": pool["active_users"],
                 "apy": pool["apy"],
                 "esg_bonus_apy": pool["esg_bonus_apy"],
                 "total_apy": pool["total_apy"],
-                "daily_volume": random.uniform(1000, 10000),
-                "weekly_volume": random.uniform(10000, 100000),
-                "monthly_volume": random.uniform(100000, 1000000)
+                "daily_volume": day["volume"],
+                "weekly_volume": week["volume"],
+                "monthly_volume": month["volume"],
+                "daily_fees": day["fees"],
+                "monthly_fees": month["fees"],
+                "monthly_active_users": month["active_users"]
             },
             "performance": {
                 "fee_earnings": pool["total_fees"],
-                "liquidity_growth": random.uniform(0.05, 0.25),
+                "liquidity_growth": (month["liquidity_end"] / month["liquidity_start"] - 1) if month["liquidity_start"] else 0.0,
                 "user_retention": random.uniform(0.80, 0.95),
                 "esg_impact": random.uniform(0.70, 0.90)
             }
         }
     
+    def get_pool_history(self, pool_id: str, resolution: str = "1h", hours: int = 24) -> Dict[str, Any]:
+        """Série de volume, liquidez, taxas e usuários do pool para gráfico"""
+        if pool_id not in self.pools:
+            return {"error": "Pool not found"}
+        return self.get_pools_history([pool_id], resolution, hours).get(pool_id, {"error": "No history"})
+    
+    def get_pools_history(self, pool_ids: List[str], resolution: str = "1h", hours: int = 24) -> Dict[str, Any]:
+        """Séries de vários pools de uma vez (buckets pré-agregados)"""
+        end = time.time()
+        try:
+            return self.analytics.chart(pool_ids, resolution, end - hours * 3600, end)
+        except ValueError as exc:
+            return {"error": str(exc)}
+    
     def get_user_positions(self, user_id: str) -> Dict[str, Any]:
         """
         Obter posições do usuário
@@ -221,7 +398,7 @@ class LiquidityPools:
             # Calcular recompensas acumuladas
             days_staked = (datetime.utcnow() - datetime.fromisoformat(position["created_at"].replace('Z', '+00:00'))).days
             daily_apy = pool["total_apy"] / 365
-            rewards = position["shares"] * daily_apy * days_staked
+            rewards = float(position["shares"]) * daily_apy * days_staked
             total_rewards += rewards
         
         return {
@@ -229,7 +406,7 @@ class LiquidityPools:
             "total_positions": len(positions),
             "total_value": total_value,
             "total_rewards": total_rewards,
-            "positions": positions
+            "positions": [self._position_view(position) for position in positions]
         }
     
     def get_all_pools(self) -> Dict[str, Any]:
@@ -244,6 +421,31 @@ class LiquidityPools:
             "pools": list(self.pools.values())
         }
     
+    def _position_view(self, position: Dict[str, Any]) -> Dict[str, Any]:
+        """Cópia da posição para resposta: campos Decimal internos viram float"""
+        return dict(position, shares=float(position["shares"]),
+                    fee_growth_a=float(position["fee_growth_a"]), fee_growth_b=float(position["fee_growth_b"]))
+    
+    def _sync_pool(self, pool_id: str, token_in: Optional[str] = None, executed: Optional[Dict[str, Any]] = None):
+        """Refletir o estado do AMM no registro do pool e na série temporal"""
+        pool = self.pools[pool_id]
+        amm = self.amm[pool_id]
+        state = amm.state()
+        pool.update(state)
+        pool["total_liquidity"] = state["reserve_a"] + state["reserve_b"]
+        self.router.invalidate(pool_id)
+        
+        # Volume e taxas do swap em unidades do token_a (preço de execução)
+        volume, fees = 0.0, 0.0
+        if executed is not None:
+            if token_in == amm.token_a:
+                volume, fees = float(executed["amount_in"]), float(executed["fee"])
+            else:
+                volume = float(executed["amount_out"])
+                fees = float(executed["fee"]) * float(executed["amount_out"] / executed["amount_in"])
+        pool["total_fees"] += fees
+        self.analytics.record(pool_id, volume, fees, pool["total_liquidity"], pool["active_users"])
+    
     def _get_user_esg_score(self, user_id: str) -> float:
         """Obter score ESG do usuário"""
         # Mock - em produção viria da blockchain
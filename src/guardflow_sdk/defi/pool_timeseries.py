@@ -0,0 +1,150 @@
+from typing import Dict, Any, List, Optional
+from array import array
+import time
+import numpy as np
+
+# Resoluções: (segundos por bucket, buckets mantidos)
+ROLLUPS = {
+    "1m": (60, 1440),     # 1 dia
+    "1h": (3600, 720),    # 30 dias
+    "1d": (86400, 730)    # 2 anos
+}
+
+class RollupSeries:
+    """
+    Buckets agregados em anel de tamanho fixo
+    volume e fees somam; liquidity guarda o último valor; active_users o máximo
+    """
+    
+    def __init__(self, bucket_seconds: int, capacity: int):
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self.epochs = array("q", [-1] * capacity)
+        self.volume = array("d", [0.0] * capacity)
+        self.fees = array("d", [0.0] * capacity)
+        self.liquidity = array("d", [0.0] * capacity)
+        self.active_users = array("l", [0] * capacity)
+    
+    def add(self, timestamp: float, volume: float, fees: float, liquidity: float, active_users: int):
+        epoch = int(timestamp // self.bucket_seconds)
+        slot = epoch % self.capacity
+        current = self.epochs[slot]
+        if current > epoch:
+            return  # Bucket já reciclado por um período mais novo
+        if current != epoch:
+            self.epochs[slot] = epoch
+            self.volume[slot] = 0.0
+            self.fees[slot] = 0.0
+            self.active_users[slot] = 0
+        self.volume[slot] += volume
+        self.fees[slot] += fees
+        self.liquidity[slot] = liquidity
+        if active_users > self.active_users[slot]:
+            self.active_users[slot] = active_users
+    
+    def window(self, start: float, end: float) -> Dict[str, np.ndarray]:
+        """Buckets de start a end em ordem cronológica"""
+        epochs = np.frombuffer(self.epochs, dtype=np.int64)
+        mask = (epochs >= int(start // self.bucket_seconds)) & (epochs <= int(end // self.bucket_seconds))
+        order = np.argsort(epochs[mask])
+        return {
+            "timestamps": epochs[mask][order] * self.bucket_seconds,
+            "volume": np.frombuffer(self.volume, dtype=np.float64)[mask][order],
+            "fees": np.frombuffer(self.fees, dtype=np.float64)[mask][order],
+            "liquidity": np.frombuffer(self.liquidity, dtype=np.float64)[mask][order],
+            "active_users": np.asarray(self.active_users, dtype=np.int64)[mask][order]
+        }
+
+class PoolTimeSeries:
+    """
+    Série temporal de um pool: pontos brutos em anel + rollups 1m/1h/1d
+    Memória fixa por pool, independente do volume de eventos
+    """
+    
+    def __init__(self, raw_capacity: int = 1024):
+        self.raw_capacity = raw_capacity
+        self.raw_timestamps = array("d", [0.0] * raw_capacity)
+        self.raw_volume = array("d", [0.0] * raw_capacity)
+        self.raw_fees = array("d", [0.0] * raw_capacity)
+        self.raw_liquidity = array("d", [0.0] * raw_capacity)
+        self.raw_users = array("l", [0] * raw_capacity)
+        self.raw_size = 0
+        self._position = 0
+        self.rollups = {name: RollupSeries(seconds, capacity) for name, (seconds, capacity) in ROLLUPS.items()}
+    
+    def record(self, volume: float, fees: float, liquidity: float, active_users: int,
+               timestamp: Optional[float] = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        position = self._position
+        self.raw_timestamps[position] = timestamp
+        self.raw_volume[position] = volume
+        self.raw_fees[position] = fees
+        self.raw_liquidity[position] = liquidity
+        self.raw_users[position] = active_users
+        self._position = (position + 1) % self.raw_capacity
+        self.raw_size = min(self.raw_size + 1, self.raw_capacity)
+        for rollup in self.rollups.values():
+            rollup.add(timestamp, volume, fees, liquidity, active_users)
+    
+    def resolution_for(self, window_seconds: float) -> str:
+        """Resolução mais fina cujo anel cobre a janela"""
+        for name, (seconds, capacity) in ROLLUPS.items():
+            if window_seconds <= seconds * capacity:
+                return name
+        return "1d"
+    
+    def series(self, resolution: str, start: float, end: float) -> Dict[str, np.ndarray]:
+        if resolution not in self.rollups:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        return self.rollups[resolution].window(start, end)
+    
+    def aggregate(self, window_seconds: float, now: Optional[float] = None) -> Dict[str, Any]:
+        """Totais da janela lidos dos buckets pré-agregados"""
+        now = time.time() if now is None else now
+        resolution = self.resolution_for(window_seconds)
+        buckets = self.series(resolution, now - window_seconds, now)
+        liquidity = buckets["liquidity"]
+        return {
+            "resolution": resolution,
+            "volume": float(buckets["volume"].sum()),
+            "fees": float(buckets["fees"].sum()),
+            "active_users": int(buckets["active_users"].max()) if len(liquidity) else 0,
+            "liquidity_start": float(liquidity[0]) if len(liquidity) else 0.0,
+            "liquidity_end": float(liquidity[-1]) if len(liquidity) else 0.0
+        }
+    
+    def raw_points(self) -> Dict[str, np.ndarray]:
+        """Pontos brutos retidos, do mais antigo ao mais novo"""
+        order = np.roll(np.arange(self.raw_capacity), -self._position)[self.raw_capacity - self.raw_size:]
+        return {
+            "timestamps": np.frombuffer(self.raw_timestamps, dtype=np.float64)[order],
+            "volume": np.frombuffer(self.raw_volume, dtype=np.float64)[order],
+            "fees": np.frombuffer(self.raw_fees, dtype=np.float64)[order],
+            "liquidity": np.frombuffer(self.raw_liquidity, dtype=np.float64)[order],
+            "active_users": np.asarray(self.raw_users, dtype=np.int64)[order]
+        }
+
+class PoolAnalyticsStore:
+    """Séries temporais de todos os pools"""
+    
+    def __init__(self, raw_capacity: int = 1024):
+        self.raw_capacity = raw_capacity
+        self.pools: Dict[str, PoolTimeSeries] = {}
+    
+    def record(self, pool_id: str, volume: float, fees: float, liquidity: float, active_users: int,
+               timestamp: Optional[float] = None):
+        series = self.pools.get(pool_id)
+        if series is None:
+            series = self.pools[pool_id] = PoolTimeSeries(self.raw_capacity)
+        series.record(volume, fees, liquidity, active_users, timestamp)
+    
+    def aggregate(self, pool_id: str, window_seconds: float, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        series = self.pools.get(pool_id)
+        return series.aggregate(window_seconds, now) if series is not None else None
+    
+    def chart(self, pool_ids: List[str], resolution: str, start: float, end: float) -> Dict[str, Dict[str, List]]:
+        """Séries de vários pools de uma vez, prontas para gráfico"""
+        return {
+            pool_id: {key: values.tolist() for key, values in self.pools[pool_id].series(resolution, start, end).items()}
+            for pool_id in pool_ids if pool_id in self.pools
+        }
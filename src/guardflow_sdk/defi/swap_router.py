@@ -0,0 +1,119 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+from .amm import ConstantProductPool
+
+# Um hop: (pool_id, token de entrada, token de saída)
+Hop = Tuple[str, str, str]
+
+class PoolQuoter:
+    """
+    Cotação memoizada de um pool (float, para roteamento)
+    O cache é descartado quando as reservas mudam
+    """
+    
+    def __init__(self, amm: ConstantProductPool, cache_size: int = 1024):
+        self.amm = amm
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, float], float]" = OrderedDict()
+        self.refresh()
+    
+    def refresh(self):
+        self._reserves = {
+            self.amm.token_a: (float(self.amm.reserve_a), float(self.amm.reserve_b)),
+            self.amm.token_b: (float(self.amm.reserve_b), float(self.amm.reserve_a))
+        }
+        self._fee_multiplier = 1.0 - float(self.amm.fee_rate)
+        self._cache.clear()
+    
+    def quote(self, token_in: str, amount_in: float) -> float:
+        key = (token_in, amount_in)
+        amount_out = self._cache.get(key)
+        if amount_out is not None:
+            return amount_out
+        reserve_in, reserve_out = self._reserves[token_in]
+        after_fee = amount_in * self._fee_multiplier
+        amount_out = reserve_out * after_fee / (reserve_in + after_fee) if reserve_in > 0 else 0.0
+        self._cache[key] = amount_out
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return amount_out
+
+class SwapRouter:
+    """
+    Roteador multi-hop sobre o grafo de tokens dos pools
+    Caminhos candidatos ficam em cache por par e crescem incrementalmente
+    quando um pool novo entra no grafo
+    """
+    
+    def __init__(self, max_hops: int = 3):
+        self.max_hops = max_hops
+        self.graph: Dict[str, List[Tuple[str, str]]] = {}
+        self.quoters: Dict[str, PoolQuoter] = {}
+        self._paths: Dict[Tuple[str, str], List[List[Hop]]] = {}
+    
+    def add_pool(self, pool_id: str, amm: ConstantProductPool):
+        token_a, token_b = amm.token_a, amm.token_b
+        self.quoters[pool_id] = PoolQuoter(amm)
+        # Caminhos novos são exatamente os que passam pela aresta nova
+        for (src, dst), paths in self._paths.items():
+            for x, y in ((token_a, token_b), (token_b, token_a)):
+                for prefix in self._simple_paths(src, x, self.max_hops - 1, frozenset()):
+                    visited = frozenset([src] + [hop[2] for hop in prefix])
+                    if y in visited:
+                        continue
+                    remaining = self.max_hops - 1 - len(prefix)
+                    for suffix in self._simple_paths(y, dst, remaining, visited):
+                        paths.append(prefix + [(pool_id, x, y)] + suffix)
+        self.graph.setdefault(token_a, []).append((pool_id, token_b))
+        self.graph.setdefault(token_b, []).append((pool_id, token_a))
+    
+    def invalidate(self, pool_id: str):
+        """Reservas do pool mudaram: descartar as cotações memoizadas"""
+        quoter = self.quoters.get(pool_id)
+        if quoter is not None:
+            quoter.refresh()
+    
+    def candidate_paths(self, token_in: str, token_out: str) -> List[List[Hop]]:
+        key = (token_in, token_out)
+        paths = self._paths.get(key)
+        if paths is None:
+            paths = self._paths[key] = self._simple_paths(token_in, token_out, self.max_hops, frozenset())
+        return paths
+    
+    def best_route(self, token_in: str, token_out: str, amount_in: float) -> Optional[Dict[str, Any]]:
+        """Caminho de maior saída para o valor de entrada"""
+        best_path, best_out = None, 0.0
+        for path in self.candidate_paths(token_in, token_out):
+            amount = amount_in
+            for pool_id, hop_in, _ in path:
+                amount = self.quoters[pool_id].quote(hop_in, amount)
+            if amount > best_out:
+                best_path, best_out = path, amount
+        if best_path is None:
+            return None
+        return {
+            "path": best_path,
+            "tokens": [token_in] + [hop[2] for hop in best_path],
+            "amount_in": amount_in,
+            "amount_out": best_out
+        }
+    
+    def _simple_paths(self, src: str, dst: str, max_hops: int, visited: frozenset) -> List[List[Hop]]:
+        """Caminhos sem tokens repetidos de src a dst com até max_hops hops"""
+        if src == dst:
+            return [[]]
+        paths: List[List[Hop]] = []
+        stack = [(src, [], visited | {src})]
+        while stack:
+            token, path, seen = stack.pop()
+            if len(path) == max_hops:
+                continue
+            for pool_id, other in self.graph.get(token, ()):
+                if other in seen:
+                    continue
+                extended = path + [(pool_id, token, other)]
+                if other == dst:
+                    paths.append(extended)
+                else:
+                    stack.append((other, extended, seen | {other}))
+        return paths
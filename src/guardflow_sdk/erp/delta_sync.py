@@ -0,0 +1,104 @@
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+import hashlib
+
+# Campos que não fazem parte do conteúdo do produto
+VOLATILE_FIELDS = ("sku", "price", "inventory", "updated_at")
+
+class SyncDelta:
+    """
+    Diferença de um lote de registros ERP contra o último estado enviado
+    """
+    
+    def __init__(self):
+        self.products: List[Dict[str, Any]] = []
+        self.prices: List[Dict[str, Any]] = []
+        self.inventory: List[Dict[str, Any]] = []
+        self.products_skipped = 0
+        self.prices_skipped = 0
+        self.inventory_skipped = 0
+        self.max_updated_at = None
+        self._pending: Dict[str, Tuple[int, Any, Any]] = {}
+
+class DeltaSyncTracker:
+    """
+    Estado de sincronização incremental por (ERP, mercado)
+    Watermark de `updated_at` + hash de conteúdo por SKU
+    """
+    
+    def __init__(self):
+        self.watermarks: Dict[Tuple[str, str], Any] = {}
+        self.sku_state: Dict[Tuple[str, str], Dict[str, Tuple[int, Any, Any]]] = {}
+    
+    def diff(self, erp_system: str, market_id: str, records: Iterable[Dict[str, Any]]) -> SyncDelta:
+        """Separar apenas produtos, preços e estoques alterados"""
+        key = (erp_system, market_id)
+        watermark = self.watermarks.get(key)
+        known = self.sku_state.get(key, {})
+        delta = SyncDelta()
+        
+        for record in records:
+            updated_at = record.get("updated_at")
+            if updated_at is not None:
+                if delta.max_updated_at is None or updated_at > delta.max_updated_at:
+                    delta.max_updated_at = updated_at
+                if watermark is not None and updated_at < watermark:
+                    # Anterior ao watermark: já enviado, nem precisa de hash
+                    delta.products_skipped += 1
+                    delta.prices_skipped += 1
+                    delta.inventory_skipped += 1
+                    continue
+            
+            sku = record["sku"]
+            content_hash = self._content_hash(record)
+            price = record.get("price")
+            inventory = record.get("inventory")
+            previous = known.get(sku)
+            
+            if previous is None or previous[0] != content_hash:
+                delta.products.append(record)
+            else:
+                delta.products_skipped += 1
+            if previous is None or previous[1] != price:
+                delta.prices.append({"sku": sku, "price": price})
+            else:
+                delta.prices_skipped += 1
+            if previous is None or previous[2] != inventory:
+                delta.inventory.append({"sku": sku, "inventory": inventory})
+            else:
+                delta.inventory_skipped += 1
+            
+            if previous != (content_hash, price, inventory):
+                delta._pending[sku] = (content_hash, price, inventory)
+        
+        return delta
+    
+    def commit(self, erp_system: str, market_id: str, delta: SyncDelta, advance_watermark: bool = True):
+        """Confirmar delta enviado (hashes e watermark)"""
+        key = (erp_system, market_id)
+        self.sku_state.setdefault(key, {}).update(delta._pending)
+        delta._pending = {}
+        if advance_watermark:
+            self.advance_watermark(erp_system, market_id, delta.max_updated_at)
+    
+    def advance_watermark(self, erp_system: str, market_id: str, updated_at: Any):
+        """Avançar watermark (nunca retrocede)"""
+        if updated_at is None:
+            return
+        key = (erp_system, market_id)
+        current = self.watermarks.get(key)
+        if current is None or updated_at > current:
+            self.watermarks[key] = updated_at
+    
+    def get_watermark(self, erp_system: str, market_id: str) -> Optional[Any]:
+        return self.watermarks.get((erp_system, market_id))
+    
+    def reset(self, erp_system: str, market_id: str):
+        """Descartar estado para forçar sync completo"""
+        key = (erp_system, market_id)
+        self.watermarks.pop(key, None)
+        self.sku_state.pop(key, None)
+    
+    def _content_hash(self, record: Dict[str, Any]) -> int:
+        """Hash compacto (64 bits) dos campos de conteúdo do produto"""
+        content = repr(sorted((k, v) for k, v in record.items() if k not in VOLATILE_FIELDS))
+        return int.from_bytes(hashlib.blake2b(content.encode(), digest_size=8).digest(), "big")
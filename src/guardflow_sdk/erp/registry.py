@@ -0,0 +1,159 @@
+from typing import Dict, Any, List, Optional, Callable, Iterable, Sequence
+
+# Campos normalizados produzidos por todos os conectores
+PRODUCT_FIELDS = ("sku", "name", "category", "price", "inventory", "updated_at")
+
+# Conversores padrão por campo normalizado
+DEFAULT_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "sku": str,
+    "name": str,
+    "category": str,
+    "price": float,
+    "inventory": lambda value: int(float(value)),
+    "updated_at": str
+}
+
+def _required(value: Any, source: str) -> Any:
+    """Valor de campo obrigatório; vazio ou só espaços é inválido"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        raise ValueError(f"Required ERP field empty: {source}")
+    return value
+
+class ERPFieldMapping:
+    """
+    Mapeamento de campos de um ERP compilado em transformadores de linha
+    O código de acesso é gerado uma única vez, não interpretado por linha
+    """
+    
+    def __init__(self, field_map: Dict[str, str], converters: Optional[Dict[str, Callable[[Any], Any]]] = None,
+                 required: Sequence[str] = ("sku",)):
+        self.field_map = dict(field_map)
+        self.converters = dict(DEFAULT_CONVERTERS)
+        self.converters.update(converters or {})
+        self.required = tuple(required)
+        self.transform = self._compile_dict_transform()
+        self._header_cache: Dict[tuple, Callable[[Sequence[Any]], Dict[str, Any]]] = {}
+    
+    def transform_rows(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Transformar várias linhas dict de uma vez"""
+        return list(map(self.transform, rows))
+    
+    def bind_header(self, header: Sequence[str]) -> Callable[[Sequence[Any]], Optional[Dict[str, Any]]]:
+        """
+        Compilar transformador por índice de tupla para um cabeçalho CSV
+        Linha curta demais para as colunas obrigatórias retorna None
+        """
+        key = tuple(header)
+        transform = self._header_cache.get(key)
+        if transform is None:
+            positions = {column: index for index, column in enumerate(key)}
+            for target in self.required:
+                if self.field_map[target] not in positions:
+                    raise ValueError(f"Required ERP column missing: {self.field_map[target]}")
+            width = max(positions[self.field_map[target]] for target in self.required) + 1 if self.required else 0
+            transform = self._compile(
+                lambda source: f"row[{positions[source]}]",
+                lambda source: (f"(row[{positions[source]}] if len(row) > {positions[source]} else None)"
+                                if source in positions else None),
+                guard=f"len(row) < {width}"
+            )
+            self._header_cache[key] = transform
+        return transform
+    
+    def _compile_dict_transform(self) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        """Transformador para linhas dict (JSON/NDJSON)"""
+        return self._compile(lambda source: f"row[{source!r}]", lambda source: f"row.get({source!r})")
+    
+    def _compile(self, required_accessor: Callable[[str], Optional[str]],
+                 optional_accessor: Optional[Callable[[str], Optional[str]]] = None,
+                 guard: Optional[str] = None) -> Callable:
+        """Gerar e compilar a função de transformação"""
+        optional_accessor = optional_accessor or required_accessor
+        namespace: Dict[str, Any] = {"_EMPTY": (None, ""), "_required": _required}
+        entries = []
+        for index, (target, source) in enumerate(self.field_map.items()):
+            converter = self.converters.get(target)
+            converter_name = f"_c{index}"
+            if converter is not None:
+                namespace[converter_name] = converter
+            if target in self.required:
+                accessor = f"_required({required_accessor(source)}, {source!r})"
+                expression = f"{converter_name}({accessor})" if converter else accessor
+            else:
+                accessor = optional_accessor(source)
+                if accessor is None:
+                    expression = "None"
+                elif converter is None:
+                    expression = accessor
+                else:
+                    expression = f"(None if (_v{index} := {accessor}) in _EMPTY else {converter_name}(_v{index}))"
+            entries.append(f"{target!r}: {expression}")
+        source_code = "def transform(row):\n"
+        if guard:
+            source_code += f"    if {guard}:\n        return None\n"
+        source_code += "    return {" + ", ".join(entries) + "}\n"
+        exec(compile(source_code, "<erp-field-mapping>", "exec"), namespace)
+        return namespace["transform"]
+
+class ERPConnectorSpec:
+    """
+    Declaração de um conector ERP: nome, mapeamento e formato de export
+    """
+    
+    def __init__(self, name: str, field_map: Dict[str, str],
+                 converters: Optional[Dict[str, Callable[[Any], Any]]] = None,
+                 export_format: str = "json", csv_delimiter: str = ","):
+        self.name = name
+        self.export_format = export_format
+        self.csv_delimiter = csv_delimiter
+        self.mapping = ERPFieldMapping(field_map, converters)
+
+class ERPConnectorRegistry:
+    """
+    Registro de conectores ERP
+    """
+    
+    def __init__(self, specs: Optional[Iterable[ERPConnectorSpec]] = None):
+        self._connectors: Dict[str, ERPConnectorSpec] = {}
+        for spec in specs or []:
+            self.register(spec)
+    
+    def register(self, spec: ERPConnectorSpec):
+        self._connectors[spec.name] = spec
+    
+    def get(self, name: str) -> Optional[ERPConnectorSpec]:
+        return self._connectors.get(name)
+    
+    def names(self) -> List[str]:
+        return list(self._connectors)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._connectors
+
+def default_connectors() -> List[ERPConnectorSpec]:
+    """Conectores nativos do SDK"""
+    return [
+        ERPConnectorSpec("SAP", {
+            "sku": "MATNR", "name": "MAKTX", "category": "MATKL",
+            "price": "NETPR", "inventory": "LABST", "updated_at": "AEDAT"
+        }, export_format="ndjson"),
+        ERPConnectorSpec("Oracle", {
+            "sku": "ITEM_NUMBER", "name": "DESCRIPTION", "category": "ITEM_CATEGORY",
+            "price": "LIST_PRICE", "inventory": "ON_HAND_QUANTITY", "updated_at": "LAST_UPDATE_DATE"
+        }),
+        ERPConnectorSpec("Microsoft_Dynamics", {
+            "sku": "ItemNumber", "name": "ProductName", "category": "ProductCategoryName",
+            "price": "SalesPrice", "inventory": "AvailableOnHandQuantity", "updated_at": "ModifiedDateTime"
+        }),
+        ERPConnectorSpec("TOTVS", {
+            "sku": "B1_COD", "name": "B1_DESC", "category": "B1_GRUPO",
+            "price": "B1_PRV1", "inventory": "B2_QATU", "updated_at": "B1_UREV"
+        }, export_format="csv", csv_delimiter=";"),
+        ERPConnectorSpec("Senior", {
+            "sku": "codPro", "name": "desPro", "category": "codFam",
+            "price": "preBas", "inventory": "qtdEst", "updated_at": "datAlt"
+        })
+    ]
+
+# Mapeamento identidade, para exports já no formato normalizado
+IDENTITY_MAPPING = ERPFieldMapping({field: field for field in PRODUCT_FIELDS})
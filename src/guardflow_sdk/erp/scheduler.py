@@ -0,0 +1,158 @@
+from typing import Dict, Any, List, Optional, Tuple
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+# Erros determinísticos: repetir o sync não muda o resultado
+PERMANENT_ERRORS = ("ERP not supported", "Invalid ERP record")
+
+class TokenBucket:
+    """
+    Rate limit por token bucket (thread-safe)
+    """
+    
+    def __init__(self, rate_per_second: float, burst: Optional[float] = None):
+        self.rate = rate_per_second
+        self.capacity = burst if burst is not None else max(1.0, rate_per_second)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Bloquear até haver token disponível"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait_seconds = (1.0 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+class ERPSyncScheduler:
+    """
+    Agendador de sync multi-mercado
+    Concorrência limitada, rate limit e pool por ERP, prioridade por staleness
+    e retry com backoff exponencial para falhas transitórias
+    """
+    
+    def __init__(self, connectors, max_workers: int = 32,
+                 rate_limits: Optional[Dict[str, float]] = None,
+                 pool_sizes: Optional[Dict[str, int]] = None,
+                 default_rate_limit: float = 20.0, default_pool_size: int = 8,
+                 max_attempts: int = 3, backoff_base: float = 0.5, backoff_max: float = 30.0):
+        self.connectors = connectors
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limits = rate_limits or {}
+        self.default_rate_limit = default_rate_limit
+        self.pool_sizes = {erp: max(1, size) for erp, size in (pool_sizes or {}).items()}
+        self.default_pool_size = max(1, default_pool_size)
+        self.rate_limiters: Dict[str, TokenBucket] = {}
+        self.last_synced: Dict[Tuple[str, str], float] = {}
+    
+    def run(self, targets: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """Sincronizar todos os pares (ERP, mercado), mais desatualizados primeiro"""
+        started = time.monotonic()
+        started_at = datetime.utcnow().isoformat()
+        
+        # Filas por ERP ordenadas por último sync (nunca sincronizado = 0)
+        pending: Dict[str, List[Tuple[float, str, int]]] = {}
+        failures = []
+        for erp_system, market_id in targets:
+            if erp_system not in self.connectors.supported_erps:
+                failures.append({"erp_system": erp_system, "market_id": market_id,
+                                 "error": "ERP not supported", "attempts": 0})
+                continue
+            staleness_key = self.last_synced.get((erp_system, market_id), 0.0)
+            heapq.heappush(pending.setdefault(erp_system, []), (staleness_key, market_id, 1))
+        
+        retry_queue: List[Tuple[float, str, str, int]] = []
+        in_flight = {erp: 0 for erp in pending}
+        futures = {}
+        synced = 0
+        retries = 0
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or retry_queue or futures:
+                # Retries cujo backoff expirou voltam para a fila do ERP
+                now = time.monotonic()
+                while retry_queue and retry_queue[0][0] <= now:
+                    _, erp_system, market_id, attempt = heapq.heappop(retry_queue)
+                    heapq.heappush(pending.setdefault(erp_system, []), (0.0, market_id, attempt))
+                
+                # Despachar respeitando o pool de cada ERP
+                for erp_system in list(pending):
+                    queue = pending[erp_system]
+                    while queue and in_flight[erp_system] < self._pool_size(erp_system) and len(futures) < self.max_workers:
+                        _, market_id, attempt = heapq.heappop(queue)
+                        future = executor.submit(self._sync_one, erp_system, market_id)
+                        futures[future] = (erp_system, market_id, attempt)
+                        in_flight[erp_system] += 1
+                    if not queue:
+                        del pending[erp_system]
+                
+                if not futures:
+                    time.sleep(max(0.0, retry_queue[0][0] - time.monotonic()))
+                    continue
+                
+                timeout = max(0.0, retry_queue[0][0] - time.monotonic()) if retry_queue else None
+                done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    erp_system, market_id, attempt = futures.pop(future)
+                    in_flight[erp_system] -= 1
+                    error, permanent = future.result()
+                    if error is None:
+                        synced += 1
+                        self.last_synced[(erp_system, market_id)] = time.time()
+                    elif attempt < self.max_attempts and not permanent:
+                        retries += 1
+                        heapq.heappush(retry_queue, (time.monotonic() + self._backoff(attempt), erp_system, market_id, attempt + 1))
+                    else:
+                        failures.append({"erp_system": erp_system, "market_id": market_id,
+                                         "error": error, "attempts": attempt})
+        
+        return {
+            "total_markets": len(targets),
+            "synced": synced,
+            "failed": len(failures),
+            "retries": retries,
+            "failures": failures,
+            "duration_seconds": time.monotonic() - started,
+            "started_at": started_at
+        }
+    
+    def _sync_one(self, erp_system: str, market_id: str) -> Tuple[Optional[str], bool]:
+        """Executar um sync; retorna (mensagem de erro ou None, se o erro é permanente)"""
+        self._rate_limiter(erp_system).acquire()
+        try:
+            result = self.connectors.sync_with_market(erp_system, market_id)
+        except (KeyError, ValueError, TypeError) as exc:
+            # Dados inválidos falham igual em toda tentativa
+            return str(exc) or exc.__class__.__name__, True
+        except Exception as exc:
+            return str(exc) or exc.__class__.__name__, False
+        error = result.get("error")
+        return error, error is not None and error.startswith(PERMANENT_ERRORS)
+    
+    def _pool_size(self, erp_system: str) -> int:
+        return self.pool_sizes.get(erp_system, self.default_pool_size)
+    
+    def _rate_limiter(self, erp_system: str) -> TokenBucket:
+        limiter = self.rate_limiters.get(erp_system)
+        if limiter is None:
+            limiter = self.rate_limiters.setdefault(
+                erp_system, TokenBucket(self.rate_limits.get(erp_system, self.default_rate_limit)))
+        return limiter
+    
+    def _backoff(self, attempt: int) -> float:
+        """Backoff exponencial com jitter"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.0)
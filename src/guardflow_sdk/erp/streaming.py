@@ -0,0 +1,181 @@
+from typing import Dict, Any, List, Optional, Iterable, Iterator, TypedDict
+import codecs
+import csv
+import json
+import httpx
+from .registry import ERPFieldMapping, IDENTITY_MAPPING
+
+class ERPProductRecord(TypedDict, total=False):
+    """Registro de produto normalizado vindo do ERP"""
+    sku: str
+    name: Optional[str]
+    category: Optional[str]
+    price: Optional[float]
+    inventory: Optional[int]
+    updated_at: Optional[str]
+
+# Formatos de payload suportados no streaming
+STREAM_FORMATS = ("json", "ndjson", "csv")
+
+def iter_lines(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[str]:
+    """Quebrar stream de bytes em linhas sem carregar o payload inteiro"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+def iter_ndjson(chunks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """Parser incremental de NDJSON (um objeto por linha)"""
+    for line in iter_lines(chunks):
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def iter_csv(chunks: Iterable[bytes], delimiter: str = ",") -> Iterator[List[str]]:
+    """Parser incremental de CSV (a primeira linha é o cabeçalho)"""
+    yield from csv.reader(iter_lines(chunks), delimiter=delimiter)
+
+def _element_complete(buffer: str, position: int) -> bool:
+    """Verificar se o buffer já contém o elemento inteiro a partir de position"""
+    depth = 0
+    in_string = False
+    escape = False
+    for index in range(position, len(buffer)):
+        char = buffer[index]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+                if depth == 0:
+                    return True
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth <= 0:
+                return True
+        elif depth == 0 and char in ",\n":
+            return True
+    return False
+
+def iter_json_array(chunks: Iterable[bytes], max_element_chars: int = 16 * 1024 * 1024) -> Iterator[Dict[str, Any]]:
+    """
+    Parser incremental de um array JSON de nível superior
+    O buffer guarda no máximo um elemento incompleto por vez; elemento
+    malformado falha assim que estiver completo no buffer
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    chunks = iter(chunks)
+    buffer = ""
+    position = 0
+    started = False
+    exhausted = False
+    
+    while True:
+        # Pular separadores entre elementos
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer):
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("ERP payload is not a JSON array")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if exhausted or _element_complete(buffer, position):
+                    raise
+                if len(buffer) - position > max_element_chars:
+                    raise ValueError("ERP JSON element exceeds max_element_chars")
+            else:
+                yield item
+                position = end
+                continue
+        elif exhausted:
+            if started:
+                raise ValueError("Truncated ERP JSON payload")
+            return
+        
+        # Descartar o que já foi consumido e ler mais bytes
+        buffer = buffer[position:]
+        position = 0
+        try:
+            buffer += text_decoder.decode(next(chunks))
+        except StopIteration:
+            buffer += text_decoder.decode(b"", final=True)
+            exhausted = True
+
+def detect_format(response: httpx.Response) -> str:
+    """Inferir formato pelo Content-Type da resposta"""
+    content_type = response.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    if "csv" in content_type:
+        return "csv"
+    return "json"
+
+def iter_record_chunks(response: httpx.Response, fmt: Optional[str] = None,
+                       chunk_size: int = 1000, mapping: Optional[ERPFieldMapping] = None,
+                       csv_delimiter: str = ",", stats: Optional[Dict[str, int]] = None) -> Iterator[List[ERPProductRecord]]:
+    """
+    Ler resposta httpx em streaming e produzir lotes de tamanho fixo
+    As linhas passam pelo transformador compilado do conector; linhas CSV
+    incompletas são descartadas e contadas em stats["rows_skipped"], e
+    registros inválidos (campo obrigatório ausente ou vazio, valor que não
+    converte) em stats["rows_rejected"], sem interromper o stream
+    """
+    fmt = fmt or detect_format(response)
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"Unsupported ERP payload format: {fmt}")
+    mapping = mapping or IDENTITY_MAPPING
+    
+    byte_chunks = response.iter_bytes()
+    if fmt == "csv":
+        rows = iter_csv(byte_chunks, csv_delimiter)
+        header = next(rows, None)
+        if header is None:
+            return
+        # Acesso por índice de coluna, gerado uma vez para este cabeçalho
+        transform = mapping.bind_header(header)
+    else:
+        rows = iter_ndjson(byte_chunks) if fmt == "ndjson" else iter_json_array(byte_chunks)
+        transform = mapping.transform
+    
+    if stats is not None:
+        stats.setdefault("rows_skipped", 0)
+        stats.setdefault("rows_rejected", 0)
+    batch: List[ERPProductRecord] = []
+    for row in rows:
+        try:
+            record = transform(row)
+        except (KeyError, ValueError, TypeError, AttributeError):
+            if stats is not None:
+                stats["rows_rejected"] += 1
+            continue
+        if record is None:
+            if stats is not None:
+                stats["rows_skipped"] += 1
+            continue
+        batch.append(record)
+        if len(batch) >= chunk_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,166 @@
+from typing import Dict, Any, List, Optional, Iterable
+from array import array
+from bisect import bisect_left
+import time
+
+class RoaringBitmap:
+    """
+    Bitmap compacto estilo roaring para índices inteiros de usuários
+    Containers de 2^16 valores: array ordenado (esparso) ou bitmap (denso)
+    """
+    
+    ARRAY_LIMIT = 4096
+    
+    def __init__(self):
+        self._containers: Dict[int, Any] = {}
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __contains__(self, value: int) -> bool:
+        container = self._containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, bytearray):
+            return bool(container[low >> 3] & (1 << (low & 7)))
+        position = bisect_left(container, low)
+        return position < len(container) and container[position] == low
+    
+    def add(self, value: int) -> bool:
+        """Adicionar valor; retorna False se já existia"""
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            self._containers[high] = array("H", [low])
+            self._size += 1
+            return True
+        if isinstance(container, bytearray):
+            mask = 1 << (low & 7)
+            if container[low >> 3] & mask:
+                return False
+            container[low >> 3] |= mask
+            self._size += 1
+            return True
+        position = bisect_left(container, low)
+        if position < len(container) and container[position] == low:
+            return False
+        container.insert(position, low)
+        self._size += 1
+        if len(container) > self.ARRAY_LIMIT:
+            self._containers[high] = self._to_bitmap(container)
+        return True
+    
+    def __iter__(self) -> Iterable[int]:
+        for high in sorted(self._containers):
+            container = self._containers[high]
+            base = high << 16
+            if isinstance(container, bytearray):
+                for byte_index, byte in enumerate(container):
+                    while byte:
+                        bit = (byte & -byte).bit_length() - 1
+                        yield base | (byte_index << 3) | bit
+                        byte &= byte - 1
+            else:
+                for low in container:
+                    yield base | low
+    
+    def _to_bitmap(self, container: array) -> bytearray:
+        bitmap = bytearray(8192)
+        for low in container:
+            bitmap[low >> 3] |= 1 << (low & 7)
+        return bitmap
+
+class Challenge:
+    """Estado de um desafio ESG"""
+    
+    def __init__(self, challenge_id: str, target_activities: int, reward_gst: float,
+                 activity_types: Optional[Iterable[str]], ends_at: float):
+        self.challenge_id = challenge_id
+        self.target_activities = target_activities
+        self.reward_gst = reward_gst
+        self.activity_types = frozenset(activity_types) if activity_types else None
+        self.ends_at = ends_at
+        self.participants = RoaringBitmap()
+        self.completed = RoaringBitmap()
+        self.claimed = RoaringBitmap()
+        self.progress: Dict[int, int] = {}
+    
+    def is_active(self, now: float) -> bool:
+        return now < self.ends_at
+
+class ChallengeEngine:
+    """
+    Motor de progresso de desafios ESG
+    Eventos de atividade são roteados só para os desafios do usuário
+    """
+    
+    def __init__(self):
+        self.challenges: Dict[str, Challenge] = {}
+        self._user_ids: Dict[str, int] = {}
+        self._user_challenges: Dict[int, List[str]] = {}
+    
+    def create(self, challenge_id: str, target_activities: int, reward_gst: float,
+               activity_types: Optional[Iterable[str]], duration_days: float) -> Challenge:
+        challenge = Challenge(challenge_id, target_activities, reward_gst, activity_types,
+                              time.time() + duration_days * 86400)
+        self.challenges[challenge_id] = challenge
+        return challenge
+    
+    def join(self, user_id: str, challenge: Challenge) -> bool:
+        """Inscrever usuário; retorna False se já participava"""
+        index = self._user_index(user_id)
+        if not challenge.participants.add(index):
+            return False
+        self._user_challenges.setdefault(index, []).append(challenge.challenge_id)
+        return True
+    
+    def record_activity(self, user_id: str, activity_type: str, count: int = 1) -> List[str]:
+        """Aplicar evento de atividade; retorna desafios concluídos agora"""
+        index = self._user_ids.get(user_id)
+        if index is None:
+            return []
+        challenge_ids = self._user_challenges.get(index)
+        if not challenge_ids:
+            return []
+        
+        now = time.time()
+        completed_now = []
+        active_ids = []
+        for challenge_id in challenge_ids:
+            challenge = self.challenges[challenge_id]
+            if not challenge.is_active(now) or index in challenge.completed:
+                continue  # Desafio encerrado ou concluído sai da rota do usuário
+            active_ids.append(challenge_id)
+            if challenge.activity_types is not None and activity_type not in challenge.activity_types:
+                continue
+            progress = challenge.progress.get(index, 0) + count
+            challenge.progress[index] = progress
+            if progress >= challenge.target_activities:
+                challenge.completed.add(index)
+                completed_now.append(challenge_id)
+        self._user_challenges[index] = [cid for cid in active_ids if cid not in completed_now]
+        return completed_now
+    
+    def progress(self, user_id: str, challenge: Challenge) -> int:
+        index = self._user_ids.get(user_id)
+        return challenge.progress.get(index, 0) if index is not None else 0
+    
+    def is_completed(self, user_id: str, challenge: Challenge) -> bool:
+        index = self._user_ids.get(user_id)
+        return index is not None and index in challenge.completed
+    
+    def is_claimed(self, user_id: str, challenge: Challenge) -> bool:
+        index = self._user_ids.get(user_id)
+        return index is not None and index in challenge.claimed
+    
+    def claim(self, user_id: str, challenge: Challenge) -> bool:
+        """Marcar recompensa como resgatada; False se já resgatada"""
+        return challenge.claimed.add(self._user_ids[user_id])
+    
+    def _user_index(self, user_id: str) -> int:
+        index = self._user_ids.get(user_id)
+        if index is None:
+            index = self._user_ids[user_id] = len(self._user_ids)
+        return index
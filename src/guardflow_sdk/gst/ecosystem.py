@@ -1,34 +1,82 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Iterable, Callable, Sequence
 import httpx
 import random
+import numpy as np
+import time
+from itertools import islice
 from datetime import datetime, timedelta
+from .ledger import GSTLedger, LedgerError
+from .leaderboard import LeaderboardIndex
+from .challenges import ChallengeEngine
+from .tiers import ESGTiering, DEFAULT_TIERS
 
 class GSTEcosystem:
-    def __init__(self, client: httpx.Client, api_key: str = None):
+    BASE_ACTIVITY_REWARD = 10.0
+    
+    def __init__(self, client: httpx.Client, api_key: str = None,
+                 journal_path: Optional[str] = None, snapshot_path: Optional[str] = None,
+                 esg_tiers: Sequence = DEFAULT_TIERS):
         self.client = client
         self.api_key = api_key
         self.token_supply = 1000000  # 1M GST tokens
-        self.circulating_supply = 500000  # 500K em circulação
+        self.leaderboards = LeaderboardIndex()
+        if journal_path or snapshot_path:
+            # Restart: último snapshot + replay do journal; o ranking assina antes do replay
+            self.ledger = GSTLedger.recover(self.token_supply, journal_path, snapshot_path,
+                                            initial_circulating=500000,
+                                            listeners=[self.leaderboards.on_ledger_change],
+                                            notify_since=self.leaderboards.replay_since())
+        else:
+            self.ledger = GSTLedger(self.token_supply, initial_circulating=500000)  # 500K em circulação
+            self.ledger.subscribe(self.leaderboards.on_ledger_change)
+        self.challenges = ChallengeEngine()
+        self.tiering = ESGTiering(esg_tiers)
+        if self.ledger.accounts:
+            # Níveis reconstruídos a partir dos saldos recuperados
+            user_ids = list(self.ledger.accounts)
+            self.tiering.retier(user_ids, [self.ledger.balance(user_id) for user_id in user_ids])
+    
+    @property
+    def circulating_supply(self) -> float:
+        return self.ledger.circulating_supply
+    
+    def subscribe_level_changes(self, listener: Callable[[Dict[str, Any]], None]):
+        """Receber eventos de mudança de nível ESG (notificações)"""
+        self.tiering.subscribe(listener)
     
     def transfer_gst(self, from_user: str, to_user: str, amount: float) -> Dict[str, Any]:
         """Transferir tokens GST entre usuários"""
-        transaction_id = f"GST_TXN_{random.randint(100000, 999999)}"
+        fee = amount * 0.01  # 1% fee
+        try:
+            entry = self.ledger.transfer(from_user, to_user, amount, fee)
+        except LedgerError as exc:
+            return {"error": str(exc)}
+        self.tiering.update(from_user, self.ledger.balance(from_user))
+        self.tiering.update(to_user, self.ledger.balance(to_user))
         
         return {
-            "transaction_id": transaction_id,
+            "transaction_id": f"GST_TXN_{entry['sequence']}",
             "from_user": from_user,
             "to_user": to_user,
             "amount": amount,
-            "fee": amount * 0.01,  # 1% fee
+            "fee": fee,
             "status": "confirmed",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.utcfromtimestamp(entry["timestamp"]).isoformat()
         }
     
     def reward_esg_activity(self, user_id: str, activity_type: str, esg_score: float) -> Dict[str, Any]:
         """Recompensar atividade ESG com tokens GST"""
-        base_reward = 10.0
         esg_multiplier = esg_score / 100.0
-        reward_amount = base_reward * esg_multiplier
+        reward_amount = self.BASE_ACTIVITY_REWARD * esg_multiplier
+        
+        if reward_amount != 0:
+            # Score zero não gera recompensa nem entrada no ledger
+            try:
+                self.ledger.mint(user_id, reward_amount, activity_type)
+            except LedgerError as exc:
+                return {"error": str(exc)}
+            self.tiering.update(user_id, self.ledger.balance(user_id))
+        challenges_completed = self.challenges.record_activity(user_id, activity_type)
         
         return {
             "user_id": user_id,
@@ -36,37 +84,129 @@ class GSTEcosystem:
             "esg_score": esg_score,
             "reward_amount": reward_amount,
             "gst_tokens_earned": int(reward_amount),
+            "challenges_completed": challenges_completed,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    def reward_esg_activities(self, events: Iterable[Dict[str, Any]], batch_size: int = 10000) -> Dict[str, Any]:
+        """Recompensar lote/stream de atividades ESG (uma atualização de ledger por usuário)"""
+        events_processed = 0
+        total_reward = 0.0
+        level_changes = 0
+        user_rewards: Dict[str, float] = {}
+        
+        events = iter(events)
+        while True:
+            batch = list(islice(events, batch_size))
+            if not batch:
+                break
+            result = self._reward_batch(batch)
+            if "error" in result:
+                return {**result, "events_processed": events_processed}
+            events_processed += len(batch)
+            total_reward += result["total_reward"]
+            level_changes += result["level_changes"]
+            for user_id, amount in result["user_rewards"].items():
+                user_rewards[user_id] = user_rewards.get(user_id, 0.0) + amount
+        
+        return {
+            "events_processed": events_processed,
+            "users_rewarded": len(user_rewards),
+            "total_reward": total_reward,
+            "user_rewards": user_rewards,
+            "level_changes": level_changes,
             "timestamp": datetime.utcnow().isoformat()
         }
     
+    def _reward_batch(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Calcular recompensas do lote vetorizado e agregar por usuário"""
+        scores = np.fromiter((event["esg_score"] for event in batch), dtype=np.float64, count=len(batch))
+        rewards = self.BASE_ACTIVITY_REWARD * (scores / 100.0)
+        users, inverse = np.unique([event["user_id"] for event in batch], return_inverse=True)
+        per_user = np.bincount(inverse, weights=rewards, minlength=len(users))
+        
+        amounts = {user_id: amount for user_id, amount in zip(users.tolist(), per_user.tolist()) if amount > 0}
+        try:
+            self.ledger.mint_many(amounts, "esg_activity_batch")
+        except LedgerError as exc:
+            return {"error": str(exc)}
+        # Reclassificação vetorizada dos usuários do lote
+        user_ids = list(amounts)
+        level_changes = self.tiering.retier(user_ids, [self.ledger.balance(user_id) for user_id in user_ids])
+        for event in batch:
+            self.challenges.record_activity(event["user_id"], event.get("activity_type", ""))
+        
+        return {"total_reward": float(per_user.sum()), "user_rewards": amounts, "level_changes": len(level_changes)}
+    
     def create_esg_challenge(self, challenge_data: Dict[str, Any]) -> Dict[str, Any]:
         """Criar desafio ESG com recompensas GST"""
         challenge_id = f"CHALLENGE_{random.randint(100000, 999999)}"
+        while challenge_id in self.challenges.challenges:
+            challenge_id = f"CHALLENGE_{random.randint(100000, 999999)}"
+        
+        challenge = self.challenges.create(
+            challenge_id,
+            target_activities=challenge_data.get("target_activities", 1),
+            reward_gst=challenge_data.get("reward_gst", 100),
+            activity_types=challenge_data.get("activity_types"),
+            duration_days=challenge_data.get("duration_days", 7)
+        )
         
         return {
             "challenge_id": challenge_id,
             "title": challenge_data.get("title", "ESG Challenge"),
             "description": challenge_data.get("description", "Complete sustainable activities"),
-            "reward_gst": challenge_data.get("reward_gst", 100),
+            "reward_gst": challenge.reward_gst,
             "duration_days": challenge_data.get("duration_days", 7),
+            "target_activities": challenge.target_activities,
+            "activity_types": sorted(challenge.activity_types) if challenge.activity_types else None,
             "participants": 0,
             "status": "active",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.utcnow().isoformat(),
+            "ends_at": datetime.utcfromtimestamp(challenge.ends_at).isoformat()
         }
     
     def join_esg_challenge(self, user_id: str, challenge_id: str) -> Dict[str, Any]:
         """Participar de desafio ESG"""
+        challenge = self.challenges.challenges.get(challenge_id)
+        if challenge is None:
+            return {"error": "Challenge not found"}
+        if not challenge.is_active(time.time()):
+            return {"error": "Challenge has ended"}
+        
+        self.challenges.join(user_id, challenge)
+        
         return {
             "user_id": user_id,
             "challenge_id": challenge_id,
             "joined_at": datetime.utcnow().isoformat(),
-            "progress": 0,
-            "status": "active"
+            "progress": self.challenges.progress(user_id, challenge),
+            "target_activities": challenge.target_activities,
+            "participants": len(challenge.participants),
+            "status": "completed" if self.challenges.is_completed(user_id, challenge) else "active"
         }
     
     def complete_esg_challenge(self, user_id: str, challenge_id: str) -> Dict[str, Any]:
         """Completar desafio ESG e receber recompensas"""
-        reward_gst = random.randint(50, 200)
+        challenge = self.challenges.challenges.get(challenge_id)
+        if challenge is None:
+            return {"error": "Challenge not found"}
+        if not self.challenges.is_completed(user_id, challenge):
+            return {
+                "error": "Challenge not completed",
+                "progress": self.challenges.progress(user_id, challenge),
+                "target_activities": challenge.target_activities
+            }
+        if self.challenges.is_claimed(user_id, challenge):
+            return {"error": "Reward already claimed"}
+        
+        reward_gst = challenge.reward_gst
+        try:
+            self.ledger.mint(user_id, reward_gst, f"challenge:{challenge_id}")
+        except LedgerError as exc:
+            return {"error": str(exc)}
+        self.tiering.update(user_id, self.ledger.balance(user_id))
+        self.challenges.claim(user_id, challenge)
         
         return {
             "user_id": user_id,
@@ -78,47 +218,57 @@ class GSTEcosystem:
     
     def get_user_gst_balance(self, user_id: str) -> Dict[str, Any]:
         """Obter saldo GST do usuário"""
-        balance = random.randint(100, 5000)
+        account = self.ledger.account(user_id)
         
         return {
             "user_id": user_id,
-            "gst_balance": balance,
-            "esg_level": self._calculate_esg_level(balance),
-            "total_earned": balance + random.randint(500, 2000),
-            "total_spent": random.randint(100, 1000)
+            "gst_balance": account["balance"],
+            "esg_level": self._calculate_esg_level(account["balance"]),
+            "total_earned": account["total_earned"],
+            "total_spent": account["total_spent"]
         }
     
-    def get_leaderboard(self, period: str = "monthly") -> Dict[str, Any]:
+    def get_leaderboard(self, period: str = "monthly", limit: int = 10) -> Dict[str, Any]:
         """Obter ranking GST por período"""
+        board = self.leaderboards.get(period)
+        if board is None:
+            return {"error": "Invalid period"}
+        
         leaderboard = []
-        for i in range(1, 11):
+        for position, (user_id, earned) in enumerate(board.top(limit), start=1):
+            balance = self.ledger.balance(user_id)
             leaderboard.append({
-                "position": i,
-                "user_id": f"user_{i}",
-                "gst_balance": random.randint(1000, 10000),
-                "esg_level": self._calculate_esg_level(random.randint(1000, 10000)),
-                "monthly_earned": random.randint(100, 1000)
+                "position": position,
+                "user_id": user_id,
+                "gst_balance": balance,
+                "esg_level": self._calculate_esg_level(balance),
+                "period_earned": earned
             })
         
         return {
             "period": period,
             "leaderboard": leaderboard,
-            "total_participants": random.randint(100, 1000),
+            "total_participants": len(board.index),
             "updated_at": datetime.utcnow().isoformat()
         }
     
+    def get_user_rank(self, user_id: str, period: str = "monthly") -> Dict[str, Any]:
+        """Obter posição do usuário no ranking do período"""
+        board = self.leaderboards.get(period)
+        if board is None:
+            return {"error": "Invalid period"}
+        
+        return {
+            "user_id": user_id,
+            "period": period,
+            "position": board.rank(user_id),
+            "period_earned": board.scores.get(user_id, 0.0),
+            "total_participants": len(board.index)
+        }
+    
     def _calculate_esg_level(self, gst_balance: float) -> str:
         """Calcular nível ESG baseado no saldo GST"""
-        if gst_balance >= 5000:
-            return "Mestre ESG"
-        elif gst_balance >= 2000:
-            return "Guardião Verde"
-        elif gst_balance >= 1000:
-            return "Intermediário ESG"
-        elif gst_balance >= 500:
-            return "Iniciante ESG"
-        else:
-            return "Novato ESG"
+        return self.tiering.level(gst_balance)
     
     def get_status(self) -> Dict[str, Any]:
         return {
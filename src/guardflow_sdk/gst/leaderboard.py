@@ -0,0 +1,192 @@
+from typing import Dict, Any, List, Optional, Tuple
+import random
+import time
+from datetime import datetime, timedelta
+
+class _SkipNode:
+    __slots__ = ("key", "next", "width")
+    
+    def __init__(self, key, levels: int):
+        self.key = key
+        self.next: List[Optional["_SkipNode"]] = [None] * levels
+        self.width = [1] * levels
+
+class IndexableSkipList:
+    """
+    Skip list ordenada com larguras nos links (order-statistic)
+    Inserção, remoção, rank e acesso por posição em O(log n)
+    """
+    
+    MAX_LEVELS = 32
+    
+    def __init__(self):
+        self.head = _SkipNode(None, self.MAX_LEVELS)
+        self.levels = 1
+        self.size = 0
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def insert(self, key):
+        update, ranks = self._search(key)
+        levels = self._random_levels()
+        if levels > self.levels:
+            for level in range(self.levels, levels):
+                update[level] = self.head
+                ranks[level] = 0
+                self.head.width[level] = self.size + 1
+            self.levels = levels
+        
+        node = _SkipNode(key, levels)
+        rank = ranks[0] + 1
+        for level in range(levels):
+            previous = update[level]
+            node.next[level] = previous.next[level]
+            previous.next[level] = node
+            # Larguras divididas pelo novo nó
+            node.width[level] = previous.width[level] - (rank - ranks[level]) + 1
+            previous.width[level] = rank - ranks[level]
+        for level in range(levels, self.levels):
+            update[level].width[level] += 1
+        self.size += 1
+    
+    def remove(self, key) -> bool:
+        update, _ = self._search(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            return False
+        for level in range(self.levels):
+            previous = update[level]
+            if previous.next[level] is node:
+                previous.width[level] += node.width[level] - 1
+                previous.next[level] = node.next[level]
+            else:
+                previous.width[level] -= 1
+        self.size -= 1
+        return True
+    
+    def rank(self, key) -> Optional[int]:
+        """Posição (0-based) da chave, ou None"""
+        node = self.head
+        position = 0
+        for level in range(self.levels - 1, -1, -1):
+            while node.next[level] is not None and node.next[level].key <= key:
+                position += node.width[level]
+                node = node.next[level]
+            if node is not self.head and node.key == key:
+                return position - 1
+        return None
+    
+    def slice(self, start: int, count: int) -> List:
+        """Chaves nas posições [start, start + count)"""
+        if start >= self.size or count <= 0:
+            return []
+        node = self.head
+        remaining = start + 1
+        for level in range(self.levels - 1, -1, -1):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        result = []
+        while node is not None and len(result) < count:
+            result.append(node.key)
+            node = node.next[0]
+        return result
+    
+    def _search(self, key) -> Tuple[List[_SkipNode], List[int]]:
+        update = [self.head] * self.MAX_LEVELS
+        ranks = [0] * self.MAX_LEVELS
+        node = self.head
+        position = 0
+        for level in range(self.levels - 1, -1, -1):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            update[level] = node
+            ranks[level] = position
+        return update, ranks
+    
+    def _random_levels(self) -> int:
+        levels = 1
+        while levels < self.MAX_LEVELS and random.random() < 0.5:
+            levels += 1
+        return levels
+
+class PeriodLeaderboard:
+    """
+    Ranking de GST ganho dentro de uma janela (diária, semanal ou mensal)
+    A virada de janela troca a estrutura por uma vazia, sem rebuild
+    """
+    
+    def __init__(self, period: str):
+        self.period = period
+        self.window = None
+        self.scores: Dict[str, float] = {}
+        self.index = IndexableSkipList()
+        self.started_at: Optional[float] = None
+    
+    def record(self, user_id: str, earned: float, timestamp: float):
+        """Somar GST ganho pelo usuário na janela atual"""
+        self._roll(timestamp)
+        previous = self.scores.get(user_id)
+        if previous is not None:
+            self.index.remove((-previous, user_id))
+        score = (previous or 0.0) + earned
+        self.scores[user_id] = score
+        self.index.insert((-score, user_id))
+    
+    def top(self, limit: int, timestamp: Optional[float] = None) -> List[Tuple[str, float]]:
+        self._roll(time.time() if timestamp is None else timestamp)
+        return [(user_id, -negative_score) for negative_score, user_id in self.index.slice(0, limit)]
+    
+    def rank(self, user_id: str, timestamp: Optional[float] = None) -> Optional[int]:
+        """Posição (1-based) do usuário na janela atual"""
+        self._roll(time.time() if timestamp is None else timestamp)
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        return self.index.rank((-score, user_id)) + 1
+    
+    def _roll(self, timestamp: float):
+        window = self._window_for(timestamp)
+        if window != self.window:
+            self.window = window
+            self.scores = {}
+            self.index = IndexableSkipList()
+            self.started_at = timestamp
+    
+    def _window_for(self, timestamp: float):
+        moment = datetime.utcfromtimestamp(timestamp)
+        if self.period == "daily":
+            return moment.date()
+        if self.period == "weekly":
+            return moment.isocalendar()[:2]
+        return (moment.year, moment.month)
+
+class LeaderboardIndex:
+    """
+    Índices de ranking por período, atualizados a cada crédito no ledger
+    """
+    
+    PERIODS = ("daily", "weekly", "monthly")
+    
+    def __init__(self):
+        self.boards = {period: PeriodLeaderboard(period) for period in self.PERIODS}
+    
+    def on_ledger_change(self, user_id: str, balance: float, delta: float, kind: str,
+                         timestamp: Optional[float] = None):
+        """Listener do GSTLedger: apenas recompensas contam como ganho"""
+        if kind == "mint" and delta > 0:
+            timestamp = time.time() if timestamp is None else timestamp
+            for board in self.boards.values():
+                board.record(user_id, delta, timestamp)
+    
+    def replay_since(self, now: Optional[float] = None) -> float:
+        """Início da janela mais antiga ainda aberta (mês ou semana ISO corrente)"""
+        moment = datetime.utcfromtimestamp(time.time() if now is None else now)
+        month_start = datetime(moment.year, moment.month, 1)
+        week_start = datetime(moment.year, moment.month, moment.day) - timedelta(days=moment.weekday())
+        return (min(month_start, week_start) - datetime(1970, 1, 1)).total_seconds()
+    
+    def get(self, period: str) -> Optional[PeriodLeaderboard]:
+        return self.boards.get(period)
@@ -0,0 +1,212 @@
+from typing import Dict, Any, List, Optional, Callable, Tuple, Sequence
+import json
+import os
+import time
+
+class LedgerError(Exception):
+    """Erro de operação no ledger GST"""
+
+class GSTLedger:
+    """
+    Ledger GST com journal append-only e saldos materializados
+    Leituras de saldo são O(1); snapshots compactados aceleram o restart
+    """
+    
+    # Posições na lista de conta: saldo, total ganho (mints), total gasto
+    BALANCE, EARNED, SPENT = 0, 1, 2
+    
+    def __init__(self, token_supply: float, initial_circulating: float = 0.0,
+                 journal_path: Optional[str] = None, snapshot_path: Optional[str] = None,
+                 snapshot_interval: int = 100000):
+        self.token_supply = token_supply
+        self.circulating_supply = initial_circulating
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.accounts: Dict[str, List[float]] = {}
+        self.sequence = 0
+        self._writes_since_snapshot = 0
+        self._journal: List[Tuple] = []
+        self._journal_file = open(journal_path, "a", encoding="utf-8") if journal_path else None
+        self._listeners: List[Callable[[str, float, float, str, float], None]] = []
+    
+    def subscribe(self, listener: Callable[[str, float, float, str, float], None]):
+        """Registrar callback (user_id, novo saldo, delta, tipo, timestamp) para cada alteração"""
+        self._listeners.append(listener)
+    
+    def balance(self, user_id: str) -> float:
+        account = self.accounts.get(user_id)
+        return account[self.BALANCE] if account else 0.0
+    
+    def account(self, user_id: str) -> Dict[str, float]:
+        account = self.accounts.get(user_id) or [0.0, 0.0, 0.0]
+        return {
+            "balance": account[self.BALANCE],
+            "total_earned": account[self.EARNED],
+            "total_spent": account[self.SPENT]
+        }
+    
+    def mint(self, user_id: str, amount: float, reason: str) -> Dict[str, Any]:
+        """Creditar tokens novos (recompensas) ao usuário"""
+        if amount <= 0:
+            raise LedgerError("Amount must be positive")
+        if self.circulating_supply + amount > self.token_supply:
+            raise LedgerError("Token supply exhausted")
+        entry = self._append("mint", None, user_id, amount, 0.0, reason)
+        self._credit(user_id, amount, "mint", entry["timestamp"])
+        self.circulating_supply += amount
+        self._after_write()
+        return entry
+    
+    def mint_many(self, amounts: Dict[str, float], reason: str) -> int:
+        """Creditar recompensas de um lote: uma entrada de journal por usuário"""
+        total = sum(amounts.values())
+        if any(amount <= 0 for amount in amounts.values()):
+            raise LedgerError("Amount must be positive")
+        if self.circulating_supply + total > self.token_supply:
+            raise LedgerError("Token supply exhausted")
+        for user_id, amount in amounts.items():
+            entry = self._append("mint", None, user_id, amount, 0.0, reason)
+            self._credit(user_id, amount, "mint", entry["timestamp"])
+        self.circulating_supply += total
+        self._after_write(len(amounts))
+        return len(amounts)
+    
+    def transfer(self, from_user: str, to_user: str, amount: float, fee: float = 0.0) -> Dict[str, Any]:
+        """Transferir entre usuários; a taxa volta para a tesouraria"""
+        if amount <= 0:
+            raise LedgerError("Amount must be positive")
+        if self.balance(from_user) < amount + fee:
+            raise LedgerError("Insufficient balance")
+        entry = self._append("transfer", from_user, to_user, amount, fee, None)
+        self._debit(from_user, amount + fee, "transfer", entry["timestamp"])
+        self._credit(to_user, amount, "transfer", entry["timestamp"])
+        self.circulating_supply -= fee
+        self._after_write()
+        return entry
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Gravar snapshot compactado (saldos + posição do journal)"""
+        data = {
+            "sequence": self.sequence,
+            "journal_offset": self._journal_file.tell() if self._journal_file else None,
+            "circulating_supply": self.circulating_supply,
+            "accounts": self.accounts,
+            "created_at": time.time()
+        }
+        if self.snapshot_path:
+            temp_path = f"{self.snapshot_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as snapshot_file:
+                json.dump(data, snapshot_file)
+            os.replace(temp_path, self.snapshot_path)
+        return {"sequence": self.sequence, "accounts": len(self.accounts)}
+    
+    @classmethod
+    def recover(cls, token_supply: float, journal_path: Optional[str], snapshot_path: Optional[str] = None,
+                initial_circulating: float = 0.0, snapshot_interval: int = 100000,
+                listeners: Sequence[Callable] = (), notify_since: Optional[float] = None) -> "GSTLedger":
+        """
+        Reconstruir ledger: último snapshot + replay do journal posterior
+        Listeners assinam antes do replay; com notify_since, entradas já
+        cobertas pelo snapshot a partir desse instante também são notificadas
+        """
+        ledger = cls(token_supply, initial_circulating, None, snapshot_path, snapshot_interval)
+        for listener in listeners:
+            ledger.subscribe(listener)
+        offset = 0
+        if snapshot_path and os.path.exists(snapshot_path):
+            with open(snapshot_path, encoding="utf-8") as snapshot_file:
+                data = json.load(snapshot_file)
+            ledger.accounts = data["accounts"]
+            ledger.sequence = data["sequence"]
+            ledger.circulating_supply = data["circulating_supply"]
+            offset = data["journal_offset"] or 0
+        
+        if journal_path and os.path.exists(journal_path):
+            with open(journal_path, encoding="utf-8") as journal_file:
+                journal_file.seek(0 if notify_since is not None else offset)
+                for line in journal_file:
+                    if not line.strip():
+                        continue
+                    seq, timestamp, kind, from_user, to_user, amount, fee, _ = json.loads(line)
+                    if seq <= ledger.sequence:
+                        if notify_since is not None and timestamp >= notify_since:
+                            # Já no snapshot: só reconstruir os índices derivados
+                            if kind == "transfer":
+                                ledger._notify(from_user, -(amount + fee), kind, timestamp)
+                            ledger._notify(to_user, amount, kind, timestamp)
+                        continue
+                    if kind == "transfer":
+                        ledger._debit(from_user, amount + fee, kind, timestamp)
+                        ledger.circulating_supply -= fee
+                    else:
+                        ledger.circulating_supply += amount
+                    ledger._credit(to_user, amount, kind, timestamp)
+                    ledger.sequence = seq
+        
+        if journal_path:
+            ledger.journal_path = journal_path
+            ledger._journal_file = open(journal_path, "a", encoding="utf-8")
+        return ledger
+    
+    def journal(self, since_sequence: int = 0) -> List[Dict[str, Any]]:
+        """Entradas do journal em memória após uma sequência"""
+        return [self._entry_dict(entry) for entry in self._journal if entry[0] > since_sequence]
+    
+    def close(self):
+        if self._journal_file:
+            self._journal_file.close()
+            self._journal_file = None
+    
+    def _append(self, kind: str, from_user: Optional[str], to_user: str,
+                amount: float, fee: float, reason: Optional[str]) -> Dict[str, Any]:
+        self.sequence += 1
+        entry = (self.sequence, time.time(), kind, from_user, to_user, amount, fee, reason)
+        self._journal.append(entry)
+        if self._journal_file:
+            self._journal_file.write(json.dumps(entry) + "\n")
+        return self._entry_dict(entry)
+    
+    def _after_write(self, writes: int = 1):
+        if self._journal_file:
+            self._journal_file.flush()
+        self._writes_since_snapshot += writes
+        if self._writes_since_snapshot >= self.snapshot_interval:
+            self._writes_since_snapshot = 0
+            self.snapshot()
+            # Após o snapshot, as entradas em memória podem ser descartadas
+            self._journal.clear()
+    
+    def _credit(self, user_id: str, amount: float, kind: str, timestamp: float):
+        account = self.accounts.get(user_id)
+        if account is None:
+            account = self.accounts[user_id] = [0.0, 0.0, 0.0]
+        account[self.BALANCE] += amount
+        if kind == "mint":
+            # Só recompensas contam como ganho; transferências recebidas não
+            account[self.EARNED] += amount
+        self._notify(user_id, amount, kind, timestamp)
+    
+    def _debit(self, user_id: str, amount: float, kind: str, timestamp: float):
+        account = self.accounts[user_id]
+        account[self.BALANCE] -= amount
+        account[self.SPENT] += amount
+        self._notify(user_id, -amount, kind, timestamp)
+    
+    def _notify(self, user_id: str, delta: float, kind: str, timestamp: float):
+        balance = self.balance(user_id)
+        for listener in self._listeners:
+            listener(user_id, balance, delta, kind, timestamp)
+    
+    def _entry_dict(self, entry: Tuple) -> Dict[str, Any]:
+        seq, timestamp, kind, from_user, to_user, amount, fee, reason = entry
+        return {
+            "sequence": seq,
+            "timestamp": timestamp,
+            "type": kind,
+            "from_user": from_user,
+            "to_user": to_user,
+            "amount": amount,
+            "fee": fee,
+            "reason": reason
+        }
@@ -0,0 +1,79 @@
+from typing import Dict, Any, List, Optional, Callable, Sequence
+from bisect import bisect_right
+import numpy as np
+
+# Níveis ESG padrão por saldo GST mínimo
+DEFAULT_TIERS = (
+    (0, "Novato ESG"),
+    (500, "Iniciante ESG"),
+    (1000, "Intermediário ESG"),
+    (2000, "Guardião Verde"),
+    (5000, "Mestre ESG")
+)
+
+class ESGTiering:
+    """
+    Classificação de níveis ESG por faixas de saldo
+    Lookup individual via bisect e classificação em massa via np.searchsorted
+    """
+    
+    def __init__(self, tiers: Sequence = DEFAULT_TIERS):
+        tiers = sorted(tiers)
+        self.thresholds = [threshold for threshold, _ in tiers[1:]]
+        self.labels = [label for _, label in tiers]
+        self._threshold_array = np.asarray(self.thresholds, dtype=np.float64)
+        self._label_array = np.asarray(self.labels, dtype=object)
+        self.user_tiers: Dict[str, int] = {}
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+    
+    def subscribe(self, listener: Callable[[Dict[str, Any]], None]):
+        """Registrar callback para eventos de mudança de nível"""
+        self._listeners.append(listener)
+    
+    def tier_index(self, balance: float) -> int:
+        return bisect_right(self.thresholds, balance)
+    
+    def level(self, balance: float) -> str:
+        return self.labels[bisect_right(self.thresholds, balance)]
+    
+    def classify_many(self, balances: Sequence[float]) -> np.ndarray:
+        """Índices de nível para uma população inteira"""
+        return np.searchsorted(self._threshold_array, np.asarray(balances, dtype=np.float64), side="right")
+    
+    def levels_many(self, balances: Sequence[float]) -> np.ndarray:
+        return self._label_array[self.classify_many(balances)]
+    
+    def update(self, user_id: str, balance: float) -> Optional[Dict[str, Any]]:
+        """Reclassificar um usuário, emitindo evento se o nível mudou"""
+        new_tier = self.tier_index(balance)
+        old_tier = self.user_tiers.get(user_id, 0)
+        if new_tier == old_tier:
+            return None
+        self.user_tiers[user_id] = new_tier
+        return self._emit(user_id, old_tier, new_tier, balance)
+    
+    def retier(self, user_ids: Sequence[str], balances: Sequence[float]) -> List[Dict[str, Any]]:
+        """Reclassificar em massa; apenas usuários que mudaram geram evento"""
+        new_tiers = self.classify_many(balances)
+        old_tiers = np.fromiter((self.user_tiers.get(user_id, 0) for user_id in user_ids),
+                                dtype=new_tiers.dtype, count=len(user_ids))
+        changed = np.flatnonzero(new_tiers != old_tiers)
+        events = []
+        for position in changed.tolist():
+            user_id = user_ids[position]
+            new_tier = int(new_tiers[position])
+            self.user_tiers[user_id] = new_tier
+            events.append(self._emit(user_id, int(old_tiers[position]), new_tier, balances[position]))
+        return events
+    
+    def _emit(self, user_id: str, old_tier: int, new_tier: int, balance: float) -> Dict[str, Any]:
+        event = {
+            "user_id": user_id,
+            "previous_level": self.labels[old_tier],
+            "new_level": self.labels[new_tier],
+            "direction": "up" if new_tier > old_tier else "down",
+            "gst_balance": balance
+        }
+        for listener in self._listeners:
+            listener(event)
+        return event
@@ -2,10 +2,15 @@ from typing import Dict, Any, List, Optional
 import httpx
 import random
 import hashlib
+import time
 from datetime import datetime
 from PIL import Image, ImageDraw, ImageFont
 import io
 import base64
+from ..blockchain.fee_oracle import FeeOracle
+from ..blockchain.nonces import NonceManager
+from ..blockchain.tx_submitter import TransactionSubmitter
+from ..blockchain.local_chain import LocalChain
 
 class InvoiceNFT:
     """
@@ -13,16 +18,69 @@ class InvoiceNFT:
     Cada nota fiscal vira um NFT único com metadados ESG
     """
     
-    def __init__(self, client: httpx.Client, api_key: str = None):
+    def __init__(self, client: httpx.Client, api_key: str = None, minter_address: str = "0xGuardFlowMinter",
+                 max_in_flight: int = 64, mint_timeout: float = 120.0, bump_after: float = 30.0):
         self.client = client
         self.api_key = api_key
         self.nft_contract_address = "0xGuardFlowNFT"
         self.metadata_base_uri = "https://metadata.guardflow.com/nft/"
+        self.fee_oracle = FeeOracle(self._sample_gas_price)
+        self.minter_address = minter_address
+        self.mint_timeout = mint_timeout
+        self.chain = LocalChain("guardflow-nft")  # Mock - em produção seria o nó RPC
+        self.nonces = NonceManager(self._fetch_chain_nonce)
+        self.submitter = TransactionSubmitter(
+            minter_address, self.nonces, self._send_raw_transaction, self._get_receipts,
+            self.fee_oracle, max_in_flight=max_in_flight, bump_after=bump_after
+        )
+        self._sent_transactions: Dict[str, Dict[str, Any]] = {}
+        self._nonce_hashes: Dict[int, List[str]] = {}  # Hashes enviados por nonce (bumps incluídos)
     
     def convert_invoice_to_nft(self, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Converter nota fiscal em NFT ESG
         """
+        invoice_hash, esg_score, nft_metadata, nft_image = self._prepare_nft(invoice_data)
+        
+        # Mintar NFT na blockchain
+        nft_result = self._mint_nft_on_blockchain(invoice_hash, nft_metadata, nft_image)
+        if "error" in nft_result:
+            return nft_result
+        
+        return self._nft_result(invoice_hash, esg_score, nft_metadata, nft_result)
+    
+    def convert_invoices_to_nfts(self, invoices: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Converter várias notas fiscais em NFTs
+        Todos os mints são enviados antes de aguardar as confirmações
+        """
+        prepared = [self._prepare_nft(invoice_data) for invoice_data in invoices]
+        futures = [self.submitter.submit({"method": "mint", "invoice_hash": invoice_hash, "token_uri": metadata["image"]})
+                   for invoice_hash, _, metadata, _ in prepared]
+        
+        nfts = []
+        errors = []
+        deadline = time.monotonic() + self.mint_timeout
+        for (invoice_hash, esg_score, metadata, _), future in zip(prepared, futures):
+            try:
+                receipt = future.result(max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                errors.append({"invoice_hash": invoice_hash, "error": "Mint confirmation timeout"})
+                continue
+            except Exception as exc:
+                errors.append({"invoice_hash": invoice_hash, "error": str(exc)})
+                continue
+            nfts.append(self._nft_result(invoice_hash, esg_score, metadata, self._mint_result(invoice_hash, receipt)))
+        
+        return {
+            "total_submitted": len(invoices),
+            "total_minted": len(nfts),
+            "nfts": nfts,
+            "errors": errors
+        }
+    
+    def _prepare_nft(self, invoice_data: Dict[str, Any]):
+        """Hash, score, metadados e imagem do NFT"""
         # Gerar hash único da nota fiscal
         invoice_hash = self._generate_invoice_hash(invoice_data)
         
@@ -35,9 +93,10 @@ class InvoiceNFT:
         # Criar imagem do NFT
         nft_image = self._generate_nft_image(invoice_data, esg_score)
         
-        # Mintar NFT na blockchain
-        nft_result = self._mint_nft_on_blockchain(invoice_hash, nft_metadata, nft_image)
-        
+        return invoice_hash, esg_score, nft_metadata, nft_image
+    
+    def _nft_result(self, invoice_hash: str, esg_score: float, nft_metadata: Dict[str, Any],
+                    nft_result: Dict[str, Any]) -> Dict[str, Any]:
         return {
             "nft_id": nft_result["token_id"],
             "invoice_hash": invoice_hash,
@@ -195,18 +254,64 @@ class InvoiceNFT:
     
     def _mint_nft_on_blockchain(self, invoice_hash: str, metadata: Dict[str, Any], image: str) -> Dict[str, Any]:
         """Mintar NFT na blockchain"""
-        # Mock blockchain transaction
-        token_id = f"GFNFT_{random.randint(100000, 999999)}"
-        transaction_hash = f"0x{random.randint(100000, 999999)}"
-        
+        future = self.submitter.submit({"method": "mint", "invoice_hash": invoice_hash, "token_uri": metadata["image"]})
+        try:
+            receipt = future.result(self.mint_timeout)
+        except TimeoutError:
+            return {"error": "Mint confirmation timeout"}
+        except Exception as exc:
+            return {"error": f"Mint failed: {exc}"}
+        return self._mint_result(invoice_hash, receipt)
+    
+    def _mint_result(self, invoice_hash: str, receipt: Dict[str, Any]) -> Dict[str, Any]:
         return {
-            "token_id": token_id,
-            "transaction_hash": transaction_hash,
+            "token_id": receipt["token_id"],
+            "transaction_hash": receipt["tx_hash"],
             "image_url": f"{self.metadata_base_uri}{invoice_hash}.png",
-            "gas_used": random.randint(50000, 100000),
-            "gas_price": 0.00002
+            "gas_used": receipt["gas_used"],
+            "gas_price": receipt["gas_price"]
         }
     
+    def _fetch_chain_nonce(self, address: str) -> int:
+        """Nonce atual do endereço na rede"""
+        # Mock - em produção viria de eth_getTransactionCount (pending)
+        return self.chain.transaction_count(address)
+    
+    def _send_raw_transaction(self, transaction: Dict[str, Any]) -> str:
+        """Assinar e enviar transação de mint"""
+        # Mock - em produção: assinatura local + eth_sendRawTransaction
+        tx_hash = self.chain.submit({
+            "type": "mint",
+            "signer": transaction["from"],
+            "nonce": transaction["nonce"],
+            "gas_price": transaction["gas_price"],
+            "invoice_hash": transaction["payload"]["invoice_hash"]
+        })
+        self._sent_transactions[tx_hash] = transaction
+        self._nonce_hashes.setdefault(transaction["nonce"], []).append(tx_hash)
+        return tx_hash
+    
+    def _get_receipts(self, tx_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Consultar recibos de várias transações em uma chamada"""
+        # Mock - em produção: batch JSON-RPC de eth_getTransactionReceipt (token_id vem do evento Transfer)
+        if self.chain.pending_count:
+            # Demanda da rede: transações abaixo da taxa corrente ficam no mempool
+            self.chain.mine(min_gas_price=self._sample_gas_price() * 0.8)
+        receipts = self.chain.get_receipts(tx_hashes)
+        for tx_hash, receipt in receipts.items():
+            nonce = self._sent_transactions[tx_hash]["nonce"]
+            receipt["token_id"] = f"GFNFT_{nonce + 1:06d}"
+            receipt["gas_used"] = random.randint(50000, 100000)
+            # Recibo consumido: descartar este hash e as versões substituídas do nonce
+            for sent_hash in self._nonce_hashes.pop(nonce, ()):
+                self._sent_transactions.pop(sent_hash, None)
+        return receipts
+    
+    def _sample_gas_price(self) -> float:
+        """Preço de gas atual da rede"""
+        # Mock - em produção viria de eth_gasPrice / eth_feeHistory
+        return 0.00002 * random.lognormvariate(0, 0.25)
+    
     def get_nft_collection(self, user_id: str) -> Dict[str, Any]:
         """Obter coleção de NFTs do usuário"""
         # Mock collection data
@@ -262,5 +367,10 @@ class InvoiceNFT:
             "average_price": sum(listing["price_gst"] for listing in listings) / len(listings) if listings else 0
         }
     
+    def close(self):
+        """Parar a amostragem de taxas e o loop de confirmação em background"""
+        self.submitter.stop()
+        self.fee_oracle.stop()
+    
     def get_status(self) -> Dict[str, Any]:
         return {"status": "active", "module": "invoice_nft"}
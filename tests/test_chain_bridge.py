@@ -0,0 +1,37 @@
+from guardflow_sdk.blockchain.bridge import BlockchainBridge
+from guardflow_sdk.blockchain.local_chain import LocalChain
+
+
+def test_reorg_deeper_than_chain_clamps_to_genesis():
+    chain = LocalChain()
+    for _ in range(3):
+        chain.mine()
+
+    head = chain.reorg(10, replacement_blocks=1)
+
+    assert head == 1
+    assert chain.get_blocks(1, 1)[0]["parent_hash"] == chain.block_hash(0)
+
+
+def _transfer(chain, timestamp, amount):
+    chain.submit({"type": "transfer", "from_user": "alice", "to_user": "bob", "amount": amount})
+    chain.mine()["timestamp"] = timestamp
+
+
+def test_transfers_merge_chains_by_time_before_limit():
+    bridge = BlockchainBridge(client=None)
+    try:
+        solana, polygon = bridge.chains["Solana"], bridge.chains["Polygon"]
+        # Solana tem números de bloco maiores, mas transferências mais antigas
+        for index in range(5):
+            _transfer(solana, 100.0 + index, 1.0)
+        _transfer(polygon, 200.0, 2.0)
+        bridge.sync_index()
+
+        transfers = bridge.get_transfers("alice", limit=2)
+
+        assert [(transfer["blockchain"], transfer["timestamp"]) for transfer in transfers] == [
+            ("Polygon", 200.0), ("Solana", 104.0)
+        ]
+    finally:
+        bridge.close()
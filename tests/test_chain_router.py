@@ -0,0 +1,35 @@
+import pytest
+
+from guardflow_sdk.blockchain.chain_router import ChainClientPool, ChainRouter
+
+
+def _router(probe_interval):
+    pools = {name: ChainClientPool(name, lambda name=name: name, 2) for name in ("A", "B")}
+    return ChainRouter(pools, {"A": 0.001, "B": 0.01}, probe_interval=probe_interval)
+
+
+def _fail(name, client):
+    raise ConnectionError("down")
+
+
+def test_unhealthy_chain_is_probed_after_interval_and_recovers():
+    router = _router(probe_interval=0.0)
+    for _ in range(5):
+        with pytest.raises(ConnectionError):
+            router.execute("transfer", _fail, "A")
+    assert router.stats["A"].error_rate >= router.max_error_rate
+
+    chain, _ = router.execute("transfer", lambda name, client: {"fee": 0.001})
+
+    assert chain == "A"
+    assert router.stats["A"].tripped_at is None
+    assert router.rank("transfer")[0] == "A"
+
+
+def test_unhealthy_chain_is_skipped_before_interval():
+    router = _router(probe_interval=3600.0)
+    for _ in range(5):
+        with pytest.raises(ConnectionError):
+            router.execute("transfer", _fail, "A")
+
+    assert router.rank("transfer") == ["B"]
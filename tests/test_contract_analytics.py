@@ -0,0 +1,38 @@
+from guardflow_sdk.blockchain.contract_analytics import ContractAnalyticsProjector
+
+
+def _event(contract_id, block_number, log_index, value=1.0, user="0xa"):
+    return {"contract_id": contract_id, "block_number": block_number, "log_index": log_index,
+            "value": value, "user": user, "timestamp": 1_700_000_000.0}
+
+
+def test_events_in_same_block_are_all_applied():
+    projector = ContractAnalyticsProjector()
+    events = [_event("C1", 10, 0), _event("C2", 10, 1), _event("C2", 10, 2)]
+
+    assert projector.apply_many(events) == 3
+    assert projector.snapshot("C1")["total_transactions"] == 1
+    assert projector.snapshot("C2")["total_transactions"] == 2
+    assert projector.cursor == 10
+
+
+def test_replaying_cursor_block_is_idempotent():
+    projector = ContractAnalyticsProjector()
+    projector.apply_many([_event("C1", 10, 0), _event("C1", 10, 1)])
+
+    # Feed relido a partir do bloco do cursor: só o evento novo entra
+    applied = projector.apply_many([_event("C1", 9, 0), _event("C1", 10, 0), _event("C1", 10, 1),
+                                    _event("C1", 10, 2), _event("C1", 11, 0)])
+
+    assert applied == 2
+    assert projector.snapshot("C1")["total_transactions"] == 4
+    assert projector.cursor == 11
+
+
+def test_user_tracking_is_bounded():
+    projector = ContractAnalyticsProjector()
+    projector.apply_many(_event("C1", block, 0, user=f"0x{block}") for block in range(1, 20001))
+
+    metrics = projector.metrics["C1"]
+    assert len(metrics.user_transactions) == metrics.max_tracked_users
+    assert projector.snapshot("C1")["active_users"] == 20000
@@ -0,0 +1,33 @@
+from guardflow_sdk.erp.scheduler import ERPSyncScheduler
+
+
+class FakeConnectors:
+    supported_erps = ["SAP"]
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = {}
+
+    def sync_with_market(self, erp_system, market_id):
+        self.calls[market_id] = self.calls.get(market_id, 0) + 1
+        result = self.results[market_id]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_permanent_errors_fail_without_retry():
+    connectors = FakeConnectors({
+        "bad-record": {"error": "Invalid ERP record: 'sku'"},
+        "bad-value": ValueError("Required ERP field empty: sku"),
+        "flaky": ConnectionError("ERP timeout")
+    })
+    scheduler = ERPSyncScheduler(connectors, max_attempts=3, backoff_base=0.0)
+
+    result = scheduler.run([("SAP", "bad-record"), ("SAP", "bad-value"), ("SAP", "flaky")])
+
+    assert connectors.calls == {"bad-record": 1, "bad-value": 1, "flaky": 3}
+    assert result["retries"] == 2
+    assert {failure["market_id"]: failure["attempts"] for failure in result["failures"]} == {
+        "bad-record": 1, "bad-value": 1, "flaky": 3
+    }
@@ -0,0 +1,28 @@
+import json
+
+import httpx
+
+from guardflow_sdk.erp.connectors import ERPConnectors
+
+
+def _connectors(content: bytes) -> ERPConnectors:
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=content))
+    return ERPConnectors(httpx.Client(transport=transport))
+
+
+def test_invalid_json_records_are_rejected_without_aborting_stream():
+    body = json.dumps([{"ITEM_NUMBER": "1"}, {"LIST_PRICE": "3"}, {"ITEM_NUMBER": "2"}]).encode()
+
+    result = _connectors(body).sync_stream("Oracle", "market", "http://erp/export", chunk_size=1)
+
+    assert result["products_synced"] == 2
+    assert result["rows_rejected"] == 1
+
+
+def test_csv_rows_with_empty_required_field_are_rejected():
+    body = "B1_COD;B1_DESC\nA;x\n;\n  ;y\nB;z\n".encode()
+
+    result = _connectors(body).sync_stream("TOTVS", "market", "http://erp/export")
+
+    assert result["products_synced"] == 2
+    assert result["rows_rejected"] == 2
@@ -0,0 +1,19 @@
+from guardflow_sdk.gst.ecosystem import GSTEcosystem
+
+
+def test_zero_score_activity_rewards_nothing():
+    ecosystem = GSTEcosystem(None)
+
+    result = ecosystem.reward_esg_activity("alice", "recycling", 0)
+
+    assert result["reward_amount"] == 0.0
+    assert ecosystem.ledger.sequence == 0
+
+
+def test_incoming_transfers_do_not_count_as_earned():
+    ecosystem = GSTEcosystem(None)
+    ecosystem.reward_esg_activity("alice", "recycling", 100)
+    ecosystem.transfer_gst("alice", "bob", 5)
+
+    assert ecosystem.get_user_gst_balance("bob")["total_earned"] == 0.0
+    assert ecosystem.get_user_gst_balance("alice")["total_earned"] == 10.0
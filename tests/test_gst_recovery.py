@@ -0,0 +1,34 @@
+from guardflow_sdk.gst.ecosystem import GSTEcosystem
+
+
+def _restart(ecosystem, journal_path, snapshot_path=None):
+    ecosystem.ledger.close()
+    return GSTEcosystem(None, journal_path=journal_path, snapshot_path=snapshot_path,
+                        esg_tiers=((0, "Novato"), (5, "Ativo")))
+
+
+def test_leaderboard_and_levels_survive_restart(tmp_path):
+    journal_path = str(tmp_path / "gst.journal")
+    ecosystem = GSTEcosystem(None, journal_path=journal_path, esg_tiers=((0, "Novato"), (5, "Ativo")))
+    ecosystem.reward_esg_activity("alice", "recycling", 100)
+    ecosystem.reward_esg_activity("bob", "recycling", 40)
+
+    recovered = _restart(ecosystem, journal_path)
+
+    board = recovered.get_leaderboard("daily")["leaderboard"]
+    assert [(row["user_id"], row["period_earned"]) for row in board] == [("alice", 10.0), ("bob", 4.0)]
+    assert recovered.tiering.user_tiers == {"alice": 1}
+
+
+def test_leaderboard_includes_entries_covered_by_snapshot(tmp_path):
+    journal_path = str(tmp_path / "gst.journal")
+    snapshot_path = str(tmp_path / "gst.snapshot")
+    ecosystem = GSTEcosystem(None, journal_path=journal_path, snapshot_path=snapshot_path)
+    ecosystem.reward_esg_activity("alice", "recycling", 100)
+    ecosystem.ledger.snapshot()
+    ecosystem.reward_esg_activity("alice", "recycling", 50)
+
+    recovered = _restart(ecosystem, journal_path, snapshot_path)
+
+    assert recovered.get_user_gst_balance("alice")["gst_balance"] == 15.0
+    assert recovered.get_user_rank("alice", "monthly")["period_earned"] == 15.0
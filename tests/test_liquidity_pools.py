@@ -0,0 +1,28 @@
+from decimal import Decimal
+
+from guardflow_sdk.defi.liquidity_pools import LiquidityPools
+
+
+def test_positions_keep_decimal_shares_and_close_exactly():
+    pools = LiquidityPools(client=None)
+    pool_id = pools.create_esg_pool({"initial_liquidity": 10000})["pool_id"]
+    amm = pools.amm[pool_id]
+    initial_shares = amm.total_shares
+
+    position = pools.add_liquidity(pool_id, "alice", 1234.567, 1234.567)
+    for _ in range(3):
+        pools.swap(pool_id, "bob", "ESG", 100.0)
+        pools.swap(pool_id, "bob", "GST", 100.0)
+
+    stored = pools.user_positions["alice"][0]
+    assert isinstance(stored["shares"], Decimal)
+    assert isinstance(stored["fee_growth_a"], Decimal)
+    assert isinstance(position["shares"], float)
+
+    removed = pools.remove_liquidity(position["position_id"], "alice", position["shares"])
+
+    assert removed["status"] == "completed"
+    assert removed["fees_earned_a"] > 0 and removed["fees_earned_b"] > 0
+    assert stored["shares"] == 0 and stored["status"] == "closed"
+    assert amm.total_shares == initial_shares
+    assert isinstance(pools.get_user_positions("alice")["positions"][0]["shares"], float)
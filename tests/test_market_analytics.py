@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from guardflow_sdk.ai.market_analytics import MarketStreamAggregator, to_epoch
+
+
+def test_to_epoch_accepts_iso_strings_datetimes_and_numbers():
+    moment = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+    assert to_epoch("2024-05-01T12:00:00") == moment.timestamp()
+    assert to_epoch("2024-05-01T12:00:00Z") == moment.timestamp()
+    assert to_epoch(moment.replace(tzinfo=None)) == moment.timestamp()
+    assert to_epoch(moment.timestamp()) == moment.timestamp()
+
+
+def test_record_sale_rejects_bad_timestamp_without_partial_update():
+    aggregator = MarketStreamAggregator("market")
+
+    with pytest.raises(ValueError):
+        aggregator.record_sale({"timestamp": "not-a-date", "amount": 10})
+
+    assert aggregator.total_sales == 0
@@ -0,0 +1,122 @@
+import threading
+
+from guardflow_sdk.blockchain.fee_oracle import FeeOracle
+from guardflow_sdk.blockchain.nonces import NonceManager
+from guardflow_sdk.blockchain.tx_submitter import TransactionSubmitter
+
+
+def _submitter(send, get_receipts=lambda tx_hashes: {}, **kwargs):
+    oracle = FeeOracle(lambda: 1.0, autostart=False)
+    return TransactionSubmitter("0xsigner", NonceManager(lambda address: 0), send, get_receipts, oracle,
+                                poll_interval=0.01, **kwargs)
+
+
+def test_release_of_latest_nonce_rolls_back():
+    nonces = NonceManager(lambda address: 5)
+    assert nonces.reserve("0xa") == 5
+    nonces.release("0xa", 5)
+    assert nonces.reserve("0xa") == 5
+
+
+def test_release_with_later_nonces_outstanding_marks_gap():
+    nonces = NonceManager(lambda address: 0)
+    first, second = nonces.reserve("0xa"), nonces.reserve("0xa")
+    nonces.release("0xa", first)
+    # Resync com o segundo ainda em voo não pode reabrir nonces reservados
+    nonces.resync("0xa")
+
+    assert nonces.reserve("0xa") == first
+    assert nonces.reserve("0xa") == second + 1
+
+
+def test_failed_send_does_not_reuse_in_flight_nonce():
+    sent = []
+    fail_first = threading.Event()
+
+    def send(transaction):
+        if transaction["nonce"] == 0 and not fail_first.is_set():
+            fail_first.set()
+            raise ConnectionError("rpc down")
+        sent.append(transaction["nonce"])
+        return f"0x{transaction['nonce']}:{len(sent)}"
+
+    submitter = _submitter(send)
+    try:
+        first = submitter.submit({})
+        second = submitter.submit({})
+        third = submitter.submit({})
+
+        assert isinstance(first.exception(), ConnectionError)
+        assert sorted(sent) == [0, 1]
+        assert sorted(submitter.pending) == [0, 1]
+        assert not second.done() and not third.done()
+    finally:
+        submitter.stop()
+
+
+def test_nonce_collision_never_overwrites_pending():
+    class StuckNonces(NonceManager):
+        def reserve(self, address, count=1):
+            return 0
+
+    oracle = FeeOracle(lambda: 1.0, autostart=False)
+    submitter = TransactionSubmitter("0xsigner", StuckNonces(lambda address: 0), lambda transaction: "0xhash",
+                                     lambda tx_hashes: {}, oracle, poll_interval=0.01)
+    try:
+        first = submitter.submit({})
+        second = submitter.submit({})
+
+        assert isinstance(second.exception(), ValueError)
+        assert submitter.pending[0].future is first
+        assert submitter.stats["failed"] == 1
+    finally:
+        submitter.stop()
+
+
+def test_expiry_does_not_resync_over_pending_transactions():
+    chain_nonce = {"value": 0}
+    sent = {}
+
+    def send(transaction):
+        tx_hash = f"0x{transaction['nonce']}:{len(sent)}"
+        sent[tx_hash] = transaction["nonce"]
+        return tx_hash
+
+    oracle = FeeOracle(lambda: 1.0, autostart=False)
+    nonces = NonceManager(lambda address: chain_nonce["value"])
+    submitter = TransactionSubmitter("0xsigner", nonces, send, lambda tx_hashes: {}, oracle,
+                                     poll_interval=0.01, bump_after=60.0, timeout=60.0)
+    try:
+        expiring = submitter.submit({})
+        still_pending = submitter.submit({})
+        submitter.pending[0].submitted_at -= 120.0
+        submitter.poll()
+
+        assert isinstance(expiring.exception(), TimeoutError)
+        assert not still_pending.done()
+        # O nonce expirado é reusado; o pendente não é sobrescrito
+        submitter.submit({})
+        assert sorted(submitter.pending) == [0, 1]
+        assert submitter.pending[1].future is still_pending
+    finally:
+        submitter.stop()
+
+
+def test_stop_is_permanent():
+    submitter = _submitter(lambda transaction: f"0x{transaction['nonce']}")
+    pending = submitter.submit({})
+    submitter.stop()
+
+    assert isinstance(pending.exception(), RuntimeError)
+    assert isinstance(submitter.submit({}).exception(), RuntimeError)
+    assert submitter._tracker is None
+    assert submitter.nonces.in_flight("0xsigner") == 0
+
+
+def test_fee_oracle_does_not_restart_after_stop():
+    oracle = FeeOracle(lambda: 2.0, max_staleness=0.0)
+    oracle.estimate()
+    oracle.stop()
+
+    assert oracle.estimate() > 0
+    assert oracle._thread is None